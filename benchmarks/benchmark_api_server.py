@@ -0,0 +1,189 @@
+"""
+Load test for the JSON API server (`main.py serve`).
+
+Starts the server in a child process with a fresh data folder, registers some users,
+seeds recipes, then runs keep-alive clients at increasing concurrency for a fixed time
+each and reports requests per second and p50/p99 latency. Each client is logged in as
+one of the users (requests of one user are serialized by the server) and sends a mix of
+requests: mostly recipe pages and name searches, with ingredient searches, meal plan
+reads and writes, recipe adds and grocery lists.
+
+The clients run on one event loop in this process, so at high concurrency the client
+itself can become the bottleneck; compare with `--workers` to see the server side.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_api_server
+    python -m benchmarks.benchmark_api_server --concurrency 1 8 32 128 --seconds 10 --workers 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+INGREDIENTS = ["flour", "eggs", "milk", "rice", "salt", "butter", "sugar", "onion", "garlic", "tomato"]
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class Connection:
+    """
+    A minimal keep-alive HTTP/1.1 client for the API's JSON requests.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        """
+        Sends a request and returns (status, payload).
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: {len(data)}\r\n"
+        if token:
+            head += f"Authorization: Bearer {token}\r\n"
+        self.writer.write(head.encode("latin-1") + b"\r\n" + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length, keep_alive = 0, True
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection":
+                keep_alive = value.strip().lower() != "close"
+        payload = json.loads(await self.reader.readexactly(length))
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def next_request(rng, recipes):
+    """
+    Returns a random (method, path, body) from the workload mix.
+    """
+    roll = rng.random()
+    if roll < 0.40:
+        return "GET", f"/recipes?start={rng.randrange(recipes)}&count=20", None
+    if roll < 0.60:
+        return "GET", f"/recipes/find?name=Recipe%20{rng.randrange(recipes)}", None
+    if roll < 0.70:
+        return "GET", f"/recipes/search?ingredients={rng.choice(INGREDIENTS)}", None
+    if roll < 0.80:
+        return "GET", "/meal-plan", None
+    if roll < 0.90:
+        ingredients = ", ".join(f"1 cup {name}" for name in rng.sample(INGREDIENTS, 3))
+        return "POST", "/recipes", {"name": f"Extra {rng.randrange(10 ** 9)}", "ingredients": ingredients}
+    if roll < 0.97:
+        return "PUT", "/meal-plan", {rng.choice(DAYS): f"Recipe {rng.randrange(recipes)}"}
+    return "POST", "/grocery-list", {}
+
+
+async def setup(port, users, recipes, seed):
+    """
+    Registers and logs in the users and seeds the recipes. Returns the session tokens.
+    """
+    rng = random.Random(seed)
+    connection = Connection(port)
+    tokens = []
+    for number in range(users):
+        credentials = {"email": f"user{number}@example.com", "password": "password"}
+        await connection.request("POST", "/users", credentials)
+        status, payload = await connection.request("POST", "/sessions", credentials)
+        assert status == 201, payload
+        tokens.append(payload["token"])
+    for number in range(recipes):
+        ingredients = ", ".join(f"{rng.randint(1, 3)} cups {name}" for name in rng.sample(INGREDIENTS, 4))
+        await connection.request("POST", "/recipes", {"name": f"Recipe {number}", "ingredients": ingredients}, tokens[0])
+    connection.close()
+    return tokens
+
+
+async def load(port, tokens, concurrency, seconds, recipes, seed):
+    """
+    Runs `concurrency` clients for `seconds` and returns (latencies, errors, elapsed).
+    """
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(number):
+        nonlocal errors
+        rng = random.Random(seed + number)
+        connection = Connection(port)
+        token = tokens[number % len(tokens)]
+        while time.perf_counter() < deadline:
+            method, path, body = next_request(rng, recipes)
+            start = time.perf_counter()
+            status, _ = await connection.request(method, path, body, token)
+            latencies.append(time.perf_counter() - start)
+            errors += status >= 400
+        connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def start_server(folder, workers):
+    """
+    Starts `main.py serve` on a free port in a folder. Returns (process, port).
+    """
+    command = [sys.executable, MAIN, "serve", "--port", "0"]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=folder, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()  # "Serving the meal planner API on http://127.0.0.1:<port>/ ..."
+    if "http://" not in line:
+        process.kill()
+        raise RuntimeError(f"The server did not start: {line!r}")
+    return process, int(line.split("http://")[1].split("/")[0].rsplit(":", 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each concurrency level")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--recipes", type=int, default=1_000, help="recipes seeded before the test")
+    parser.add_argument("--workers", type=int, help="server request handler threads")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as folder:
+        process, port = start_server(folder, args.workers)
+        try:
+            tokens = asyncio.run(setup(port, args.users, args.recipes, args.seed))
+            print(f"{'clients':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = asyncio.run(
+                    load(port, tokens, concurrency, args.seconds, args.recipes, args.seed)
+                )
+                print(
+                    f"{concurrency:>7} {len(latencies):>9} {len(latencies) / elapsed:>8.0f} "
+                    f"{percentile(latencies, 0.50) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f} {errors:>7}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
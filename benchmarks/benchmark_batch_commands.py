@@ -0,0 +1,81 @@
+"""
+Benchmark for the non-interactive command mode (`main.py batch`).
+
+Runs the same JSONL stream through CommandController in a fresh data folder, with
+different batch sizes, and reports commands per second. The stream adds recipes, edits
+some of them, plans a meal now and then and ends with a grocery list. Batch size 1
+commits (and fsyncs) every write, like the interactive menus do.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_batch_commands
+    python -m benchmarks.benchmark_batch_commands --commands 5000 --batch-sizes 1 100 1000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from controllers.command_controller import CommandController
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def commands(count):
+    """
+    Returns the JSONL lines of the workload.
+    """
+    lines = []
+    added = 0
+    for i in range(count - 1):
+        if i % 10 == 9:
+            recipe_id = added - 1
+            lines.append({"command": "recipe edit", "id": recipe_id, "name": f"Recipe {recipe_id}", "ingredients": "1 cup rice"})
+        elif i % 50 == 49:
+            lines.append({"command": "meal set", "day": DAYS[i % 7], "meal": f"Recipe {added - 1}"})
+        else:
+            lines.append({"command": "recipe add", "name": f"Recipe {added}", "ingredients": f"{i % 7 + 1} eggs, 2 cups flour"})
+            added += 1
+    lines.append({"command": "grocery"})
+    return [json.dumps(line) for line in lines]
+
+
+def run(lines, batch_size):
+    """
+    Runs the lines in a fresh data folder and returns (seconds, failures).
+    """
+    controller = CommandController(batch_size=batch_size)
+    controller.auth_manager.create_user("bench@example.com", "password")
+    assert controller.authenticate("bench@example.com", "password")
+    start = time.perf_counter()
+    failures = sum(not result["ok"] for result in controller.run(lines))
+    elapsed = time.perf_counter() - start
+    # Let background compaction and the index save finish before the folder is removed
+    controller.recipe_controller.recipe_store.wait_for_compaction()
+    controller.recipe_controller.ingredient_index.save()
+    return elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=5_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1_000])
+    args = parser.parse_args()
+
+    lines = commands(args.commands)
+    repository = os.getcwd()
+    for batch_size in args.batch_sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)  # The application keeps its data in ./data
+            try:
+                elapsed, failures = run(lines, batch_size)
+            finally:
+                os.chdir(repository)
+        print(
+            f"batch size {batch_size:>5} | {len(lines)} commands in {elapsed:6.2f} s | "
+            f"{len(lines) / elapsed:8.0f} commands/s | {failures} failed"
+        )
+
+
+if __name__ == "__main__":
+    main()
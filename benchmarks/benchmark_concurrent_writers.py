@@ -0,0 +1,130 @@
+"""
+Multi-process stress test for the cross-process file locks and version counters.
+
+Starts 1, 2, 4 and 8 writer processes against the same data folder. Every writer
+repeatedly:
+    - adds a recipe through RecipeStore (journal appends and compactions),
+    - increments a counter kept in a recipe, with an optimistic read-modify-write that
+      retries on StaleVersionError (the way RecipeController edits recipes),
+    - increments a counter kept in a CSV file through FileManager.write_csv with
+      `expected_version`, also retrying on StaleVersionError.
+
+At the end it checks that no update was lost (every add is present and both counters
+equal the number of increments) and reports throughput and the number of retries.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_concurrent_writers
+    python -m benchmarks.benchmark_concurrent_writers --writers 1 2 4 8 --iterations 100
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from utils.file_lock import StaleVersionError
+from utils.file_manager import FileManager
+from utils.recipe_store import RecipeStore
+
+COUNTER_RECIPE = "Counter"
+
+
+def increment_recipe_counter(store):
+    """
+    Increments the counter recipe, retrying if another writer got in first. Returns the retries.
+    """
+    retries = 0
+    while True:
+        revision = store.revision()
+        recipe_id, row = next((recipe_id, row) for recipe_id, row in store.recipes() if row[0] == COUNTER_RECIPE)
+        try:
+            store.edit(recipe_id, COUNTER_RECIPE, str(int(row[1]) + 1), expected_revision=revision)
+            return retries
+        except StaleVersionError:
+            retries += 1
+
+
+def increment_csv_counter(file_manager):
+    """
+    Increments the counter CSV file, retrying if another writer got in first. Returns the retries.
+    """
+    retries = 0
+    while True:
+        version = file_manager.version()
+        _, rows = file_manager.read_rows()
+        try:
+            file_manager.write_csv([{"Value": int(rows[0][0]) + 1}], ["Value"], expected_version=version)
+            return retries
+        except StaleVersionError:
+            retries += 1
+
+
+def writer(folder, number, iterations, barrier, results):
+    os.chdir(folder)
+    store = RecipeStore(os.path.join(folder, "recipes.csv"), max_journal_records=64, background=False)
+    counter = FileManager(os.path.join(folder, "counter.csv"))
+    barrier.wait(timeout=60)
+    retries = 0
+    for i in range(iterations):
+        store.add(f"Recipe {number}-{i}", "rice,beans")
+        retries += increment_recipe_counter(store)
+        retries += increment_csv_counter(counter)
+    results.put(retries)
+
+
+def run(writers, iterations):
+    """
+    Runs one stress round and returns (seconds, retries), raising AssertionError on a lost update.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        FileManager(os.path.join(folder, "recipes.csv")).write_csv(
+            [{"Recipe Name": COUNTER_RECIPE, "Ingredients": "0"}], RecipeStore.FIELDNAMES
+        )
+        FileManager(os.path.join(folder, "counter.csv")).write_csv([{"Value": 0}], ["Value"])
+
+        barrier = multiprocessing.Barrier(writers + 1)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=writer, args=(folder, number, iterations, barrier, results))
+            for number in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        barrier.wait(timeout=60)
+        start = time.perf_counter()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        assert all(process.exitcode == 0 for process in processes), "a writer failed"
+        retries = sum(results.get() for _ in processes)
+
+        FileManager.cache.clear()
+        recipes = RecipeStore(os.path.join(folder, "recipes.csv"), background=False).recipes()
+        names = {row[0] for _, row in recipes}
+        expected_names = {f"Recipe {number}-{i}" for number in range(writers) for i in range(iterations)}
+        assert expected_names <= names, f"lost {len(expected_names - names)} added recipes"
+        assert len(recipes) == len(expected_names) + 1, "duplicated recipes"
+        recipe_counter = next(int(row[1]) for _, row in recipes if row[0] == COUNTER_RECIPE)
+        assert recipe_counter == writers * iterations, f"recipe counter {recipe_counter}, lost updates"
+        _, rows = FileManager(os.path.join(folder, "counter.csv")).read_rows()
+        assert int(rows[0][0]) == writers * iterations, f"CSV counter {rows[0][0]}, lost updates"
+    return elapsed, retries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--iterations", type=int, default=100, help="iterations per writer")
+    args = parser.parse_args()
+
+    for writers in args.writers:
+        elapsed, retries = run(writers, args.iterations)
+        operations = 3 * writers * args.iterations
+        print(
+            f"{writers:>2} writers | {operations:>5} updates in {elapsed:6.2f} s | "
+            f"{operations / elapsed:7.1f} updates/s | {retries:>5} retries | no lost updates"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput benchmark for GroceryAggregator over many users' meal plans.
+
+Generates meal plans (meals per day for a number of days, for each user) whose
+ingredients carry quantities and units, e.g. "2 cups rice" or "200g sugar", and reports
+the time to compute per-user totals:
+    - naive:   parse every entry and add it into a dict, meal by meal,
+    - python:  GroceryAggregator with the pure-Python group-by,
+    - numpy:   GroceryAggregator with the numpy.bincount group-by (if NumPy is installed).
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_grocery_aggregation
+    python -m benchmarks.benchmark_grocery_aggregation --users 1000 --days 90
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import utils.grocery_list as grocery_list
+from utils.grocery_list import GroceryAggregator
+from utils.ingredient_parser import parse_quantity
+
+
+def make_plans(users, days, meals_per_day, rng):
+    """
+    Returns (user, ingredients string) pairs, one per planned meal.
+    """
+    names = [f"ingredient {index}" for index in range(300)]
+    units = ["", "g", "kg", "ml", "cups", "tbsp", "tsp", "cloves", "1/2 cup"]
+    recipes = []
+    for _ in range(200):
+        entries = []
+        for name in rng.sample(names, rng.randint(4, 10)):
+            unit = rng.choice(units)
+            entries.append(f"{rng.randint(1, 5)} {unit} {name}" if unit else name)
+        recipes.append(", ".join(entries))
+    return [
+        (f"user{user}@example.com", rng.choice(recipes))
+        for user in range(users)
+        for _ in range(days * meals_per_day)
+    ]
+
+
+def naive(plans):
+    totals = defaultdict(lambda: defaultdict(float))
+    for user, ingredients in plans:
+        for text in ingredients.split(","):
+            quantity, unit, name = parse_quantity(text)
+            if name:
+                totals[user][(name, unit)] += quantity
+    return totals
+
+
+def aggregate(plans):
+    aggregator = GroceryAggregator()
+    for user, ingredients in plans:
+        aggregator.add(ingredients, owner=user)
+    return aggregator.totals_by_owner()
+
+
+def timed(function, plans):
+    start = time.perf_counter()
+    result = function(plans)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--meals", type=int, default=3, help="meals per day")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    plans = make_plans(args.users, args.days, args.meals, random.Random(args.seed))
+    entries = sum(ingredients.count(",") + 1 for _, ingredients in plans)
+    print(f"{args.users} users x {args.days} days x {args.meals} meals = {len(plans)} meals, {entries} entries")
+
+    expected, naive_seconds = timed(naive, plans)
+    print(f"naive parse + dict        {naive_seconds:7.2f} s")
+
+    numpy_module = grocery_list.np
+    grocery_list.np = None
+    result, python_seconds = timed(aggregate, plans)
+    grocery_list.np = numpy_module
+    print(f"aggregator, pure Python   {python_seconds:7.2f} s")
+
+    if numpy_module is not None:
+        result, numpy_seconds = timed(aggregate, plans)
+        print(f"aggregator, numpy         {numpy_seconds:7.2f} s")
+    sample = next(iter(expected))
+    assert all(abs(result[sample][key] - value) < 1e-6 for key, value in expected[sample].items())
+
+
+if __name__ == "__main__":
+    main()
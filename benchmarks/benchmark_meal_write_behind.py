@@ -0,0 +1,101 @@
+"""
+Benchmark for MealController.save_meal_plan with and without write-behind.
+
+Each run saves meal changes one day at a time (the way a "meal set" request does) against
+a recipe library, and reports the total time, the time per change and the bytes written
+to disk for:
+    - immediate:     the meal plan and grocery list files are rewritten after every change,
+    - write-behind:  every change is appended to the journal and fsynced, and the files are
+                     rewritten once per `--batch` changes and on close.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_meal_write_behind
+    python -m benchmarks.benchmark_meal_write_behind --recipes 0 5000 --changes 200 --batch 50
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from controllers.meal_controller import MealController
+from utils.file_manager import FileManager
+from utils.recipe_store import RecipeStore
+
+DAYS = MealController.DAYS
+INGREDIENTS = ["2 cups rice", "1 can beans", "1 onion", "2 tomatoes"]
+
+
+def prepare(folder, recipes):
+    """
+    Writes a recipe library with `recipes` recipes and removes any meal plan, journal or
+    grocery list left over.
+    """
+    shutil.rmtree(os.path.join(folder, "data"), ignore_errors=True)
+    os.makedirs(os.path.join(folder, "data"))
+    FileManager(os.path.join("data", "recipes.csv")).write_csv(
+        [{"Recipe Name": f"Meal {i}", "Ingredients": ", ".join(INGREDIENTS)} for i in range(recipes)],
+        ["Recipe Name", "Ingredients"],
+    )
+
+
+def run(changes, recipes, write_behind, batch):
+    """
+    Saves `changes` single-day changes and returns (seconds, bytes written to the meal plan,
+    the grocery list and the journal).
+    """
+    written = 0
+    original_write, original_append = FileManager.write_csv, MealController._append_journal
+
+    def counting_write(self, data, fieldnames, expected_version=None):
+        nonlocal written
+        original_write(self, data, fieldnames, expected_version)
+        written += os.path.getsize(self.file_path)
+
+    def counting_append(self, record):
+        nonlocal written
+        original_append(self, record)
+        written += len(json.dumps(record)) + 1
+
+    store = RecipeStore(os.path.join("data", "recipes.csv"))
+    FileManager.write_csv, MealController._append_journal = counting_write, counting_append
+    try:
+        start = time.perf_counter()
+        controller = MealController(store, write_behind=write_behind, flush_interval=0, flush_batch_size=batch)
+        for i in range(changes):
+            controller.save_meal_plan({DAYS[i % 7]: f"Meal {i % max(recipes, 1)}"})
+        controller.close()
+        elapsed = time.perf_counter() - start
+    finally:
+        FileManager.write_csv, MealController._append_journal = original_write, original_append
+    return elapsed, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, nargs="+", default=[0, 5_000], help="recipes in the library")
+    parser.add_argument("--changes", type=int, default=200, help="meal changes saved per run")
+    parser.add_argument("--batch", type=int, default=50, help="write-behind flush batch size")
+    args = parser.parse_args()
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            for recipes in args.recipes:
+                results = []
+                for name, write_behind in (("immediate", False), ("write-behind", True)):
+                    prepare(folder, recipes)
+                    elapsed, written = run(args.changes, recipes, write_behind, args.batch)
+                    results.append(
+                        f"{name} {elapsed:7.3f} s ({elapsed * 1000 / args.changes:6.2f} ms/change, "
+                        f"{written / 1024:8.1f} KiB written)"
+                    )
+                print(f"{recipes:>6} recipes, {args.changes} changes | " + " | ".join(results))
+        finally:
+            os.chdir(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Random-access benchmark for the CSV row-offset index.
+
+Writes a synthetic recipes.csv of each size to a temporary folder and reports the time
+to fetch one page of rows at a random position:
+    - parse: parsing the file with csv.reader up to the end of the page,
+    - index: reading the page through CsvOffsetIndex (mmap + the page's bytes only),
+plus the one-off cost of building the offset index.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_offset_index
+    python -m benchmarks.benchmark_offset_index --sizes 100000 1000000 --page 20
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.benchmark_startup import write_recipes
+from utils.csv_offset_index import CsvOffsetIndex
+
+
+def parse_page(path, start, count):
+    with open(path, mode="r", newline="", encoding="utf-8") as file:
+        rows = (row for row in itertools.islice(csv.reader(file), 1, None) if row)
+        return [tuple(row) for row in itertools.islice(rows, start, start + count)]
+
+
+def run(count, page, queries, rng):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recipes.csv")
+        write_recipes(path, count, rng)
+
+        start = time.perf_counter()
+        index = CsvOffsetIndex(path)
+        len(index)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        positions = [rng.randrange(count - page) for _ in range(queries)]
+        start = time.perf_counter()
+        for position in positions:
+            index.read(position, position + page)
+        index_ms = (time.perf_counter() - start) / queries * 1000
+
+        sample = positions[:max(1, queries // 20)]
+        start = time.perf_counter()
+        for position in sample:
+            assert parse_page(path, position, page) == index.read(position, position + page)
+        parse_ms = (time.perf_counter() - start) / len(sample) * 1000
+
+        print(
+            f"{count:>8} recipes | parse to page {parse_ms:9.2f} ms | offset index {index_ms:6.3f} ms"
+            f" | index build (once) {build_ms:8.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.sizes:
+        run(count, args.page, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Latency benchmark for PantryMatcher "what can I cook" queries.
+
+Builds a matcher over synthetic recipes (three to ten ingredients drawn from a shared
+ingredient vocabulary) and reports the average time per pantry query with the bitset
+representation, next to the same query answered with per-recipe set comparisons.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_pantry_matcher
+    python -m benchmarks.benchmark_pantry_matcher --sizes 10000 100000 --pantry 30
+"""
+import argparse
+import random
+import time
+
+from utils.ingredient_parser import parse_ingredients
+from utils.pantry_matcher import PantryMatcher
+
+
+def set_based_query(recipes, pantry, max_missing=2):
+    """
+    The straightforward alternative: compare every recipe's ingredient set to the pantry,
+    producing the same result as PantryMatcher.what_can_i_cook.
+    """
+    cookable, almost = [], []
+    for recipe_id, (name, ingredients) in recipes.items():
+        missing = ingredients - pantry
+        if not missing:
+            cookable.append((recipe_id, name))
+        elif len(missing) <= max_missing:
+            almost.append((recipe_id, name, sorted(missing)))
+    cookable.sort(key=lambda match: match[1])
+    almost.sort(key=lambda match: (len(match[2]), match[1]))
+    return {"cookable": cookable, "almost": almost}
+
+
+def run(count, vocabulary_size, pantry_size, query_count, rng):
+    vocabulary = [f"ingredient {index}" for index in range(vocabulary_size)]
+    # Skew ingredient popularity so that pantries actually cover some recipes
+    weights = [1 / (rank + 1) ** 0.5 for rank in range(vocabulary_size)]
+    rows = []
+    for _ in range(count):
+        ingredients = set(rng.choices(vocabulary, weights=weights, k=rng.randint(3, 10)))
+        rows.append(", ".join(sorted(ingredients)))
+
+    matcher = PantryMatcher()
+    start = time.perf_counter()
+    for recipe_id, ingredients in enumerate(rows):
+        matcher.add(recipe_id, f"Recipe {recipe_id}", ingredients)
+    build_seconds = time.perf_counter() - start
+    sets = {
+        recipe_id: (f"Recipe {recipe_id}", parse_ingredients(ingredients)) for recipe_id, ingredients in enumerate(rows)
+    }
+
+    pantries = [set(rng.choices(vocabulary, weights=weights, k=pantry_size)) for _ in range(query_count)]
+    assert matcher.what_can_i_cook(pantries[0]) == set_based_query(sets, pantries[0])
+
+    start = time.perf_counter()
+    matched = 0
+    for pantry in pantries:
+        result = matcher.what_can_i_cook(pantry)
+        matched += len(result["cookable"]) + len(result["almost"])
+    bitset_ms = (time.perf_counter() - start) / query_count * 1000
+
+    start = time.perf_counter()
+    for pantry in pantries:
+        set_based_query(sets, pantry)
+    set_ms = (time.perf_counter() - start) / query_count * 1000
+
+    print(
+        f"{count:>7} recipes | build {build_seconds:5.2f} s | bitsets {bitset_ms:8.2f} ms/query"
+        f" | set comparisons {set_ms:8.2f} ms/query | {matched / query_count:8.1f} matches/query"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--vocabulary", type=int, default=500, help="distinct ingredients")
+    parser.add_argument("--pantry", type=int, default=40, help="ingredients drawn per pantry")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.sizes:
+        run(count, args.vocabulary, args.pantry, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Throughput benchmark for PasswordHasher: logins per second against the number of workers.
+
+Each simulated login is one bcrypt verification. All logins are submitted at once so
+they compete for the pool, the way concurrent users would, and the benchmark reports
+how many complete per second for each pool size, for both the blocking API (futures)
+and the async API (asyncio.gather).
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_password_hasher
+    python -m benchmarks.benchmark_password_hasher --workers 1 2 4 8 --executor process
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from utils.password_hasher import PasswordHasher
+
+
+def run_blocking(hasher, password, hashed_password, logins):
+    """
+    Submits `logins` verifications through the futures API and waits for all of them.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    start = time.perf_counter()
+    futures = [hasher.submit_verify(password, hashed_password) for _ in range(logins)]
+    assert all(future.result() for future in futures)
+    return time.perf_counter() - start
+
+
+def run_async(hasher, password, hashed_password, logins):
+    """
+    Runs `logins` verifications concurrently through the async API.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    async def login_burst():
+        results = await asyncio.gather(
+            *(hasher.async_verify_password(password, hashed_password) for _ in range(logins))
+        )
+        assert all(results)
+
+    start = time.perf_counter()
+    asyncio.run(login_burst())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpu_count})
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--executor", choices=sorted(PasswordHasher.EXECUTOR_TYPES), default="thread")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor of the stored hash")
+    parser.add_argument("--logins", type=int, default=64, help="logins per measurement")
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    hashed_password = PasswordHasher(max_workers=1, rounds=args.rounds).hash_password(password)
+    print(f"{cpu_count} CPUs, {args.executor} pool, bcrypt cost {args.rounds}, {args.logins} logins per run")
+
+    baseline = None
+    for workers in args.workers:
+        hasher = PasswordHasher(max_workers=workers, executor_type=args.executor)
+        hasher.verify_password(password, hashed_password)  # Warm up the pool
+        blocking_rate = args.logins / run_blocking(hasher, password, hashed_password, args.logins)
+        async_rate = args.logins / run_async(hasher, password, hashed_password, args.logins)
+        hasher.shutdown()
+
+        baseline = baseline or blocking_rate
+        print(
+            f"{workers:>3} workers | blocking {blocking_rate:8.1f} logins/s"
+            f" | async {async_rate:8.1f} logins/s | scaling x{blocking_rate / baseline:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
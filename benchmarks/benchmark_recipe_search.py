@@ -0,0 +1,97 @@
+"""
+Latency benchmark for RecipeSearchEngine prefix and typo-tolerant queries.
+
+Builds an engine over synthetic recipe names (two to four words drawn from a
+vocabulary of ingredients, dish types and styles) and reports the average time per
+query for autocomplete, exact-word fuzzy search and misspelled fuzzy search, next to
+a linear scan over all names for comparison.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_recipe_search
+    python -m benchmarks.benchmark_recipe_search --sizes 10000 100000 --queries 500
+"""
+import argparse
+import random
+import string
+import time
+
+from utils.recipe_search import RecipeSearchEngine, normalize_name
+
+
+def make_vocabulary(size, rng):
+    """
+    Builds `size` distinct pronounceable pseudo-words of 4 to 10 letters.
+    """
+    consonants, vowels = "bcdfghjklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 5)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words)
+
+
+def misspell(word, rng):
+    """
+    Applies one random substitution, insertion or deletion to a word.
+    """
+    position = rng.randrange(len(word))
+    operation = rng.choice("sid")
+    letter = rng.choice(string.ascii_lowercase)
+    if operation == "s":
+        return word[:position] + letter + word[position + 1:]
+    if operation == "i":
+        return word[:position] + letter + word[position:]
+    return word[:position] + word[position + 1:]
+
+
+def time_queries(function, queries):
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(count, vocabulary_size, query_count, rng):
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    names = [" ".join(rng.sample(vocabulary, rng.randint(2, 4))).title() for _ in range(count)]
+
+    engine = RecipeSearchEngine()
+    start = time.perf_counter()
+    for recipe_id, name in enumerate(names):
+        engine.add(recipe_id, name)
+    build_seconds = time.perf_counter() - start
+
+    sample = [rng.choice(names) for _ in range(query_count)]
+    prefixes = [name[:rng.randint(3, 8)] for name in sample]
+    exact_words = [name.split()[0] for name in sample]
+    typos = [misspell(name.split()[0].lower(), rng) for name in sample]
+    normalized = [normalize_name(name) for name in names]
+
+    prefix_ms = time_queries(lambda query: engine.autocomplete(query), prefixes)
+    exact_ms = time_queries(lambda query: engine.fuzzy_search(query), exact_words)
+    typo_ms = time_queries(lambda query: engine.fuzzy_search(query), typos)
+    scan_ms = time_queries(
+        lambda query: [name for name in normalized if name.startswith(query.lower())][:10], prefixes[:20]
+    )
+    print(
+        f"{count:>7} recipes ({engine._bk_tree.size} words) | build {build_seconds:6.2f} s"
+        f" | prefix {prefix_ms:7.3f} ms | fuzzy exact {exact_ms:7.3f} ms"
+        f" | fuzzy typo {typo_ms:7.3f} ms | linear prefix scan {scan_ms:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--vocabulary", type=int, default=3000, help="distinct words in recipe names")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.sizes:
+        run(count, args.vocabulary, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
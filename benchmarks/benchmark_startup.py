@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark: cold CSV parsing vs. loading the binary snapshot.
+
+Writes a synthetic recipes.csv of each size to a temporary folder and reports how long
+the first `FileManager.read_rows()` of a new process takes:
+    - csv:      parsing the CSV file row by row (no snapshot yet),
+    - snapshot: loading the mmap'ed binary snapshot written by the previous read,
+with the process-wide parsed-file cache cleared before every measurement.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_startup
+    python -m benchmarks.benchmark_startup --sizes 10000 100000 1000000 --repeat 3
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from utils.file_manager import FileManager
+from utils.recipe_store import RecipeStore
+
+
+def write_recipes(path, count, rng):
+    """
+    Writes `count` synthetic recipes to a CSV file.
+    """
+    vocabulary = [f"ingredient {index}" for index in range(2000)]
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(RecipeStore.FIELDNAMES)
+        for index in range(count):
+            writer.writerow([f"Recipe {index}", ", ".join(rng.sample(vocabulary, rng.randint(3, 10)))])
+
+
+def best_time(function, repeat):
+    """
+    Returns the fastest of `repeat` runs of `function`, in milliseconds.
+    """
+    best = None
+    for _ in range(repeat):
+        FileManager.cache.clear()
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(count, repeat, rng):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recipes.csv")
+        write_recipes(path, count, rng)
+        snapshot_path = FileManager(path, snapshot=True).snapshot.path
+
+        csv_ms = best_time(lambda: FileManager(path).read_rows(), repeat)
+        FileManager.cache.clear()
+        start = time.perf_counter()
+        expected = FileManager(path, snapshot=True).read_rows()  # Parses and writes the snapshot
+        build_ms = (time.perf_counter() - start) * 1000 - csv_ms
+        snapshot_ms = best_time(lambda: FileManager(path, snapshot=True).read_rows(), repeat)
+
+        FileManager.cache.clear()
+        assert FileManager(path, snapshot=True).read_rows() == expected
+        print(
+            f"{count:>8} recipes | csv {csv_ms:9.1f} ms | snapshot {snapshot_ms:8.1f} ms"
+            f" ({csv_ms / snapshot_ms:4.1f}x faster) | snapshot write {build_ms:7.1f} ms"
+            f" | csv {os.path.getsize(path) / 2**20:6.1f} MiB, snapshot {os.path.getsize(snapshot_path) / 2**20:6.1f} MiB"
+        )
+        FileManager.cache.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in args.sizes:
+        run(count, args.repeat, rng)
+
+
+if __name__ == "__main__":
+    main()
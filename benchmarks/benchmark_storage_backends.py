@@ -0,0 +1,115 @@
+"""
+Benchmark comparing the CSV and SQLite storage backends on the same workload.
+
+For each table size, both backends get a recipes table and a users table of that many
+rows, and the same operations are timed through FileManager:
+    - bulk load:    writing both tables from scratch,
+    - cold read:    reading the whole recipes table with the caches cleared,
+    - page:         reading a random page of 20 recipes by row number,
+    - email:        looking a user up by email,
+    - ingredient:   finding the recipes that use an ingredient,
+    - append:       appending one user (durable),
+    - update:       changing one user's password (durable).
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_storage_backends
+    python -m benchmarks.benchmark_storage_backends --rows 1000 100000 --operations 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from utils.file_manager import FileManager
+from utils.recipe_store import RecipeStore
+from utils.storage_backend import create_storage_backend
+
+INGREDIENTS = [f"ingredient {number}" for number in range(500)]
+PAGE_SIZE = 20
+
+
+def recipes(count, rng):
+    return [
+        {"Recipe Name": f"Recipe {number}", "Ingredients": ", ".join(rng.sample(INGREDIENTS, 6))}
+        for number in range(count)
+    ]
+
+
+def users(count):
+    return [{"Email": f"user{number}@example.com", "Password": "$2b$10$" + "x" * 53} for number in range(count)]
+
+
+def timed(operation, repeat):
+    """
+    Runs `operation(i)` for i in range(repeat) and returns the mean time in milliseconds.
+    """
+    start = time.perf_counter()
+    for i in range(repeat):
+        operation(i)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run(backend_name, folder, rows, operations, seed):
+    """
+    Runs the workload on one backend and returns {operation: mean milliseconds}.
+    """
+    backend = create_storage_backend(backend_name)
+    rng = random.Random(seed)
+    recipe_file = FileManager(os.path.join(folder, "recipes.csv"), backend=backend)
+    user_file = FileManager(os.path.join(folder, "users.csv"), backend=backend)
+    recipe_rows, user_rows = recipes(rows, rng), users(rows)
+    results = {}
+
+    start = time.perf_counter()
+    recipe_file.write_csv(recipe_rows, RecipeStore.FIELDNAMES)
+    user_file.write_csv(user_rows, ["Email", "Password"])
+    results["bulk load"] = (time.perf_counter() - start) * 1000
+
+    def cold_read(_):
+        backend.cache.clear()
+        recipe_file.read_rows()
+    results["cold read"] = timed(cold_read, 5)
+
+    starts = [rng.randrange(max(rows - PAGE_SIZE, 1)) for _ in range(operations)]
+    results["page"] = timed(lambda i: recipe_file.read_range(starts[i], starts[i] + PAGE_SIZE), operations)
+
+    recipe_file.read_rows()  # Both backends answer scans from a warm cache
+    user_file.read_rows()
+    emails = [f"user{rng.randrange(rows)}@example.com" for _ in range(operations)]
+    results["email"] = timed(lambda i: user_file.find_rows("Email", emails[i]), operations)
+    wanted = [rng.choice(INGREDIENTS) for _ in range(operations)]
+    results["ingredient"] = timed(lambda i: recipe_file.find_rows("Ingredients", wanted[i]), operations)
+
+    appends = max(operations // 10, 1)
+    results["append"] = timed(
+        lambda i: user_file.append_csv([{"Email": f"new{i}@example.com", "Password": "x"}], ["Email", "Password"]),
+        appends,
+    )
+    results["update"] = timed(lambda i: user_file.update_row("Email", emails[i], {"Password": "changed"}), appends)
+
+    if hasattr(backend, "close"):
+        backend.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--operations", type=int, default=200, help="lookups and page reads timed per size")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        print(f"\n{rows} rows (ms; bulk load is the total, the rest are per operation)")
+        results = {}
+        for backend_name in ("csv", "sqlite"):
+            with tempfile.TemporaryDirectory() as folder:
+                results[backend_name] = run(backend_name, folder, rows, args.operations, args.seed)
+        print(f"{'operation':<12} {'csv':>10} {'sqlite':>10}")
+        for operation in results["csv"]:
+            print(f"{operation:<12} {results['csv'][operation]:>10.3f} {results['sqlite'][operation]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark for per-user meal plan operations as the number of users grows.
+
+For each user count, creates that many user partitions (each with a one-week meal plan),
+then times, for randomly chosen users:
+    - locate:  finding the user's folder with UserPartitions.folder,
+    - read:    reading the user's meal plan,
+    - write:   rewriting the user's meal plan.
+
+With partitioning these costs should not depend on the number of users.
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_user_partitions
+    python -m benchmarks.benchmark_user_partitions --users 10 1000 100000 --operations 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from utils.file_manager import FileManager
+from utils.user_partitions import UserPartitions
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def plan(email):
+    return [{"Day": day, "Meal": f"{email} {day}"} for day in DAYS]
+
+
+def populate(partitions, start, stop):
+    """
+    Creates the partitions of users `start` to `stop - 1`, each with a meal plan.
+    """
+    for i in range(start, stop):
+        email = f"user{i}@example.com"
+        folder = partitions.folder(email)
+        FileManager(os.path.join(folder, "meal_plan.csv"), durable=False).write_csv(plan(email), ["Day", "Meal"])
+
+
+def measure(partitions, users, operations, rng):
+    """
+    Returns the mean (locate, read, write) time in microseconds over random users.
+    """
+    emails = [f"user{rng.randrange(users)}@example.com" for _ in range(operations)]
+    FileManager.cache.clear()
+
+    start = time.perf_counter()
+    folders = [partitions.folder(email) for email in emails]
+    locate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for folder in folders:
+        FileManager.cache.invalidate(os.path.join(folder, "meal_plan.csv"))
+        FileManager(os.path.join(folder, "meal_plan.csv")).read_rows()
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for email, folder in zip(emails, folders):
+        FileManager(os.path.join(folder, "meal_plan.csv"), durable=False).write_csv(plan(email), ["Day", "Meal"])
+    write = time.perf_counter() - start
+    return tuple(seconds * 1e6 / operations for seconds in (locate, read, write))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--operations", type=int, default=2_000, help="random users timed per size")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as folder:
+        partitions = UserPartitions(os.path.join(folder, "partitions"))
+        created = 0
+        for users in sorted(args.users):
+            populate(partitions, created, users)
+            created = users
+            locate, read, write = measure(partitions, users, args.operations, rng)
+            print(
+                f"{users:>8} users | locate {locate:7.1f} us | read plan {read:7.1f} us | "
+                f"write plan {write:7.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
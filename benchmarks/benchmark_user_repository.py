@@ -0,0 +1,108 @@
+"""
+Benchmark for UserRepository lookups against a full CSV scan.
+
+Generates a users CSV file with the requested number of users, then measures:
+    - the one-off cost of building the email index,
+    - the average lookup time through the index,
+    - the average lookup time of the old csv.DictReader scan (for comparison).
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_user_repository
+    python -m benchmarks.benchmark_user_repository --sizes 10000 100000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from utils.user_repository import UserRepository
+
+# A realistic bcrypt hash so rows have the same width as real data
+FAKE_HASH = "$2b$12$" + "a" * 53
+
+
+def write_users_file(path, count):
+    """
+    Writes a users CSV file with `count` synthetic users.
+
+    Args:
+        path (str): Destination file path.
+        count (int): Number of users to generate.
+    """
+    with open(path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Email", "Password"])
+        for i in range(count):
+            writer.writerow([f"user{i}@example.com", FAKE_HASH])
+
+
+def scan_lookup(path, email):
+    """
+    Looks up a user the way AuthManager used to: a full scan with csv.DictReader.
+
+    Args:
+        path (str): Path to the users CSV file.
+        email (str): The email address to look up.
+
+    Returns:
+        dict | None: The matching row, or None.
+    """
+    with open(path, mode="r", newline="") as file:
+        for row in csv.DictReader(file):
+            if row["Email"] == email:
+                return row
+    return None
+
+
+def run(count, lookups, scan_lookups):
+    """
+    Runs the benchmark for a single user count and prints the results.
+
+    Args:
+        count (int): Number of users in the file.
+        lookups (int): Number of indexed lookups to time.
+        scan_lookups (int): Number of full-scan lookups to time.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "users.csv")
+        write_users_file(path, count)
+        emails = [f"user{random.randrange(count)}@example.com" for _ in range(lookups)]
+
+        repository = UserRepository(path)
+        start = time.perf_counter()
+        len(repository)  # Forces the index to load
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for email in emails:
+            repository.get_user(email)
+        indexed_time = (time.perf_counter() - start) / lookups
+
+        start = time.perf_counter()
+        for email in emails[:scan_lookups]:
+            scan_lookup(path, email)
+        scan_time = (time.perf_counter() - start) / scan_lookups
+
+    print(
+        f"{count:>9} users | index build {build_time * 1000:9.1f} ms"
+        f" | indexed lookup {indexed_time * 1e6:8.2f} us"
+        f" | full scan {scan_time * 1000:9.2f} ms"
+        f" | speedup x{scan_time / indexed_time:,.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--scan-lookups", type=int, default=3)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        run(count, args.lookups, args.scan_lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark for FileManager.write_csv in durable mode, fast mode and batched mode.
+
+Each run performs a number of logical writes that each rewrite the whole file (the way
+MealModel.save_meal_plan does after every added meal) and reports the time per write for:
+    - in-place:  the old open(..., "w") rewrite, not crash-safe,
+    - fast:      atomic temp file + os.replace, without fsync,
+    - durable:   atomic temp file + fsync + os.replace + directory fsync,
+    - batched:   durable, with all logical writes grouped into one commit by batch().
+
+Usage (from the repository root):
+    python -m benchmarks.benchmark_write_csv
+    python -m benchmarks.benchmark_write_csv --rows 100 10000 --writes 50
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from utils.file_manager import FileManager
+
+FIELDNAMES = ["day", "meal", "ingredients"]
+
+
+def make_rows(count):
+    """
+    Builds `count` synthetic meal-plan rows.
+    """
+    return [
+        {"day": f"Day {i}", "meal": f"Meal {i}", "ingredients": "rice, beans, onion, tomato"}
+        for i in range(count)
+    ]
+
+
+def in_place(path, rows, writes):
+    for _ in range(writes):
+        with open(path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def atomic(path, rows, writes, durable):
+    file_manager = FileManager(path, durable=durable)
+    for _ in range(writes):
+        file_manager.write_csv(rows, FIELDNAMES)
+
+
+def batched(path, rows, writes):
+    file_manager = FileManager(path, durable=True)
+    with file_manager.batch():
+        for _ in range(writes):
+            file_manager.write_csv(rows, FIELDNAMES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--writes", type=int, default=50, help="logical writes per run")
+    args = parser.parse_args()
+
+    modes = {
+        "in-place": lambda path, rows: in_place(path, rows, args.writes),
+        "fast": lambda path, rows: atomic(path, rows, args.writes, durable=False),
+        "durable": lambda path, rows: atomic(path, rows, args.writes, durable=True),
+        "batched": lambda path, rows: batched(path, rows, args.writes),
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "meal_plan.csv")
+        for count in args.rows:
+            rows = make_rows(count)
+            results = []
+            for name, run in modes.items():
+                start = time.perf_counter()
+                run(path, rows)
+                per_write_ms = (time.perf_counter() - start) * 1000 / args.writes
+                results.append(f"{name} {per_write_ms:8.3f} ms")
+            print(f"{count:>7} rows, {args.writes} writes | " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    main()
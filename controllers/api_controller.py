@@ -0,0 +1,458 @@
+import asyncio
+import json
+import math
+import re
+import signal
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+from controllers.command_controller import CommandController, CommitError
+from controllers.meal_controller import MealController
+from controllers.recipe_controller import RecipeController
+from utils.auth_manager import AuthManager
+from utils.logger import Logger
+from utils.rate_limiter import LoginThrottledError
+from utils.user_repository import normalize_email
+
+
+class ApiError(Exception):
+    """
+    Raised by request handling to answer with a given HTTP status and error message.
+
+    Attributes:
+        status (HTTPStatus): The response status.
+        headers (dict): Extra response headers.
+    """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class ApiController:
+    """
+    Serves the application as a JSON API over HTTP on localhost, so several users can
+    use it at once from one process.
+
+    The server is a small HTTP/1.1 implementation on asyncio streams (keep-alive, JSON
+    bodies, no chunked requests). The event loop only parses requests and writes
+    responses: each request is handled on a thread pool, since the stores do blocking
+    file I/O and logins run bcrypt. Handlers share one RecipeController (its store and
+    indexes are thread-safe) and keep a CommandController per user, whose commands run
+    under a per-user lock. Each request commits its own writes before it is answered.
+
+    Clients log in with `POST /sessions` and send the returned token as
+    `Authorization: Bearer <token>`. Successful responses carry the result as JSON;
+    errors carry `{"error": message}` with a 4xx or 5xx status.
+
+    Endpoints:
+        POST   /users                 {"email", "password"}          register
+        POST   /sessions              {"email", "password"}          log in, returns a token
+        DELETE /sessions                                             log out
+        GET    /recipes               ?start=0&count=50              a page of recipes
+        POST   /recipes               {"name", "ingredients"}        add a recipe
+        GET    /recipes/<id>
+        PUT    /recipes/<id>          {"name", "ingredients"}        edit a recipe
+        DELETE /recipes/<id>
+        GET    /recipes/search        ?ingredients=a,b&match=all     by ingredients
+        GET    /recipes/find          ?name=...                      by name, tolerating typos
+        GET    /recipes/cook          ?pantry=a,b                    what can I cook
+        GET    /meal-plan
+        PUT    /meal-plan             {"Monday": "Pancakes", ...}    plan some days
+        POST   /grocery-list          {"ingredients": {meal: ...}}   generate the grocery list
+
+    Attributes:
+        auth_manager (AuthManager): Checks credentials and issues session tokens.
+        recipe_controller (RecipeController): The recipe store and indexes shared by all users.
+        executor (ThreadPoolExecutor): Runs the request handlers.
+        port (int): The port the server listens on, once started.
+    """
+
+    HOST = "127.0.0.1"
+    DEFAULT_PORT = 8000
+    MAX_BODY_BYTES = 1024 * 1024
+    MAX_HEADERS = 100
+    MAX_USERS = 1000  # Per-user command controllers kept in memory
+    QUERY_INTEGERS = {"start", "count"}
+
+    # (method, path pattern, handler, command run by the "command" handler)
+    ROUTES = [
+        ("POST", r"/users", "register", None),
+        ("POST", r"/sessions", "login", None),
+        ("DELETE", r"/sessions", "logout", None),
+        ("GET", r"/recipes", "command", "recipe list"),
+        ("POST", r"/recipes", "command", "recipe add"),
+        ("GET", r"/recipes/search", "command", "recipe search"),
+        ("GET", r"/recipes/find", "command", "recipe find"),
+        ("GET", r"/recipes/cook", "command", "recipe cook"),
+        ("GET", r"/recipes/(?P<id>\d+)", "command", "recipe get"),
+        ("PUT", r"/recipes/(?P<id>\d+)", "command", "recipe edit"),
+        ("DELETE", r"/recipes/(?P<id>\d+)", "command", "recipe delete"),
+        ("GET", r"/meal-plan", "command", "meal show"),
+        ("PUT", r"/meal-plan", "set_meals", None),
+        ("POST", r"/grocery-list", "command", "grocery"),
+    ]
+    CREATED_COMMANDS = {"recipe add"}
+
+    def __init__(self, workers=None):
+        """
+        Initialize the ApiController.
+
+        Args:
+            workers (int, optional): The number of request handler threads. Defaults to
+                                     the ThreadPoolExecutor default.
+        """
+        self.auth_manager = AuthManager()
+        self.recipe_controller = RecipeController()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.port = None
+        self._routes = [(method, re.compile(pattern + r"/?"), handler, command)
+                        for method, pattern, handler, command in self.ROUTES]
+        self._controllers = OrderedDict()  # email -> (lock, CommandController), least recently used first
+        self._controllers_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ serving
+
+    def run(self, port=DEFAULT_PORT):
+        """
+        Serve until interrupted (Ctrl+C) or terminated (SIGTERM).
+
+        Args:
+            port (int): The port to listen on; 0 picks a free one. Defaults to 8000.
+        """
+        try:
+            asyncio.run(self.serve(port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    async def serve(self, port=DEFAULT_PORT):
+        """
+        Listen on localhost and handle connections until cancelled or sent SIGTERM.
+
+        Args:
+            port (int): The port to listen on; 0 picks a free one. Defaults to 8000.
+        """
+        stopped = asyncio.Event()
+        with suppress(NotImplementedError):  # No loop signal handlers on Windows
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        server = await asyncio.start_server(self._handle_connection, self.HOST, port)
+        self.port = server.sockets[0].getsockname()[1]
+        Logger.log_info(f"API server listening on {self.HOST}:{self.port}")
+        print(f"Serving the meal planner API on http://{self.HOST}:{self.port}/ (Ctrl+C to stop)", flush=True)
+        async with server:
+            await stopped.wait()
+
+    def close(self):
+        """
+        Wait for running requests, background compaction and the index save to finish.
+        """
+        self.executor.shutdown(wait=True)
+        self.recipe_controller.recipe_store.wait_for_compaction()
+        self.recipe_controller.ingredient_index.save()
+        Logger.log_info("API server stopped.")
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Answer the requests of one connection, in order, until it is closed.
+        """
+        peer = writer.get_extra_info("peername")
+        source = peer[0] if peer else "unknown"
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    writer.write(self._encode_response(e.status, {"error": str(e)}, e.headers, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, keep_alive, headers, body = request
+                status, payload, extra_headers = await self._respond(method, target, headers, body, source)
+                writer.write(self._encode_response(status, payload, extra_headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # The client went away
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader):
+        """
+        Read one request from a connection.
+
+        Returns:
+            tuple | None: (method, target, keep_alive, headers, body), or None if the
+                          connection was closed between requests.
+
+        Raises:
+            ApiError: If the request is malformed or too large.
+        """
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= self.MAX_HEADERS:
+                    raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers.")
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:  # A line longer than the stream limit
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request line or header too long.")
+
+        if "transfer-encoding" in headers:
+            raise ApiError(HTTPStatus.NOT_IMPLEMENTED, "Chunked requests are not supported.")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length < 0 or length > self.MAX_BODY_BYTES:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method.upper(), target, keep_alive, headers, body
+
+    @staticmethod
+    def _encode_response(status, payload, headers, keep_alive):
+        """
+        Encode a JSON response.
+
+        Returns:
+            bytes: The status line, headers and body.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _respond(self, method, target, headers, body, source):
+        """
+        Route a request and run its handler on the thread pool.
+
+        Returns:
+            tuple[HTTPStatus, object, dict]: The status, JSON payload and extra headers.
+        """
+        try:
+            handler, command, arguments = self._route(method, target, body)
+            authorization = headers.get("authorization", "")
+            token = authorization[7:].strip() if authorization.lower().startswith("bearer ") else None
+            call = partial(getattr(self, handler), arguments, token, source, *([command] if command else []))
+            status, payload = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            return status, payload, {}
+        except ApiError as e:
+            return e.status, {"error": str(e)}, e.headers
+        except CommitError as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, {}
+        except LoginThrottledError as e:
+            return HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)}, {"Retry-After": str(math.ceil(e.retry_after))}
+        except PermissionError as e:
+            return HTTPStatus.UNAUTHORIZED, {"error": str(e)}, {"WWW-Authenticate": "Bearer"}
+        except LookupError as e:
+            return HTTPStatus.NOT_FOUND, {"error": str(e)}, {}
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}, {}
+        except Exception as e:
+            Logger.log_error(f"Error handling {method} {target}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}, {}
+
+    def _route(self, method, target, body):
+        """
+        Find the handler of a request and gather its arguments from the path, the query
+        string and the JSON body.
+
+        Returns:
+            tuple[str, str | None, dict]: The handler name, its command and the arguments.
+
+        Raises:
+            ApiError: If no route matches, the body isn't a JSON object or it sets a
+                      path parameter (such as a recipe's ID).
+        """
+        url = urlsplit(target)
+        allowed = []
+        for route_method, pattern, handler, command in self._routes:
+            match = pattern.fullmatch(url.path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            arguments = {}
+            if body:
+                try:
+                    arguments = json.loads(body)
+                except ValueError as e:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, f"Request body is not valid JSON: {e}")
+                if not isinstance(arguments, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+            path_arguments = {key: int(value) for key, value in match.groupdict().items()}
+            if path_arguments.keys() & arguments.keys():
+                raise ApiError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"The request body must not set {', '.join(sorted(path_arguments.keys() & arguments.keys()))}; "
+                    "it is taken from the path.",
+                )
+            # The path and query string name the resource, so they win over the body
+            arguments.update(
+                (key, int(value) if key in self.QUERY_INTEGERS and value.lstrip("-").isdigit() else value)
+                for key, value in parse_qsl(url.query)
+            )
+            arguments.update(path_arguments)
+            return handler, command, arguments
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed here.", {"Allow": ", ".join(allowed)})
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+
+    # ------------------------------------------------------------------ handlers (run on the thread pool)
+
+    def _authenticate(self, token):
+        """
+        Returns the email of a session token's user.
+
+        Raises:
+            PermissionError: If the token is missing, invalid, expired or revoked.
+        """
+        email = self.auth_manager.session_manager.validate(token)
+        if email is None:
+            raise PermissionError("Missing, invalid or expired session token.")
+        return email
+
+    def _controller(self, email):
+        """
+        Returns the lock and CommandController of a user, creating them on first use.
+        """
+        with self._controllers_lock:
+            entry = self._controllers.get(email)
+            if entry is None:
+                controller = CommandController(auth_manager=self.auth_manager, recipe_controller=self.recipe_controller)
+                entry = self._controllers[email] = (threading.Lock(), controller)
+                if len(self._controllers) > self.MAX_USERS:
+                    self._controllers.popitem(last=False)
+            else:
+                self._controllers.move_to_end(email)
+            return entry
+
+    @staticmethod
+    def _credentials(arguments):
+        email, password = arguments.get("email"), arguments.get("password")
+        if not isinstance(email, str) or not isinstance(password, str) or not email.strip() or not password.strip():
+            raise ValueError("Email and password must not be empty.")
+        return normalize_email(email), password.strip()
+
+    def register(self, arguments, token, source):
+        """
+        Register a new user.
+
+        Raises:
+            ApiError: 409 if the email is already registered, 500 if the user could not be stored.
+        """
+        email, password = self._credentials(arguments)
+        try:
+            created = self.auth_manager.create_user(email, password)
+        except OSError as e:
+            # Not left to the generic handler: a PermissionError here is the file's, not the client's
+            Logger.log_error(f"Error storing user {email}: {e}")
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "Could not store the user.")
+        if not created:
+            raise ApiError(HTTPStatus.CONFLICT, "Email already registered.")
+        Logger.log_info(f"User registered through the API: {email}")
+        return HTTPStatus.CREATED, {"email": email}
+
+    def login(self, arguments, token, source):
+        """
+        Check a user's credentials and start a session.
+
+        Raises:
+            LoginThrottledError: If too many attempts were made for the email or from the client.
+            ApiError: 401 if the credentials are invalid.
+        """
+        email, password = self._credentials(arguments)
+        if not self.auth_manager.verify_credentials(email, password, source=source):
+            Logger.log_warning(f"Failed API login attempt for email: {email}")
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Invalid email or password.")
+        token = self.auth_manager.session_manager.issue(email)
+        Logger.log_info(f"User logged in through the API: {email}")
+        return HTTPStatus.CREATED, {"email": email, "token": token}
+
+    def logout(self, arguments, token, source):
+        """
+        End the session of the request's token, saving the user's buffered meal changes first.
+        """
+        email = self._authenticate(token)
+        with self._controllers_lock:
+            entry = self._controllers.get(email)
+        if entry is not None:
+            lock, controller = entry
+            with lock:
+                controller.meal_controller.flush()
+        self.auth_manager.session_manager.revoke(token)
+        Logger.log_info(f"User logged out through the API: {email}")
+        return HTTPStatus.OK, {"email": email}
+
+    @staticmethod
+    def _commit(controller):
+        """
+        Commit a request's writes. If that fails the request is answered with an error,
+        so its meal changes are dropped rather than applied by the user's next request.
+        """
+        try:
+            controller.commit()
+        except CommitError:
+            controller.discard()
+            raise
+
+    def command(self, arguments, token, source, command):
+        """
+        Run a CommandController command as the request's user and commit its writes.
+        """
+        email = self._authenticate(token)
+        lock, controller = self._controller(email)
+        with lock:
+            controller.switch_user(email)
+            try:
+                result = controller.dispatch({**arguments, "command": command})
+            finally:
+                self._commit(controller)
+        return (HTTPStatus.CREATED if command in self.CREATED_COMMANDS else HTTPStatus.OK), result
+
+    def set_meals(self, arguments, token, source):
+        """
+        Plan the meals of some days with a single meal plan write, and return the plan.
+        """
+        email = self._authenticate(token)
+        for day, meal in arguments.items():
+            if day.strip().capitalize() not in MealController.DAYS or not isinstance(meal, str):
+                raise ValueError(f"Expected day names mapped to meals, got {day!r}: {meal!r}.")
+        lock, controller = self._controller(email)
+        with lock:
+            controller.switch_user(email)
+            try:
+                for day, meal in arguments.items():
+                    controller.dispatch({"command": "meal set", "day": day, "meal": meal})
+            finally:
+                self._commit(controller)
+            return HTTPStatus.OK, controller.dispatch({"command": "meal show"})
@@ -0,0 +1,472 @@
+import inspect
+import json
+from contextlib import ExitStack
+from controllers.meal_controller import MealController
+from controllers.recipe_controller import RecipeController
+from utils.auth_manager import AuthManager
+from utils.grocery_list import format_quantity
+from utils.logger import Logger
+from utils.recipe_search import normalize_name
+from utils.user_repository import normalize_email
+
+
+class CommitError(Exception):
+    """
+    Raised when the writes gathered in a batch could not be committed.
+
+    Attributes:
+        commands (list[str]): The commands whose writes were not committed, e.g.
+                              "line 3 (meal set)". Their meal changes stay pending and are
+                              retried by the next commit.
+    """
+
+    def __init__(self, commands, error):
+        super().__init__(f"Could not commit the writes of {', '.join(commands) or 'the batch'}: {error}")
+        self.commands = commands
+
+
+class CommandController:
+    """
+    Runs commands without prompts, for scripted imports and nightly jobs.
+
+    A command is a dictionary naming the command and its arguments, e.g.
+    `{"command": "recipe add", "name": "Pancakes", "ingredients": "2 cups flour, 1 egg"}`;
+    `main.py` builds them from its command line or reads one per line of a JSONL stream.
+    Commands call the same controllers and stores as the interactive menus.
+
+    The user authenticates once for the whole batch. Writes are committed in batches:
+    recipe changes go through `RecipeStore.batch()` (one journal fsync per batch) and
+    meal changes are gathered and saved with a single meal plan write, either every
+    `batch_size` writes or before a command that reads what they change. If a commit
+    fails, the command that triggered it (or, at the end of a run, an extra result)
+    fails with a CommitError naming the commands whose writes were not committed.
+
+    Commands:
+        user register   email, password
+        recipe add      name, ingredients
+        recipe edit     id, name, ingredients
+        recipe delete   id
+        recipe get      id
+        recipe list     [start], [count]
+        recipe search   ingredients, [match] ("all" or "any")
+        recipe find     name
+        recipe cook     pantry
+        meal set        day, meal
+        meal show
+        grocery         [ingredients] ({meal: ingredients} for meals without a recipe)
+
+    Attributes:
+        auth_manager (AuthManager): Authenticates the batch's user.
+        current_user (str): The email of the user the commands run as.
+        recipe_controller (RecipeController): Holds the recipe store and its indexes.
+        meal_controller (MealController): Holds the user's meal plan and grocery list.
+        batch_size (int): The number of writes committed together.
+    """
+
+    COMMANDS = {
+        "user register": "register_user",
+        "recipe add": "add_recipe",
+        "recipe edit": "edit_recipe",
+        "recipe delete": "delete_recipe",
+        "recipe get": "get_recipe",
+        "recipe list": "list_recipes",
+        "recipe search": "search_by_ingredients",
+        "recipe find": "search_by_name",
+        "recipe cook": "what_can_i_cook",
+        "meal set": "set_meal",
+        "meal show": "show_meal_plan",
+        "grocery": "grocery_list",
+    }
+    PUBLIC_COMMANDS = {"user register"}
+    # Command -> argument -> expected JSON type; None is accepted where it is the default
+    ARGUMENT_TYPES = {
+        "user register": {"email": str, "password": str},
+        "recipe add": {"name": str, "ingredients": str},
+        "recipe edit": {"id": int, "name": str, "ingredients": str},
+        "recipe delete": {"id": int},
+        "recipe get": {"id": int},
+        "recipe list": {"start": int, "count": int},
+        "recipe search": {"ingredients": str, "match": str},
+        "recipe find": {"name": str},
+        "recipe cook": {"pantry": str},
+        "meal set": {"day": str, "meal": str},
+        "grocery": {"ingredients": dict},
+    }
+    TYPE_NAMES = {int: "an integer", str: "a string", dict: "an object"}
+
+    def __init__(self, batch_size=500, auth_manager=None, recipe_controller=None):
+        """
+        Initialize the CommandController.
+
+        Args:
+            batch_size (int): The number of writes committed together. Defaults to 500.
+            auth_manager (AuthManager, optional): The authentication manager to use.
+                Defaults to a new one.
+            recipe_controller (RecipeController, optional): The recipe controller to use,
+                so several command controllers can share one recipe store and its indexes.
+                Defaults to a new one.
+        """
+        self.auth_manager = auth_manager or AuthManager()
+        self.recipe_controller = recipe_controller or RecipeController()
+        self.meal_controller = MealController(self.recipe_controller.recipe_store, self.recipe_controller.search_engine)
+        self.current_user = None
+        self.batch_size = batch_size
+        self._batch = ExitStack()
+        self._recipe_batch_open = False
+        self._pending_meals = {}
+        self._writes = 0
+        self._uncommitted = []  # (description, command name) of the writes since the last commit
+        self._running = None  # (description, command name) of the command being run
+        self._signatures = {}  # command name -> signature of its method
+
+    # ------------------------------------------------------------------ authentication
+
+    def authenticate(self, email=None, password=None):
+        """
+        Authenticate the batch's user with an email and password, or by resuming the
+        session remembered by the interactive application.
+
+        Args:
+            email (str, optional): The user's email address.
+            password (str, optional): The user's password.
+
+        Returns:
+            bool: True if a user is authenticated, False otherwise.
+
+        Raises:
+            LoginThrottledError: If too many attempts were made for the email.
+        """
+        if email:
+            email = normalize_email(email)
+            if not password or not self.auth_manager.verify_credentials(email, password):
+                Logger.log_warning(f"Failed batch login attempt for email: {email}")
+                return False
+            self.auth_manager.current_user = email
+        elif not self.auth_manager.resume_session():
+            return False
+        self.switch_user(self.auth_manager.current_user)
+        Logger.log_info(f"Batch authenticated as {self.current_user}")
+        return True
+
+    def switch_user(self, email):
+        """
+        Run the following commands as a user who was authenticated by the caller.
+
+        Args:
+            email (str): The user's email address.
+        """
+        self.commit()
+        self.meal_controller.switch_user(email)
+        self.current_user = email
+
+    # ------------------------------------------------------------------ running commands
+
+    def execute(self, command, label=None):
+        """
+        Run one command.
+
+        Args:
+            command (dict): The command name under "command" and its arguments.
+            label (str, optional): Where the command came from (e.g. "line 3"), to name it
+                                   if its writes can't be committed.
+
+        Returns:
+            dict: {"ok": True, "result": ...} or {"ok": False, "error": message}.
+        """
+        try:
+            return {"ok": True, "result": self.dispatch(command, label)}
+        except Exception as e:
+            return self._failure(command.get("command") if isinstance(command, dict) else None, str(e))
+
+    def dispatch(self, command, label=None):
+        """
+        Run one command and return its result, raising if it fails.
+
+        Args:
+            command (dict): The command name under "command" and its arguments.
+            label (str, optional): Where the command came from, as in `execute`.
+
+        Returns:
+            object: The command's result (JSON-serializable).
+
+        Raises:
+            ValueError: If the command is unknown, its arguments don't match or are invalid.
+            PermissionError: If the command needs an authenticated user and there is none.
+            LookupError: If the command refers to a recipe that doesn't exist.
+            CommitError: If the command had to commit the batch and that failed.
+        """
+        name = command.get("command") if isinstance(command, dict) else None
+        if name not in self.COMMANDS:
+            raise ValueError(f"Unknown command: {name!r}")
+        if name not in self.PUBLIC_COMMANDS and self.current_user is None:
+            raise PermissionError("Not authenticated.")
+        handler = getattr(self, self.COMMANDS[name])
+        arguments = {key: value for key, value in command.items() if key != "command"}
+        if name not in self._signatures:
+            self._signatures[name] = inspect.signature(handler)
+        try:
+            self._signatures[name].bind(**arguments)
+        except TypeError as e:
+            raise ValueError(f"Invalid arguments: {e}")
+        parameters = self._signatures[name].parameters
+        for key, value in arguments.items():
+            expected = self.ARGUMENT_TYPES.get(name, {}).get(key)
+            if expected is None or (value is None and parameters[key].default is None):
+                continue
+            if not isinstance(value, expected) or (isinstance(value, bool) and expected is int):
+                raise ValueError(f"Invalid arguments: {key} must be {self.TYPE_NAMES[expected]}, got {value!r}.")
+        self._running = (f"{label} ({name})" if label else name, name)
+        return handler(**arguments)
+
+    @staticmethod
+    def _failure(name, message):
+        Logger.log_error(f"Command {name!r} failed: {message}")
+        return {"ok": False, "error": message}
+
+    def run(self, lines):
+        """
+        Run a stream of JSONL commands, committing writes in batches.
+
+        Args:
+            lines (Iterable[str]): One JSON command per line. Blank lines are skipped.
+
+        Yields:
+            dict: The result of each command, in order (see `execute`).
+        """
+        try:
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    command = json.loads(line)
+                except ValueError as e:
+                    yield self._failure(None, f"Line {number} is not valid JSON: {e}")
+                    continue
+                yield self.execute(command, f"line {number}")
+        except BaseException:
+            self.commit()
+            raise
+        failure = self.finish()
+        if failure is not None:
+            yield failure
+
+    def finish(self):
+        """
+        Commit the remaining writes at the end of a run.
+
+        Returns:
+            dict | None: A failure result (see `execute`) naming the commands whose writes
+                         could not be committed, or None if the commit succeeded.
+        """
+        try:
+            self.commit()
+        except CommitError as e:
+            return self._failure(None, str(e))
+        return None
+
+    def _written(self):
+        self._writes += 1
+        self._uncommitted.append(self._running or (None, None))
+        if self._writes >= self.batch_size:
+            self.commit()
+
+    def _recipe_store(self):
+        """
+        Returns the recipe store for a write, opening a recipe batch if none is open.
+        """
+        store = self.recipe_controller.recipe_store
+        if not self._recipe_batch_open:
+            self._batch.enter_context(store.batch())
+            self._recipe_batch_open = True
+        return store
+
+    def commit(self):
+        """
+        Commit the writes of the current batch: save the gathered meal changes and end the
+        recipe batch. Meal changes are only dropped once they are saved; if saving fails
+        they stay pending, so the next commit retries them.
+
+        Raises:
+            CommitError: If the meal plan or the recipe batch could not be written.
+        """
+        meal_error = recipe_error = None
+        try:
+            if self._pending_meals:
+                self.meal_controller.save_meal_plan(self._pending_meals)
+                self._pending_meals = {}
+        except Exception as e:
+            meal_error = e
+        try:
+            self._batch.close()
+        except Exception as e:
+            recipe_error = e
+        finally:
+            self._batch = ExitStack()
+            self._recipe_batch_open = False
+        if meal_error or recipe_error:
+            failed = [description for description, name in self._uncommitted
+                      if description and (meal_error if name == "meal set" else recipe_error)]
+            error = meal_error or recipe_error
+            Logger.log_error(f"Failed to commit a batch of {self._writes} writes: {error}")
+            # The recipe batch is over either way; only the pending meal changes remain
+            self._uncommitted = [write for write in self._uncommitted if write[1] == "meal set" and meal_error]
+            self._writes = len(self._uncommitted)
+            raise CommitError(list(dict.fromkeys(failed)), error) from error
+        if self._writes:
+            Logger.log_info(f"Committed a batch of {self._writes} writes.")
+        self._writes = 0
+        self._uncommitted = []
+
+    def discard(self):
+        """
+        Drop the meal changes left pending by a failed commit, for callers that have
+        already reported them as failed and must not apply them later.
+        """
+        if self._pending_meals:
+            Logger.log_warning(f"Discarding {len(self._pending_meals)} uncommitted meal changes.")
+        self._pending_meals = {}
+        self._uncommitted = []
+        self._writes = 0
+
+    # ------------------------------------------------------------------ commands
+
+    def register_user(self, email, password):
+        """
+        Register a new user.
+
+        Raises:
+            ValueError: If the email or password is empty or the email is taken.
+        """
+        email, password = normalize_email(email), password.strip()
+        if not email or not password:
+            raise ValueError("Email and password must not be empty.")
+        if not self.auth_manager.create_user(email, password):
+            raise ValueError("Email already registered.")
+        Logger.log_info(f"User registered: {email}")
+        return {"email": email}
+
+    @staticmethod
+    def _recipe(recipe_id, row):
+        return {"id": recipe_id, "name": row[0], "ingredients": row[1]}
+
+    def add_recipe(self, name, ingredients):
+        """
+        Add a recipe and return its ID.
+        """
+        recipe_id = self._recipe_store().add(name, ingredients)
+        self._written()
+        return {"id": recipe_id}
+
+    def edit_recipe(self, id, name, ingredients):
+        """
+        Replace a recipe's name and ingredients, by ID (as returned by `recipe add` or
+        `recipe list`; IDs don't change during a batch).
+
+        Raises:
+            LookupError: If there is no such recipe.
+        """
+        store = self._recipe_store()
+        if store.get(id) is None:
+            raise LookupError(f"No recipe with ID {id}.")
+        store.edit(id, name, ingredients)
+        self._written()
+        return {"id": id}
+
+    def delete_recipe(self, id):
+        """
+        Delete a recipe by ID.
+
+        Raises:
+            LookupError: If there is no such recipe.
+        """
+        store = self._recipe_store()
+        if store.get(id) is None:
+            raise LookupError(f"No recipe with ID {id}.")
+        store.delete(id)
+        self._written()
+        return {"id": id}
+
+    def get_recipe(self, id):
+        """
+        Return a recipe by ID.
+
+        Raises:
+            LookupError: If there is no such recipe.
+        """
+        row = self.recipe_controller.recipe_store.get(id)
+        if row is None:
+            raise LookupError(f"No recipe with ID {id}.")
+        return self._recipe(id, row)
+
+    def list_recipes(self, start=0, count=50):
+        """
+        List a page of recipes in display order.
+        """
+        return [self._recipe(recipe_id, row) for recipe_id, row in self.recipe_controller.recipe_store.page(start, count)]
+
+    def search_by_ingredients(self, ingredients, match="all"):
+        """
+        List the recipes using all (or, with match "any", any) of the comma-separated ingredients.
+        """
+        store = self.recipe_controller.recipe_store
+        recipe_ids = self.recipe_controller.ingredient_index.search(ingredients.split(","), match_all=match != "any")
+        return [self._recipe(recipe_id, store.get(recipe_id)) for recipe_id in recipe_ids if store.get(recipe_id)]
+
+    def search_by_name(self, name):
+        """
+        List the recipes matching a name or the start of one, tolerating typos.
+        """
+        store = self.recipe_controller.recipe_store
+        results = self.recipe_controller.search_engine.search(name)
+        return [self._recipe(recipe_id, store.get(recipe_id)) for recipe_id, _ in results if store.get(recipe_id)]
+
+    def what_can_i_cook(self, pantry):
+        """
+        List the recipes that can be cooked with the comma-separated pantry ingredients,
+        and those missing only one or two.
+        """
+        matches = self.recipe_controller.pantry_matcher.what_can_i_cook(pantry.split(","))
+        return {
+            "cookable": [name for _, name in matches["cookable"]],
+            "almost": [{"name": name, "missing": missing} for _, name, missing in matches["almost"]],
+        }
+
+    def set_meal(self, day, meal):
+        """
+        Plan the meal of a day. Saved with the next commit.
+
+        Raises:
+            ValueError: If the day isn't a day of the week.
+        """
+        day = day.strip().capitalize()
+        if day not in self.meal_controller.DAYS:
+            raise ValueError(f"Unknown day: {day}")
+        self._pending_meals[day] = meal
+        self._written()
+        return {"day": day, "meal": meal}
+
+    def show_meal_plan(self):
+        """
+        Return the user's meal plan, day -> meal.
+        """
+        self.commit()
+        return self.meal_controller.read_meal_plan()
+
+    def grocery_list(self, ingredients=None):
+        """
+        Generate and save the user's grocery list. Meals without a recipe are listed as
+        pending unless their ingredients are given.
+        """
+        if any(not isinstance(value, str) for value in (ingredients or {}).values()):
+            raise ValueError("Invalid arguments: ingredients must map meal names to strings.")
+        self.commit()
+        self.meal_controller.refresh_grocery_list()
+        entered = {normalize_name(meal): value for meal, value in (ingredients or {}).items()}
+        grocery_list, pending = self.meal_controller.resolve_pending_meals(entered)
+        return {
+            "items": [
+                {"item": item, "quantity": format_quantity(quantity, unit)}
+                for (item, unit), quantity in grocery_list.items()
+            ],
+            "pending": sorted(set(pending.values())),
+        }
@@ -1,7 +1,16 @@
-import csv
+import atexit
+import json
 import os
+import threading
+from utils.config_manager import ConfigManager
 from utils.folder_manager import ensure_data_folder_exists
+from utils.file_manager import FileManager
+from utils.grocery_list import GroceryTally, format_quantity, join_meals_to_recipes
 from utils.logger import Logger
+from utils.recipe_search import RecipeSearchEngine, normalize_name
+from utils.recipe_store import RecipeStore
+from utils.user_partitions import UserPartitions
+from views.paginated_view import PaginatedView
 
 class MealController:
     """
@@ -10,20 +19,94 @@ class MealController:
     This class provides functionalities to create, view, and update meal plans
     and generate corresponding grocery lists. It ensures required files exist and
     logs all critical operations.
+
+    By default every saved change rewrites the meal plan file and the grocery list. In
+    write-behind mode (the "meal_write_behind" setting) a change is instead appended, and
+    fsynced, to a small journal next to the meal plan before it is acknowledged, and the
+    files are rewritten once for many changes: after `flush_interval` seconds, once
+    `flush_batch_size` changes are waiting, on logout, when switching users, before the
+    grocery list or the paginated plan is read, and at interpreter exit. Reads of the plan
+    include the journaled changes. Changes still in the journal after a crash are saved
+    on the next start; a change is a day's new meal, so replaying a journal that was
+    already saved just writes the same meals again.
     """
 
-    def __init__(self):
+    DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+    def __init__(self, recipe_store=None, search_engine=None, write_behind=None, flush_interval=5.0,
+                 flush_batch_size=50):
         """
         Initialize the MealController.
 
         Ensures the necessary data folders and CSV files (meal_plan.csv, grocery_list.csv) exist.
+        Until `switch_user` is called, the shared files in the data folder are used.
+
+        Args:
+            recipe_store (RecipeStore, optional): The recipe store grocery lists are resolved
+                                                  against. Defaults to a store over data/recipes.csv.
+            search_engine (RecipeSearchEngine, optional): The name index of `recipe_store`, used to
+                                                          find a planned meal's recipe. Defaults to
+                                                          a new one.
+            write_behind (bool, optional): Whether to buffer meal changes in the journal.
+                                           Defaults to the "meal_write_behind" setting (off).
+            flush_interval (float): Seconds before buffered changes are flushed; 0 disables the
+                                    timer. Defaults to 5.0.
+            flush_batch_size (int): Buffered changes that trigger a flush. Defaults to 50.
+        """
+        self.recipe_store = recipe_store or RecipeStore(os.path.join(ensure_data_folder_exists(), "recipes.csv"))
+        self.search_engine = search_engine or RecipeSearchEngine(self.recipe_store)
+        self.partitions = UserPartitions(os.path.join(ensure_data_folder_exists(), "partitions"))
+        self.write_behind = ConfigManager().get("meal_write_behind", False) if write_behind is None else write_behind
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._lock = threading.RLock()
+        self._unsaved = 0  # Changes this process journaled since the last flush
+        self._timer = None
+        self.current_user = None
+        self.use_folder(ensure_data_folder_exists())
+        if self.write_behind:
+            atexit.register(self.close)
+
+    def use_folder(self, folder):
+        """
+        Point the controller at the meal plan and grocery list files in a folder.
+
+        Ensures the CSV files exist and loads the grocery tally saved there. Changes left in
+        the folder's write-behind journal by a crash are saved.
+
+        Args:
+            folder (str): The folder holding meal_plan.csv and grocery_list.csv.
         """
-        self.meal_plan_path = os.path.join(ensure_data_folder_exists(), "meal_plan.csv")
-        self.grocery_list_path = os.path.join(ensure_data_folder_exists(), "grocery_list.csv")
+        self.meal_plan_path = os.path.join(folder, "meal_plan.csv")
+        self.journal_path = os.path.splitext(self.meal_plan_path)[0] + ".journal"
+        self.grocery_list_path = os.path.join(folder, "grocery_list.csv")
+        self.meal_plan_file = FileManager(self.meal_plan_path, snapshot=True)
+        self.grocery_list_file = FileManager(self.grocery_list_path)
+        self.grocery_tally = GroceryTally(os.path.splitext(self.meal_plan_path)[0] + ".grocery.json")
         
         # Ensure required CSV files exist with proper headers
         self.create_meal_plan_csv_if_not_exists()
         self.create_grocery_list_csv_if_not_exists()
+        self.load_grocery_tally()
+        if os.path.exists(self.journal_path):
+            Logger.log_info(f"Recovering unsaved meal changes from {self.journal_path}.")
+            self.flush()
+
+    def switch_user(self, email):
+        """
+        Switch to the meal plan and grocery list of a user, kept in the user's own data
+        partition (see `UserPartitions`), so users never overwrite each other's plans.
+
+        Args:
+            email (str): The logged-in user's email address.
+        """
+        if email == self.current_user:
+            return
+        with self._lock:
+            self.flush()
+            self.use_folder(self.partitions.folder(email))
+            self.current_user = email
+        Logger.log_info(f"Using the meal plan of {email}.")
 
     def create_meal_plan_csv_if_not_exists(self):
         """
@@ -31,14 +114,11 @@ class MealController:
 
         Logs an error if file creation fails.
         """
-        if not os.path.exists(self.meal_plan_path):
-            try:
-                with open(self.meal_plan_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["Day", "Meal"])  # Headers for meal plan
+        try:
+            if self.meal_plan_file.create_if_missing(["Day", "Meal"]):  # Headers for meal plan
                 Logger.log_info(f"Created new meal plan CSV file with headers: {self.meal_plan_path}")
-            except Exception as e:
-                Logger.log_error(f"Error creating meal plan CSV file: {e}")
+        except Exception as e:
+            Logger.log_error(f"Error creating meal plan CSV file: {e}")
 
     def create_grocery_list_csv_if_not_exists(self):
         """
@@ -46,57 +126,368 @@ class MealController:
 
         Logs an error if file creation fails.
         """
-        if not os.path.exists(self.grocery_list_path):
-            try:
-                with open(self.grocery_list_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["Item"])  # Header for grocery list
+        try:
+            if self.grocery_list_file.create_if_missing(["Item", "Quantity"]):  # Headers for grocery list
                 Logger.log_info(f"Created new grocery list CSV file with headers: {self.grocery_list_path}")
+        except Exception as e:
+            Logger.log_error(f"Error creating grocery list CSV file: {e}")
+
+    def load_grocery_tally(self):
+        """
+        Load the materialized grocery list saved with the meal plan, rebuilding it from the
+        meal plan if it is missing or the meal plan was changed outside the application,
+        and bring it up to date with recipes edited or deleted since it was saved.
+
+        Logs an error if rebuilding fails.
+        """
+        with self.meal_plan_file.lock.exclusive():
+            # A tally saved before entries recorded their recipes can't be checked; rebuild it
+            if self.grocery_tally.load(self.meal_plan_file.signature()) and self.grocery_tally.recipes_version is not None:
+                if self.check_grocery_recipes():
+                    self.save_grocery_list()
+                return
+            try:
+                recipes_version = self._recipes_version()
+                _, rows = self.meal_plan_file.read_rows()
+                self.grocery_tally.clear()
+                self.update_grocery_tally({row[0]: row[1] for row in rows if len(row) > 1})
+                self.grocery_tally.recipes_version = recipes_version
+                self.save_grocery_list()
+                Logger.log_info(f"Rebuilt grocery tally from the meal plan ({len(rows)} days).")
             except Exception as e:
-                Logger.log_error(f"Error creating grocery list CSV file: {e}")
+                Logger.log_error(f"Error rebuilding grocery tally: {e}")
+
+    def _recipes_version(self):
+        return json.loads(json.dumps(self.recipe_store.version()))  # Tuples round-trip as lists
+
+    def check_grocery_recipes(self):
+        """
+        Re-resolve the days of the grocery tally whose recipe was edited, renamed or
+        deleted since the tally was last checked, in this process or another one.
+        Costs one recipe lookup per planned day, and nothing if the recipes are unchanged.
+
+        Returns:
+            bool: True if the tally changed and needs saving, False otherwise.
+        """
+        version = self._recipes_version()  # Read first, so a concurrent change is caught next time
+        if self.grocery_tally.recipes_version == version:
+            return False
+        meal_plan = self._read_saved_meal_plan()
+        stale = {}
+        for day, recipe_id in self.grocery_tally.recipe_ids.items():
+            meal = meal_plan.get(day, "")
+            row = self.recipe_store.get(recipe_id)
+            if (row is None or row[1] != self.grocery_tally.entries.get(day)
+                    or normalize_name(row[0]) != normalize_name(meal)):
+                stale[day] = meal
+        self.update_grocery_tally(stale)
+        self.grocery_tally.recipes_version = version
+        if stale:
+            Logger.log_info(f"Re-resolved grocery list days after recipe changes: {sorted(stale)}.")
+        return True
+
+    def update_grocery_tally(self, changed_days):
+        """
+        Apply changed days of the meal plan to the grocery tally.
+
+        Only the changed meals are matched to recipes, and only the recipes with their
+        names are read, found through the name index; each day's old contribution is
+        subtracted and the new one added. Meals without a matching recipe are kept as
+        pending until `generate_grocery_list` asks for their ingredients.
+
+        Args:
+            changed_days (dict[str, str]): Day -> its new meal.
+        """
+        if not changed_days:
+            return
+        meals = list(changed_days.values())
+        candidates = sorted({recipe_id for meal in meals for recipe_id in self.search_engine.lookup(meal)})
+        # The join re-checks every name, so a recipe renumbered after the lookup can't match the wrong meal
+        rows = ((recipe_id, self.recipe_store.get(recipe_id)) for recipe_id in candidates)
+        matched, _ = join_meals_to_recipes(meals, ((recipe_id, row) for recipe_id, row in rows if row is not None))
+        for day, meal in changed_days.items():
+            recipe_id, ingredients = matched.get(normalize_name(meal), (None, None))
+            if ingredients:
+                self.grocery_tally.set_entry(day, ingredients, recipe_id)
+            elif meal.strip():
+                self.grocery_tally.set_pending(day, meal)
+            else:
+                self.grocery_tally.remove_entry(day)
+
+    def save_grocery_list(self):
+        """
+        Save the grocery tally next to the meal plan and write the grocery list file from it.
+        Costs O(distinct items); nothing is re-aggregated.
+
+        Returns:
+            dict[tuple[str, str], float]: The grocery list, (item, unit) -> quantity.
+        """
+        self.grocery_tally.save(self.meal_plan_file.signature())
+        grocery_list = self.grocery_tally.totals()
+        self.grocery_list_file.write_csv(
+            [
+                {"Item": item, "Quantity": format_quantity(quantity, unit)}
+                for (item, unit), quantity in grocery_list.items()
+            ],
+            ["Item", "Quantity"],
+        )
+        return grocery_list
 
     def plan_meals(self):
         """
         Prompt the user to plan meals for the week and save them to the meal plan file.
 
+        The grocery tally is updated with just the days whose meal changed and saved with
+        the plan, so the grocery list file stays current.
+
+        If another process saved the meal plan while the user was typing, only the days
+        the user actually changed are applied on top of that newer plan, so neither
+        update is lost.
+
         Logs an error if saving the meal plan fails.
         """
         Logger.log_info("Starting meal planning process.")
         print("\n=== Plan Meals ===")
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+        base_version = self.version()
+        base = self.read_meal_plan()
         meal_plan = {}
-        for day in days:
+        for day in self.DAYS:
             meal = input(f"Enter meal for {day}: ")
             meal_plan[day] = meal
         try:
-            with open(self.meal_plan_path, mode="w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Day", "Meal"])  # Re-add headers
-                for day, meal in meal_plan.items():
-                    writer.writerow([day, meal])
+            self.save_meal_plan(meal_plan, base, base_version)
             Logger.log_info("Meal plan saved successfully.")
             print("Meal plan saved successfully!")
         except Exception as e:
             Logger.log_error(f"Error saving meal plan: {e}")
 
+    def read_meal_plan(self):
+        """
+        Read the current meal plan, without prompting, including the changes still waiting
+        in the write-behind journal.
+
+        Returns:
+            dict[str, str]: Day -> meal, in file order.
+        """
+        meal_plan = self._read_saved_meal_plan()
+        meal_plan.update(self._read_journal())
+        return meal_plan
+
+    def _read_saved_meal_plan(self):
+        """
+        Reads the meal plan file alone, which is what the grocery tally reflects.
+        """
+        _, rows = self.meal_plan_file.read_rows()
+        return {row[0]: row[1] for row in rows if len(row) > 1}
+
+    def version(self):
+        """
+        Returns the version of the meal plan, which changes whenever the meal plan file
+        does or a change is added to the write-behind journal.
+
+        Returns:
+            tuple[int, int]: The meal plan file's `version()` and the journal's size.
+        """
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            journal_size = 0
+        return self.meal_plan_file.version(), journal_size
+
+    def save_meal_plan(self, changes, base=None, base_version=None):
+        """
+        Save meals for some or all days of the week, without prompting. Days not in
+        `changes` keep their current meal.
+
+        The grocery tally is updated with just the days whose meal changed and saved with
+        the plan. If `base_version` is given and another process saved the meal plan
+        since it was read, only the days that differ from `base` are applied on top of
+        the newer plan, so neither update is lost. In write-behind mode the changes are
+        journaled, and the files are rewritten by a later `flush`.
+
+        Args:
+            changes (dict[str, str]): Day -> meal.
+            base (dict[str, str], optional): The plan the changes were made against.
+            base_version (tuple, optional): The meal plan's `version()` when `base` was read.
+
+        Returns:
+            dict[str, str]: The saved meal plan, day -> meal.
+
+        Raises:
+            OSError: If the meal plan (or in write-behind mode, the journal) could not be written.
+        """
+        with self._lock, self.meal_plan_file.lock.exclusive():
+            if base_version is not None and self.version() != base_version:
+                changes = {day: meal for day, meal in changes.items() if (base or {}).get(day) != meal}
+                Logger.log_info(f"Meal plan changed concurrently; applied only {sorted(changes)}.")
+            if not self.write_behind:
+                return self._write_meal_plan(changes)
+            current = self.read_meal_plan()
+            self._append_journal({day: meal for day, meal in changes.items() if day in self.DAYS})
+            self._unsaved += 1
+            if self._unsaved >= self.flush_batch_size:
+                self.flush()
+            elif self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return {day: changes.get(day, current.get(day, "")) for day in self.DAYS}
+
+    def _write_meal_plan(self, changes):
+        """
+        Rewrites the meal plan file with the journaled changes and then `changes` applied,
+        updates and saves the grocery list, and clears the journal. The caller holds the
+        meal plan's exclusive lock.
+        """
+        previous = self._read_saved_meal_plan()
+        current = {**previous, **self._read_journal()}
+        meal_plan = {day: changes.get(day, current.get(day, "")) for day in self.DAYS}
+        self.load_grocery_tally()  # Another process may have updated it with the plan
+        self.meal_plan_file.write_csv(
+            [{"Day": day, "Meal": meal} for day, meal in meal_plan.items()], ["Day", "Meal"]
+        )
+        for day in previous.keys() - meal_plan.keys():
+            self.grocery_tally.remove_entry(day)
+        self.update_grocery_tally(
+            {day: meal for day, meal in meal_plan.items() if previous.get(day) != meal
+             or (day not in self.grocery_tally.entries and day not in self.grocery_tally.pending)}
+        )
+        self.save_grocery_list()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._unsaved = 0
+        return meal_plan
+
+    # ------------------------------------------------------------------ write-behind journal
+
+    def _append_journal(self, changes):
+        """
+        Durably appends a change (day -> meal) to the journal.
+        """
+        with open(self.journal_path, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(changes) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read_journal(self):
+        """
+        Returns the changes in the journal, merged in order (day -> meal).
+        """
+        try:
+            with open(self.journal_path, mode="r", encoding="utf-8") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return {}
+        changes = {}
+        for number, line in enumerate(lines, start=1):
+            try:
+                changes.update({day: meal for day, meal in json.loads(line).items() if isinstance(meal, str)})
+            except (ValueError, AttributeError):
+                # A crash mid-append can only damage the last line
+                Logger.log_warning(f"Ignoring damaged meal plan journal line {number}.")
+        return changes
+
+    def flush(self):
+        """
+        Save the changes waiting in the write-behind journal to the meal plan file and the
+        grocery list, and clear the journal. Does nothing if no changes are waiting.
+
+        Returns:
+            bool: False if saving failed (the changes stay in the journal), otherwise True.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                with self.meal_plan_file.lock.exclusive():
+                    if not os.path.exists(self.journal_path):
+                        self._unsaved = 0  # Another process saved them
+                        return True
+                    self._write_meal_plan({})
+            except Exception as e:
+                Logger.log_error(f"Error flushing meal plan: {e}")
+                return False
+            Logger.log_info("Flushed buffered meal changes to the meal plan.")
+            return True
+
+    def on_logout(self, email):
+        """
+        Flush buffered meal changes before the user is logged out (see `AuthManager.subscribe`).
+
+        Args:
+            email (str): The user being logged out.
+        """
+        self.flush()
+
+    def close(self):
+        """
+        Flush buffered meal changes and stop the flush timer. Registered with `atexit` in
+        write-behind mode.
+        """
+        self.flush()
+        atexit.unregister(self.close)
+
+    def refresh_grocery_list(self):
+        """
+        Bring the grocery list up to date with the meal plan and the recipes, without
+        prompting: planned meals that have gained a recipe since are resolved.
+
+        Returns:
+            dict[str, str]: Day -> meal for the planned meals that still have no recipe,
+                            whose ingredients have to be entered (see `resolve_pending_meals`).
+        """
+        self.flush()  # The grocery list is kept with the meal plan file
+        with self.meal_plan_file.lock.exclusive():
+            self.load_grocery_tally()  # Another process may have changed the plan
+            if self.grocery_tally.pending:
+                # A recipe may have been added since the meal was planned
+                self.update_grocery_tally(dict(self.grocery_tally.pending))
+                self.save_grocery_list()
+            return dict(self.grocery_tally.pending)
+
+    def resolve_pending_meals(self, entered):
+        """
+        Add the entered ingredients of meals that have no recipe to the grocery list and
+        save it, without prompting.
+
+        Args:
+            entered (dict[str, str]): Normalized meal name (see `normalize_name`) ->
+                                      comma-separated ingredients.
+
+        Returns:
+            tuple[dict, dict]: The grocery list ((item, unit) -> quantity) and the meals
+                               that are still pending (day -> meal).
+        """
+        self.flush()
+        with self.meal_plan_file.lock.exclusive():
+            self.load_grocery_tally()
+            for day, meal in self.grocery_tally.pending.copy().items():
+                ingredients = entered.get(normalize_name(meal))
+                if ingredients is not None:
+                    self.grocery_tally.set_entry(day, ingredients)
+            return self.save_grocery_list(), dict(self.grocery_tally.pending)
+
     def view_meal_plan(self):
         """
-        Display the current meal plan from the meal plan file.
+        Display the current meal plan from the meal plan file, one page at a time.
+        Only the rows of the page being shown are read.
 
         Logs an error if reading the meal plan file fails.
         """
         Logger.log_info("Viewing meal plan.")
         print("\n=== View Meal Plan ===")
-        if not os.path.exists(self.meal_plan_path):
+        if not self.meal_plan_file.exists():
             Logger.log_warning("No meal plan found.")
             print("No meal plan found.")
             return
         try:
-            with open(self.meal_plan_path, mode="r") as file:
-                reader = csv.reader(file)
-                next(reader, None)  # Skip headers
-                for row in reader:
-                    print(f"{row[0]}: {row[1]}")
+            self.flush()  # Pages are read from the meal plan file
+            PaginatedView(
+                self.meal_plan_file.count,
+                lambda start, count: self.meal_plan_file.read_range(start, start + count),
+                lambda number, row: f"{row[0]}: {row[1]}",
+            ).show()
             Logger.log_info("Displayed meal plan successfully.")
         except Exception as e:
             Logger.log_error(f"Error viewing meal plan: {e}")
@@ -105,30 +496,32 @@ class MealController:
         """
         Generate a grocery list based on the meal plan and save it to the grocery list file.
 
+        The list is read from the grocery tally, which is kept up to date as meals are
+        planned, so nothing is re-aggregated. The user is only asked for the ingredients of
+        planned meals that have no recipe (see `join_meals_to_recipes`); quantities are
+        summed per ingredient in canonical units, counting a meal once for every day it is
+        planned.
+
         Logs an error if saving the grocery list fails.
         """
         Logger.log_info("Starting grocery list generation process.")
         print("\n=== Generate Grocery List ===")
-        if not os.path.exists(self.meal_plan_path):
+        if not self.meal_plan_file.exists():
             Logger.log_warning("No meal plan available to generate grocery list.")
             print("No meal plan available to generate grocery list.")
             return
-        grocery_list = []
         try:
-            with open(self.meal_plan_path, mode="r") as file:
-                reader = csv.reader(file)
-                next(reader, None)  # Skip headers
-                for row in reader:
-                    ingredients = input(f"Enter ingredients for {row[1]} (comma-separated): ")
-                    grocery_list.extend(ingredients.split(","))
-            # Remove duplicates and save the grocery list
-            grocery_list = list(set(grocery_list))
-            with open(self.grocery_list_path, mode="w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Item"])  # Re-add headers
-                for item in grocery_list:
-                    writer.writerow([item.strip()])
-            Logger.log_info("Grocery list generated and saved successfully.")
-            print("Grocery list generated and saved!")
+            pending = self.refresh_grocery_list()
+            entered = {}
+            for meal in pending.values():  # Asked without holding the lock
+                key = normalize_name(meal)
+                if key not in entered:
+                    entered[key] = input(f"Enter ingredients for {meal} (comma-separated): ")
+            grocery_list, _ = self.resolve_pending_meals(entered)
+            Logger.log_info(
+                f"Grocery list generated and saved successfully ({len(grocery_list)} items, "
+                f"{len(entered)} meals entered manually)."
+            )
+            print(f"Grocery list generated and saved! ({len(grocery_list)} items)")
         except Exception as e:
             Logger.log_error(f"Error generating grocery list: {e}")
@@ -1,14 +1,24 @@
-import csv
 import os
 from utils.folder_manager import ensure_data_folder_exists
+from utils.file_lock import StaleVersionError
+from utils.file_manager import FileManager
+from utils.recipe_store import RecipeStore
+from utils.ingredient_index import IngredientIndex
+from utils.recipe_search import RecipeSearchEngine
+from utils.pantry_matcher import PantryMatcher
 from utils.logger import Logger
+from views.paginated_view import PaginatedView
 
 class RecipeController:
     """
     A controller for managing recipe-related operations such as adding, viewing, editing, 
-    and deleting recipes. Recipes are stored in a CSV file.
+    and deleting recipes. Recipes are stored in a CSV file, with changes journaled by a
+    RecipeStore so that single-recipe mutations don't rewrite the whole file.
     """
 
+    PAGE_SIZE = 20
+    MAX_RETRIES = 3
+
     def __init__(self):
         """
         Initialize the RecipeController by setting up the file path for recipes and ensuring 
@@ -16,53 +26,74 @@ class RecipeController:
         """
         self.file_path = os.path.join(ensure_data_folder_exists(), "recipes.csv")
         self.create_recipes_csv_if_not_exists()
+        self.recipe_store = RecipeStore(self.file_path)
+        self.ingredient_index = IngredientIndex(self.recipe_store)
+        self.search_engine = RecipeSearchEngine(self.recipe_store)
+        self.pantry_matcher = PantryMatcher(self.recipe_store)
 
     def create_recipes_csv_if_not_exists(self):
         """
         Create the recipes CSV file with headers if it doesn't already exist.
         """
-        if not os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["Recipe Name", "Ingredients"])  # Headers for recipes
+        try:
+            if FileManager(self.file_path).create_if_missing(RecipeStore.FIELDNAMES):  # Headers for recipes
                 Logger.log_info(f"Created new recipes CSV file with headers: {self.file_path}")
-            except Exception as e:
-                Logger.log_error(f"Error creating recipes CSV file: {e}")
-                print(f"An error occurred while creating the recipes CSV file: {e}")
+        except Exception as e:
+            Logger.log_error(f"Error creating recipes CSV file: {e}")
+            print(f"An error occurred while creating the recipes CSV file: {e}")
 
     def add_recipe(self):
         """
-        Prompt the user to add a new recipe and append it to the CSV file.
+        Prompt the user to add a new recipe and append it to the recipe journal.
         """
         print("\n=== Add Recipe ===")
         recipe_name = input("Enter recipe name: ")
         ingredients = input("Enter ingredients (comma-separated): ")
         try:
-            with open(self.file_path, mode="a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([recipe_name, ingredients])
+            self.recipe_store.add(recipe_name, ingredients)
             Logger.log_info(f"Added recipe: {recipe_name}")
             print("Recipe added successfully!")
         except Exception as e:
             Logger.log_error(f"Error adding recipe: {e}")
             print(f"An error occurred while adding the recipe: {e}")
 
-    def view_recipes(self):
+    def recipe_pages(self, recipes=None):
         """
-        Display all recipes from the CSV file with their ingredients.
+        Returns a paginated view of recipes, numbered the same way edit and delete choose them.
+
+        Args:
+            recipes (list, optional): The (recipe ID, row) pairs to show. Defaults to the whole
+                                      live view, read from the store one page at a time.
+
+        Returns:
+            PaginatedView: The view.
+        """
+        if recipes is None:
+            count_rows, fetch_rows = self.recipe_store.count, self.recipe_store.page
+        else:
+            count_rows = lambda: len(recipes)
+            fetch_rows = lambda start, count: recipes[start:start + count]
+        return PaginatedView(
+            count_rows, fetch_rows,
+            lambda number, recipe: f"{number}. {recipe[1][0]} - Ingredients: {recipe[1][1]}",
+            page_size=self.PAGE_SIZE,
+        )
+
+    def view_recipes(self, recipes=None):
+        """
+        Display the recipes with their ingredients, one page at a time.
+
+        Args:
+            recipes (list, optional): The (recipe ID, row) pairs to show. Defaults to the whole
+                                      live view, read from the store one page at a time.
         """
         print("\n=== View Recipes ===")
-        if not os.path.exists(self.file_path):
+        if not self.recipe_store.file_manager.exists():
             print("No recipes found.")
             Logger.log_warning("Attempted to view recipes but no recipes file exists.")
             return
         try:
-            with open(self.file_path, mode="r") as file:
-                reader = csv.reader(file)
-                next(reader, None)
-                for idx, row in enumerate(reader, start=1):
-                    print(f"{idx}. {row[0]} - Ingredients: {row[1]}")
+            self.recipe_pages(recipes).show()
         except Exception as e:
             Logger.log_error(f"Error viewing recipes: {e}")
             print(f"An error occurred while viewing the recipes: {e}")
@@ -72,83 +103,204 @@ class RecipeController:
         Allow the user to edit an existing recipe by selecting it from a list of recipes.
         """
         print("\n=== Edit Recipe ===")
-        if not os.path.exists(self.file_path):
+        if not self.recipe_store.file_manager.exists():
             print("No recipes to edit.")
             Logger.log_warning("Attempted to edit recipes but no recipes file exists.")
             return
         try:
-            with open(self.file_path, mode="r") as file:
-                recipes = list(csv.reader(file))
+            total = self.recipe_store.count()
+            # Read after count(), which waits for a running compaction that bumps the revision
+            revision = self.recipe_store.revision()
 
-            if not recipes:
+            if not total:
                 print("No recipes found.")
                 Logger.log_warning("No recipes found in the file during editing attempt.")
                 return
 
-            # Skip the header row
-            recipes = recipes[1:]
-
-            self.view_recipes()
-            choice = int(input("Choose a recipe number to edit: ")) - 1
-            if 0 <= choice < len(recipes):
+            print("\n=== View Recipes ===")
+            choice = self.recipe_pages().show(select_prompt="Choose a recipe number to edit")
+            if choice is None:
+                return
+            recipe = self.choose_recipe(choice - 1, total, revision)
+            if recipe is not None:
                 new_name = input("Enter new recipe name: ")
                 new_ingredients = input("Enter new ingredients (comma-separated): ")
-                recipes[choice] = [new_name, new_ingredients]
-            
-                # Reinsert the header row
-                recipes.insert(0, ["Recipe Name", "Ingredients"])
-
-                with open(self.file_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerows(recipes)
-                Logger.log_info(f"Updated recipe: {new_name}")
-                print("Recipe updated successfully!")
-            else:
-                print("Invalid choice.")
-                Logger.log_warning(f"Invalid choice during recipe edit: {choice + 1}")
+                recipe_id, row = recipe
+                if self.mutate_with_retry(
+                    lambda recipe_id, revision: self.recipe_store.edit(
+                        recipe_id, new_name, new_ingredients, expected_revision=revision
+                    ),
+                    recipe_id, row, revision,
+                ):
+                    Logger.log_info(f"Updated recipe: {new_name}")
+                    print("Recipe updated successfully!")
         except Exception as e:
             Logger.log_error(f"Error editing recipe: {e}")
             print(f"An error occurred while editing the recipe: {e}")
 
+    def choose_recipe(self, position, total, revision):
+        """
+        Return the recipe the user picked from a listing shown at `revision`.
+
+        If the recipes changed since the listing was shown (e.g. in another process), the
+        number the user chose may now point at a different recipe, so the choice is
+        refused instead. The user is told why when None is returned.
+
+        Args:
+            position (int): The 0-based position the user chose.
+            total (int): The number of recipes in the listing.
+            revision (int): The store revision the listing was shown at.
+
+        Returns:
+            tuple[int, Sequence[str]] | None: (recipe ID, row), or None if the choice is
+                                              out of range or out of date.
+        """
+        recipe = self.recipe_store.at_position(position) if 0 <= position < total else None
+        if recipe is None:
+            print("Invalid choice.")
+            Logger.log_warning(f"Invalid recipe choice: {position + 1}")
+        elif self.recipe_store.revision() != revision:
+            Logger.log_warning("Recipes changed while the user was choosing one.")
+            print("The recipes were changed by someone else in the meantime; please choose again.")
+            return None
+        return recipe
+
+    def mutate_with_retry(self, mutate, recipe_id, row, revision):
+        """
+        Apply an edit or delete with optimistic versioning.
+
+        `mutate(recipe_id, revision)` is called with the revision the recipe was read at.
+        If another change came first (StaleVersionError), the recipe is looked up again by
+        its contents, since its ID may have changed, and the mutation is retried against
+        the new revision, up to MAX_RETRIES times.
+
+        Args:
+            mutate (callable): Applies the change; takes (recipe_id, expected_revision).
+            recipe_id (int): The ID the recipe had at `revision`.
+            row (Sequence[str]): The recipe's (name, ingredients) at `revision`.
+            revision (int): The store revision the recipe was read at.
+
+        Returns:
+            bool: True if the change was applied, False if the recipe was changed or
+                  deleted by someone else (the user is told so).
+        """
+        for _ in range(self.MAX_RETRIES):
+            try:
+                mutate(recipe_id, revision)
+                return True
+            except StaleVersionError:
+                revision = self.recipe_store.revision()
+                recipe_id = self.recipe_store.find(row)
+                Logger.log_info(f"Retrying recipe change after a concurrent update (ID now {recipe_id}).")
+                if recipe_id is None:
+                    break
+        Logger.log_warning(f"Recipe '{row[0]}' was changed by someone else; change not applied.")
+        print(f"Recipe '{row[0]}' was changed or deleted by someone else; please try again.")
+        return False
 
     def delete_recipe(self):
         """
         Allow the user to delete a recipe by selecting it from a list of recipes.
         """
         print("\n=== Delete Recipe ===")
-        if not os.path.exists(self.file_path):
+        if not self.recipe_store.file_manager.exists():
             print("No recipes to delete.")
             Logger.log_warning("Attempted to delete recipes but no recipes file exists.")
             return
 
         try:
-            with open(self.file_path, mode="r") as file:
-                recipes = list(csv.reader(file))
+            total = self.recipe_store.count()
+            # Read after count(), which waits for a running compaction that bumps the revision
+            revision = self.recipe_store.revision()
 
-            if not recipes:
+            if not total:
                 print("No recipes found.")
                 Logger.log_warning("No recipes found in the file during deletion attempt.")
                 return
 
-            # Skip the header row
-            recipes = recipes[1:]
-
-            self.view_recipes()
-            choice = int(input("Choose a recipe number to delete: ")) - 1
-            if 0 <= choice < len(recipes):
-                deleted_recipe = recipes.pop(choice)
-            
-                # Reinsert the header row
-                recipes.insert(0, ["Recipe Name", "Ingredients"])
-
-                with open(self.file_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerows(recipes)
-                Logger.log_info(f"Deleted recipe: {deleted_recipe[0]}")
-                print(f"Recipe '{deleted_recipe[0]}' deleted successfully!")
-            else:
-                print("Invalid choice.")
-                Logger.log_warning(f"Invalid choice during recipe deletion: {choice + 1}")
+            print("\n=== View Recipes ===")
+            choice = self.recipe_pages().show(select_prompt="Choose a recipe number to delete")
+            if choice is None:
+                return
+            recipe = self.choose_recipe(choice - 1, total, revision)
+            if recipe is not None:
+                recipe_id, deleted_recipe = recipe
+                if self.mutate_with_retry(
+                    lambda recipe_id, revision: self.recipe_store.delete(recipe_id, expected_revision=revision),
+                    recipe_id, deleted_recipe, revision,
+                ):
+                    Logger.log_info(f"Deleted recipe: {deleted_recipe[0]}")
+                    print(f"Recipe '{deleted_recipe[0]}' deleted successfully!")
         except Exception as e:
             Logger.log_error(f"Error deleting recipe: {e}")
             print(f"An error occurred while deleting the recipe: {e}")
+
+    def search_by_ingredients(self):
+        """
+        Prompt the user for ingredients and list the recipes that use all (or any) of them,
+        answered from the inverted ingredient index instead of scanning the recipes file.
+        """
+        print("\n=== Search Recipes by Ingredients ===")
+        ingredients = input("Enter ingredients to search for (comma-separated): ").split(",")
+        match = input("Match (1) all ingredients or (2) any ingredient? [1]: ").strip()
+        match_all = match != "2"
+        try:
+            recipe_ids = self.ingredient_index.search(ingredients, match_all=match_all)
+            if not recipe_ids:
+                print("No recipes found with those ingredients.")
+                return
+            for recipe_id in recipe_ids:
+                row = self.recipe_store.get(recipe_id)
+                if row is not None:
+                    print(f"- {row[0]} - Ingredients: {row[1]}")
+            Logger.log_info(f"Ingredient search for {ingredients} matched {len(recipe_ids)} recipes.")
+        except Exception as e:
+            Logger.log_error(f"Error searching recipes by ingredients: {e}")
+            print(f"An error occurred while searching the recipes: {e}")
+
+    def search_by_name(self):
+        """
+        Prompt the user for part of a recipe name and list matching recipes: names starting
+        with the text first, then names containing close (typo-tolerant) matches of its words.
+        """
+        print("\n=== Search Recipes by Name ===")
+        query = input("Enter a recipe name or the start of one: ")
+        try:
+            results = self.search_engine.search(query)
+            if not results:
+                print("No recipes found matching that name.")
+                return
+            for recipe_id, name in results:
+                row = self.recipe_store.get(recipe_id)
+                if row is not None:
+                    print(f"- {name} - Ingredients: {row[1]}")
+            Logger.log_info(f"Name search for '{query}' matched {len(results)} recipes.")
+        except Exception as e:
+            Logger.log_error(f"Error searching recipes by name: {e}")
+            print(f"An error occurred while searching the recipes: {e}")
+
+    def what_can_i_cook(self):
+        """
+        Prompt the user for the ingredients they have on hand and list the recipes they can
+        cook with them, followed by the recipes missing only one or two ingredients.
+        """
+        print("\n=== What Can I Cook? ===")
+        pantry = input("Enter the ingredients you have (comma-separated): ").split(",")
+        try:
+            matches = self.pantry_matcher.what_can_i_cook(pantry)
+            if not matches["cookable"] and not matches["almost"]:
+                print("No recipes match your ingredients.")
+                return
+            if matches["cookable"]:
+                print("You can cook:")
+                for _, name in matches["cookable"]:
+                    print(f"- {name}")
+            if matches["almost"]:
+                print("You are only missing a few ingredients for:")
+                for _, name, missing in matches["almost"]:
+                    print(f"- {name} (missing: {', '.join(missing)})")
+            Logger.log_info(f"Pantry query matched {len(matches['cookable'])} cookable and "
+                            f"{len(matches['almost'])} almost-cookable recipes.")
+        except Exception as e:
+            Logger.log_error(f"Error matching pantry against recipes: {e}")
+            print(f"An error occurred while matching your ingredients: {e}")
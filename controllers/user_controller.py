@@ -16,14 +16,20 @@ class UserController:
         """
         self.user_view = UserView()
         self.auth_manager = AuthManager()
-        self.meal_controller = MealController()
         self.recipe_controller = RecipeController()
+        self.meal_controller = MealController(self.recipe_controller.recipe_store, self.recipe_controller.search_engine)
+        self.auth_manager.subscribe(self.meal_controller)  # Saves buffered meal changes on logout
 
     def start(self):
         """
         Start the application and display the main user menu for registration,
-        login, or exit options.
+        login, or exit options. A valid session from a previous run is resumed
+        without asking for the password again.
         """
+        if self.auth_manager.resume_session():
+            self.user_view.show_welcome_message(self.auth_manager.current_user)
+            self.logged_in_menu()
+
         while True:
             choice = self.user_view.show_user_menu()
             if choice == "1":  # Register user
@@ -42,15 +48,23 @@ class UserController:
     def logged_in_menu(self):
         """
         Display the main menu after a successful login, allowing users
-        to plan meals, view meal plans, generate grocery lists, or manage recipes.
+        to plan meals, view meal plans, generate grocery lists, manage recipes or
+        find the recipes they can cook with the ingredients on hand. Meal plans and
+        grocery lists are the logged-in user's own.
         """
+        self.meal_controller.switch_user(self.auth_manager.current_user)
         while True:
+            if not self.auth_manager.has_valid_session():
+                print("Your session has expired. Please log in again.")
+                self.auth_manager.logout_user()
+                break
             print("\n=== Main Menu ===")
             print("1. Plan Meals")
             print("2. View Meal Plan")
             print("3. Generate Grocery List")
             print("4. Manage Recipes")
-            print("5. Logout")
+            print("5. What Can I Cook?")
+            print("6. Logout")
             choice = input("Choose an option: ")
             if choice == "1":
                 self.meal_controller.plan_meals()
@@ -61,6 +75,9 @@ class UserController:
             elif choice == "4":
                 self.manage_recipes()
             elif choice == "5":
+                self.recipe_controller.what_can_i_cook()
+            elif choice == "6":
+                self.auth_manager.logout_user()
                 print("Logged out successfully!")
                 break
             else:
@@ -69,7 +86,7 @@ class UserController:
     def manage_recipes(self):
         """
         Display the recipe management menu, allowing users to add, view,
-        edit, or delete recipes, or return to the main menu.
+        edit, delete or search recipes, or return to the main menu.
         """
         while True:
             print("\n=== Recipe Menu ===")
@@ -77,7 +94,9 @@ class UserController:
             print("2. View Recipes")
             print("3. Edit Recipe")
             print("4. Delete Recipe")
-            print("5. Back to Main Menu")
+            print("5. Search by Ingredients")
+            print("6. Search by Name")
+            print("7. Back to Main Menu")
             choice = input("Choose an option: ")
             if choice == "1":
                 self.recipe_controller.add_recipe()
@@ -88,6 +107,10 @@ class UserController:
             elif choice == "4":
                 self.recipe_controller.delete_recipe()
             elif choice == "5":
+                self.recipe_controller.search_by_ingredients()
+            elif choice == "6":
+                self.recipe_controller.search_by_name()
+            elif choice == "7":
                 break
             else:
                 print("Invalid option, please try again.")
@@ -1,23 +1,196 @@
+import argparse
+import getpass
+import json
+import os
+import sys
+from controllers.api_controller import ApiController
+from controllers.command_controller import CommandController
 from controllers.user_controller import UserController
 from utils.logger import Logger
+from utils.file_manager import FileManager
 
-def main():
+PASSWORD_ENVIRONMENT_VARIABLE = "MEAL_PLANNER_PASSWORD"
+
+USAGE_EXAMPLES = """
+Without a command, the interactive menus start. With one, it runs without prompts and
+prints its result as JSON. The password is read from the MEAL_PLANNER_PASSWORD
+environment variable (or asked for on a terminal); without --email, the session
+remembered by the interactive application is used.
+
+examples:
+    python main.py --email me@example.com recipe add --name Pancakes --ingredients "2 cups flour, 1 egg"
+    python main.py meal set --day Monday --meal Pancakes
+    python main.py grocery --ingredients "Leftovers=1 cup rice"
+    python main.py --email me@example.com batch < commands.jsonl
+    python main.py serve --port 8000
+
+A batch reads one JSON command per line, e.g.
+    {"command": "recipe add", "name": "Pancakes", "ingredients": "2 cups flour, 1 egg"}
+    {"command": "meal set", "day": "Monday", "meal": "Pancakes"}
+and prints one JSON result per line (see CommandController for all commands).
+"""
+
+
+def build_parser():
+    """
+    Builds the command-line parser of the non-interactive commands.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Meal planner.", epilog=USAGE_EXAMPLES, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--email", help="authenticate as this user for the command or batch")
+    parser.add_argument("--batch-size", type=int, default=500, help="writes committed together (default 500)")
+    groups = parser.add_subparsers(dest="group")
+
+    groups.add_parser("batch", help="run JSONL commands read from standard input")
+
+    serve = groups.add_parser("serve", help="serve the JSON API on localhost (see ApiController)")
+    serve.add_argument("--port", type=int, default=ApiController.DEFAULT_PORT, help="default 8000; 0 picks a free port")
+    serve.add_argument("--workers", type=int, help="request handler threads")
+
+    user = groups.add_parser("user", help="manage users").add_subparsers(dest="action", required=True)
+    user.add_parser("register", help="register --email (password from the environment)")
+
+    recipe = groups.add_parser("recipe", help="manage recipes").add_subparsers(dest="action", required=True)
+    add = recipe.add_parser("add")
+    add.add_argument("--name", required=True)
+    add.add_argument("--ingredients", required=True)
+    edit = recipe.add_parser("edit")
+    edit.add_argument("--id", type=int, required=True)
+    edit.add_argument("--name", required=True)
+    edit.add_argument("--ingredients", required=True)
+    recipe.add_parser("delete").add_argument("--id", type=int, required=True)
+    recipe.add_parser("get").add_argument("--id", type=int, required=True)
+    listing = recipe.add_parser("list")
+    listing.add_argument("--start", type=int, default=0)
+    listing.add_argument("--count", type=int, default=50)
+    search = recipe.add_parser("search")
+    search.add_argument("--ingredients", required=True)
+    search.add_argument("--match", choices=["all", "any"], default="all")
+    recipe.add_parser("find").add_argument("--name", required=True)
+    recipe.add_parser("cook").add_argument("--pantry", required=True)
+
+    meal = groups.add_parser("meal", help="plan meals").add_subparsers(dest="action", required=True)
+    meal_set = meal.add_parser("set")
+    meal_set.add_argument("--day", required=True)
+    meal_set.add_argument("--meal", required=True)
+    meal.add_parser("show")
+
+    grocery = groups.add_parser("grocery", help="generate the grocery list")
+    grocery.add_argument(
+        "--ingredients", action="append", default=[], metavar="MEAL=INGREDIENTS",
+        help="ingredients of a planned meal that has no recipe (repeatable)",
+    )
+    return parser
+
+
+def read_password(batch):
+    """
+    Reads the password from the environment, or asks for it if a terminal is attached.
+
+    Args:
+        batch (bool): Whether standard input carries batch commands (and can't be prompted on).
+
+    Returns:
+        str | None: The password, or None if none is available.
+    """
+    password = os.environ.get(PASSWORD_ENVIRONMENT_VARIABLE)
+    if password is None and sys.stdin.isatty() and not batch:
+        password = getpass.getpass("Password: ")
+    return password
+
+
+def command_from_arguments(arguments):
+    """
+    Converts parsed command-line arguments to a command for CommandController.
+
+    Args:
+        arguments (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        dict: The command.
+    """
+    name = arguments.group if arguments.group == "grocery" else f"{arguments.group} {arguments.action}"
+    options = {
+        key: value for key, value in vars(arguments).items()
+        if key not in ("group", "action", "email", "batch_size")
+    }
+    if name == "grocery":
+        options["ingredients"] = dict(entry.split("=", 1) for entry in options["ingredients"] if "=" in entry)
+    return {"command": name, **options}
+
+
+def run_commands(arguments):
+    """
+    Runs a non-interactive command or a JSONL batch and prints the results as JSON.
+
+    Args:
+        arguments (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit status: 0 if every command succeeded, 1 otherwise.
+    """
+    controller = CommandController(batch_size=arguments.batch_size)
+    batch = arguments.group == "batch"
+    password = read_password(batch)
+    if arguments.group == "user":
+        results = [controller.execute({"command": "user register", "email": arguments.email or "",
+                                       "password": password or ""})]
+    elif not controller.authenticate(arguments.email, password):
+        print(json.dumps({"ok": False, "error": "Authentication failed."}))
+        return 1
+    elif batch:
+        results = controller.run(sys.stdin)
+    else:
+        results = [controller.execute(command_from_arguments(arguments))]
+        failure = controller.finish()
+        if failure is not None:
+            results.append(failure)
+
+    status = 0
+    for result in results:
+        print(json.dumps(result))
+        status = status or (0 if result["ok"] else 1)
+    return status
+
+
+def main(argv=None):
     """
     The main entry point of the application.
 
-    This function initializes the logger, logs the application startup, 
-    creates an instance of the UserController, starts the controller, 
-    and logs the application termination.
+    This function initializes the logger, logs the application startup,
+    then either runs the command given on the command line (see `build_parser`),
+    serves the JSON API (see `ApiController`), or creates an instance of the
+    UserController and starts the interactive menus, and logs the application termination.
+
+    Args:
+        argv (list[str], optional): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
     """
+    arguments = build_parser().parse_args(argv)
     Logger()  # Initialize the logger
     Logger.log_info("Application started.")
-    
-    # Initialize and start the user controller
-    user_controller = UserController()
-    user_controller.start()
-    
+
+    if arguments.group is None:
+        # Initialize and start the user controller
+        user_controller = UserController()
+        user_controller.start()
+        status = 0
+    elif arguments.group == "serve":
+        ApiController(workers=arguments.workers).run(arguments.port)
+        status = 0
+    else:
+        status = run_commands(arguments)
+
     # Log the termination of the application
+    Logger.log_info(f"File cache stats: {FileManager.cache_stats()}")
     Logger.log_info("Application terminated.")
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,4 +1,6 @@
+import os
 from utils.file_manager import FileManager
+from utils.grocery_list import GroceryTally, format_quantity
 from collections import defaultdict
 
 class MealModel:
@@ -9,10 +11,21 @@ class MealModel:
 
     def __init__(self):
         """
-        Initializes the MealModel instance and loads the existing meal plan from a CSV file.
+        Initializes the MealModel instance and loads the existing meal plan from a CSV file,
+        along with the grocery tally saved next to it (rebuilt if it is missing or stale).
         """
         self.file_manager = FileManager("meal_plan.csv")
+        self.grocery_tally = GroceryTally(os.path.splitext(self.file_manager.file_path)[0] + ".grocery.json")
         self.meal_plan = self.load_meal_plan()
+        if not self.grocery_tally.load(self.file_manager.signature()):
+            for day, meals in self.meal_plan.items():
+                for index, (_, ingredients) in enumerate(meals):
+                    self.grocery_tally.set_entry(self._tally_key(day, index), ", ".join(ingredients))
+            self.grocery_tally.save(self.file_manager.signature())
+
+    @staticmethod
+    def _tally_key(day, index):
+        return f"{day}#{index}"
 
     def load_meal_plan(self):
         """
@@ -23,8 +36,7 @@ class MealModel:
         """
         meal_plan = defaultdict(list)
         try:
-            data = self.file_manager.read_csv()
-            for row in data:
+            for row in self.file_manager.iter_csv(columns=["day", "meal", "ingredients"]):
                 day = row.get("day", "Unknown")
                 meal = row.get("meal", "Unknown")
                 ingredients = row.get("ingredients", "").split(", ")
@@ -57,6 +69,7 @@ class MealModel:
 
             ingredients_list = ingredients.split(", ")
             self.meal_plan[day].append((meal, ingredients_list))
+            self.grocery_tally.set_entry(self._tally_key(day, len(self.meal_plan[day]) - 1), ingredients)
             self.save_meal_plan()
             print("Meal added successfully!")
         except Exception as e:
@@ -78,7 +91,7 @@ class MealModel:
 
     def save_meal_plan(self):
         """
-        Save the current meal plan to the CSV file.
+        Save the current meal plan to the CSV file, and the grocery tally with it.
         """
         fieldnames = ["day", "meal", "ingredients"]
         data = []
@@ -91,6 +104,7 @@ class MealModel:
                 })
         try:
             self.file_manager.write_csv(data, fieldnames)
+            self.grocery_tally.save(self.file_manager.signature())
             print("Meal plan saved successfully!")
         except Exception as e:
             print(f"Error saving meal plan: {e}")
@@ -99,20 +113,20 @@ class MealModel:
         """
         Generate a grocery list based on the current meal plan.
 
+        Quantities and units are parsed from the ingredients ("2 cups rice"), converted to
+        canonical units and summed per ingredient. The totals are read from the grocery
+        tally, which `add_meal` keeps up to date, so nothing is re-aggregated here.
+
         Returns:
-            dict: A dictionary where keys are ingredients and values are their quantities.
+            dict: A dictionary where keys are (ingredient, unit) pairs and values are their total quantities.
         """
-        grocery_list = defaultdict(int)
-        for meals in self.meal_plan.values():
-            for _, ingredients in meals:
-                for ingredient in ingredients:
-                    grocery_list[ingredient] += 1
+        grocery_list = self.grocery_tally.totals()
 
         if not grocery_list:
             print("No ingredients found in the meal plan.")
             return {}
 
         print("\n=== Grocery List ===")
-        for ingredient, quantity in grocery_list.items():
-            print(f"{ingredient}: {quantity}")
+        for (ingredient, unit), quantity in grocery_list.items():
+            print(f"{ingredient}: {format_quantity(quantity, unit)}")
         return grocery_list
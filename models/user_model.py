@@ -34,10 +34,11 @@ class UserModel:
             raise ValueError("Password cannot be empty.")
 
         try:
-            users = self.file_manager.read_csv()
-            for user in users:
-                if user.get("email") == email:
-                    return False  # User already exists
+            existing = self.file_manager.iter_csv(
+                columns=["email"], predicate=lambda user: user.get("email") == email
+            )
+            if next(existing, None) is not None:
+                return False  # User already exists
 
             # Add the new user to the users.csv file
             self.file_manager.append_csv(
@@ -67,10 +68,10 @@ class UserModel:
             raise ValueError("Password cannot be empty.")
 
         try:
-            users = self.file_manager.read_csv()
-            for user in users:
-                if user.get("email") == email and user.get("password") == password:
-                    return True
-            return False
+            matches = self.file_manager.iter_csv(
+                columns=["email"],
+                predicate=lambda user: user.get("email") == email and user.get("password") == password,
+            )
+            return next(matches, None) is not None
         except Exception as e:
             raise RuntimeError(f"Error during user validation: {e}")
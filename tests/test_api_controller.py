@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+from controllers.api_controller import ApiController
+from utils.config_manager import ConfigManager
+
+
+class ApiControllerTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The controllers keep their data under the working directory
+        ConfigManager().set("bcrypt_rounds", 4)  # Skip calibration; the cost doesn't matter here
+        self.api = ApiController(workers=2)
+
+    def tearDown(self):
+        self.api.close()
+        self.api.auth_manager.password_hasher.shutdown()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def request(self, method, target, body=None, token=None):
+        headers = {"authorization": f"Bearer {token}"} if token else {}
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        status, payload, extra_headers = asyncio.run(self.api._respond(method, target, headers, data, "127.0.0.1"))
+        return status, payload, extra_headers
+
+    def log_in(self):
+        self.request("POST", "/users", {"email": "Cook@Example.com", "password": "secret"})
+        status, payload, _ = self.request("POST", "/sessions", {"email": "cook@example.com", "password": "secret"})
+        self.assertEqual(status, HTTPStatus.CREATED)
+        return payload["token"]
+
+    def test_recipe_routes(self):
+        token = self.log_in()
+        status, recipe, _ = self.request("POST", "/recipes", {"name": "Soup", "ingredients": "water, 1 onion"}, token)
+        self.assertEqual(status, HTTPStatus.CREATED)
+        path = f"/recipes/{recipe['id']}"
+        self.assertEqual(self.request("GET", path, token=token)[:2],
+                         (HTTPStatus.OK, {"id": recipe["id"], "name": "Soup", "ingredients": "water, 1 onion"}))
+        self.assertEqual(self.request("PUT", path, {"name": "Onion Soup", "ingredients": "onion"}, token)[0], HTTPStatus.OK)
+        status, found, _ = self.request("GET", "/recipes/search?ingredients=onion", token=token)
+        self.assertEqual((status, [match["name"] for match in found]), (HTTPStatus.OK, ["Onion Soup"]))
+        self.assertEqual(self.request("DELETE", path, token=token)[0], HTTPStatus.OK)
+        self.assertEqual(self.request("GET", path, token=token)[0], HTTPStatus.NOT_FOUND)
+
+    def test_error_responses(self):
+        self.assertEqual(self.request("GET", "/recipes")[0], HTTPStatus.UNAUTHORIZED)
+        token = self.log_in()
+        self.assertEqual(self.request("POST", "/users", {"email": "cook@example.com", "password": "x"})[0],
+                         HTTPStatus.CONFLICT)
+        self.assertEqual(self.request("POST", "/sessions", {"email": "cook@example.com", "password": "wrong"})[0],
+                         HTTPStatus.UNAUTHORIZED)
+        self.assertEqual(self.request("GET", "/nowhere", token=token)[0], HTTPStatus.NOT_FOUND)
+        status, _, headers = self.request("PATCH", "/recipes", token=token)
+        self.assertEqual((status, headers), (HTTPStatus.METHOD_NOT_ALLOWED, {"Allow": "GET, POST"}))
+        self.assertEqual(self.request("PUT", "/recipes/0", {"id": 1, "name": "x", "ingredients": "y"}, token)[0],
+                         HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.request("PUT", "/meal-plan", {"Someday": "Soup"}, token)[0], HTTPStatus.BAD_REQUEST)
+        status, payload, _ = self.request("GET", "/recipes?count=abc", token=token)
+        self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+        self.assertIn("error", payload)
+
+    def test_logout_revokes_the_token(self):
+        token = self.log_in()
+        self.assertEqual(self.request("PUT", "/meal-plan", {"Monday": "Soup"}, token)[1]["Monday"], "Soup")
+        self.assertEqual(self.request("DELETE", "/sessions", token=token)[0], HTTPStatus.OK)
+        self.assertEqual(self.request("GET", "/meal-plan", token=token)[0], HTTPStatus.UNAUTHORIZED)
+
+
+    def test_http_round_trip(self):
+        async def exchange(raw):
+            server = asyncio.ensure_future(self.api.serve(0))
+            while self.api.port is None:
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_connection(ApiController.HOST, self.api.port)
+            writer.write(raw)
+            response = await reader.read()
+            writer.close()
+            server.cancel()
+            return response
+
+        body = json.dumps({"email": "cook@example.com", "password": "secret"}).encode("utf-8")
+        request = b"POST /users HTTP/1.1\r\nContent-Length: %d\r\n\r\n%b" % (len(body), body)
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = asyncio.run(exchange(request + b"GARBAGE\r\n\r\n"))
+        head, _, first_body = response.partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 201 Created\r\n"))
+        self.assertIn(b"Connection: keep-alive", head)
+        self.assertTrue(first_body.startswith(b'{"email": "cook@example.com"}HTTP/1.1 400 Bad Request'))
+        self.assertTrue(response.endswith(b'{"error": "Malformed request line."}'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import bcrypt
+
+from utils.auth_manager import AuthManager
+from utils.config_manager import ConfigManager
+from utils.file_manager import FileManager
+from utils.password_hasher import PasswordHasher
+
+
+class RehashOnLoginTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The user store and configuration live under the working directory
+        ConfigManager().set("bcrypt_rounds", 5)
+        self.auth = AuthManager(password_hasher=PasswordHasher(max_workers=1))
+        self.addCleanup(self.auth.password_hasher.shutdown)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def test_old_cost_is_upgraded_on_a_successful_login(self):
+        hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode("utf-8")
+        FileManager("data/users.csv").write_csv([{"Email": "cook@example.com", "Password": hashed}], ["Email", "Password"])
+        self.assertFalse(self.auth.verify_credentials("cook@example.com", "wrong"))
+        self.assertEqual(self.auth.user_repository.get_user("cook@example.com")["Password"], hashed)
+
+        self.assertTrue(self.auth.verify_credentials("cook@example.com", "secret"))
+        upgraded = self.auth.user_repository.get_user("cook@example.com")["Password"]
+        self.assertEqual(PasswordHasher.get_cost(upgraded), 5)
+        self.assertTrue(self.auth.verify_credentials("cook@example.com", "secret"))
+        self.assertEqual(self.auth.user_repository.get_user("cook@example.com")["Password"], upgraded)
+
+    def test_stored_cost_is_used_without_recalibrating(self):
+        with mock.patch.object(PasswordHasher, "calibrate_rounds", return_value=7) as calibrate_rounds:
+            self.assertEqual(AuthManager(password_hasher=self.auth.password_hasher).password_hasher.rounds, 5)
+            calibrate_rounds.assert_not_called()
+            self.assertEqual(self.auth.get_bcrypt_rounds(recalibrate=True), 7)
+        self.assertEqual(ConfigManager().get("bcrypt_rounds"), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import unittest
+from controllers.command_controller import CommandController
+
+
+class CommandControllerTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The controllers keep their data under the working directory
+        self.controller = CommandController(batch_size=100)
+        self.controller.switch_user("cook@example.com")
+
+    def tearDown(self):
+        self.controller.recipe_controller.recipe_store.wait_for_compaction()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def test_argument_types_are_validated(self):
+        result = self.controller.execute({"command": "recipe list", "count": "5"})
+        self.assertEqual(result, {"ok": False, "error": "Invalid arguments: count must be an integer, got '5'."})
+        result = self.controller.execute({"command": "recipe get", "id": True})
+        self.assertFalse(result["ok"])
+        self.assertTrue(self.controller.execute({"command": "grocery", "ingredients": None})["ok"])
+
+    def test_failed_commit_is_reported_and_meals_stay_pending(self):
+        save_meal_plan = self.controller.meal_controller.save_meal_plan
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        self.controller.meal_controller.save_meal_plan = fail
+        lines = [json.dumps({"command": "meal set", "day": "Monday", "meal": "Soup"})]
+        results = list(self.controller.run(lines))
+        self.assertTrue(results[0]["ok"])
+        self.assertEqual(results[-1], {"ok": False, "error": "Could not commit the writes of line 1 (meal set): disk full"})
+
+        self.controller.meal_controller.save_meal_plan = save_meal_plan
+        plan = self.controller.execute({"command": "meal show"})["result"]
+        self.assertEqual(plan["Monday"], "Soup")
+
+
+if __name__ == "__main__":
+    unittest.main()
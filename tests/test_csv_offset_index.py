@@ -0,0 +1,49 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.csv_offset_index import CsvOffsetIndex
+
+
+class CsvOffsetIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._folder.name, "recipes.csv")
+        self.rows = [("Soup", "water"), ("Quoted, \"name\"", "line one\nline two"), ("Stew", "beans")]
+        self._write(self.rows)
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def _write(self, rows, mode="w"):
+        with open(self.path, mode=mode, newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if mode == "w":
+                writer.writerow(["Recipe Name", "Ingredients"])
+                file.write("\r\n")  # A blank line, skipped like csv.reader does
+            writer.writerows(rows)
+
+    def test_pages_match_the_parsed_file(self):
+        index = CsvOffsetIndex(self.path)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.read(0, 10), self.rows)
+        self.assertEqual(index.read(1, 2), self.rows[1:2])
+        self.assertEqual(index.row(2), self.rows[2])
+        self.assertIsNone(index.row(3))
+
+    def test_saved_index_is_reused_until_the_file_changes(self):
+        self.assertEqual(len(CsvOffsetIndex(self.path)), 3)
+        with mock.patch.object(CsvOffsetIndex, "_build", side_effect=AssertionError("rebuilt the index")):
+            self.assertEqual(CsvOffsetIndex(self.path).row(1), self.rows[1])
+
+        index = CsvOffsetIndex(self.path)
+        self._write([("Toast", "bread")], mode="a")
+        self.assertEqual(index.read(2, 4), [self.rows[2], ("Toast", "bread")])
+        self._write([("Salad", "lettuce")])  # Rewritten with other rows
+        self.assertEqual(index.read(0, 4), [("Salad", "lettuce")])
+        self.assertEqual(len(CsvOffsetIndex(self.path)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from utils.csv_snapshot import CsvSnapshot
+from utils.file_manager import FileManager
+from utils.storage_backend import CsvBackend
+
+FIELDS = ["Recipe Name", "Ingredients"]
+
+
+class CsvSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self._folder.name, "recipes.csv")
+        self.snapshot = CsvSnapshot(self.csv_path)
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_round_trip_and_signature_check(self):
+        header, rows = ("Recipe Name", "Ingredients"), (("Soup", "water, \"1\" onion\n"), ("Stew",), ("Toast", "", "x"))
+        self.snapshot.save((123, 45), header, rows)
+        self.assertEqual(self.snapshot.load((123, 45)), (header, rows))
+        self.assertIsNone(self.snapshot.load((123, 46)))  # The CSV file changed since
+
+    def test_damaged_snapshot_is_ignored(self):
+        self.snapshot.save((123, 45), ("Recipe Name",), (("Soup",),))
+        with open(self.snapshot.path, mode="r+b") as file:
+            file.seek(-2, os.SEEK_END)
+            file.write(b"!!")
+        self.assertIsNone(self.snapshot.load((123, 45)))
+
+    def test_edit_made_behind_the_snapshot_is_read(self):
+        manager = FileManager(self.csv_path, snapshot=True)
+        manager.write_csv([{"Recipe Name": "Soup", "Ingredients": "water"}], FIELDS)
+        self.assertTrue(os.path.exists(self.snapshot.path))
+        with open(self.csv_path, mode="a", newline="", encoding="utf-8") as file:
+            file.write("Stew,beans\r\n")  # Another program edits the CSV file
+        CsvBackend.cache.clear()  # As in a new process
+        self.assertEqual(manager.read_rows()[1], (("Soup", "water"), ("Stew", "beans")))
+        CsvBackend.cache.clear()
+        signature = CsvBackend.cache.signature(self.csv_path)
+        self.assertEqual(self.snapshot.load(signature)[1], (("Soup", "water"), ("Stew", "beans")))  # Rewritten
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from utils.file_cache import ParsedFileCache
+
+
+class ParsedFileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._folder.name, "recipes.csv")
+        with open(self.path, mode="w", encoding="utf-8") as file:
+            file.write("Recipe Name\nSoup\n")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_entry_is_dropped_when_the_file_changes(self):
+        cache = ParsedFileCache()
+        cache.put(self.path, cache.signature(self.path), ("Recipe Name",), (("Soup",),))
+        self.assertEqual(cache.get(self.path), (("Recipe Name",), (("Soup",),)))
+        with open(self.path, mode="a", encoding="utf-8") as file:
+            file.write("Stew\n")  # Another process appends a row
+        self.assertIsNone(cache.get(self.path))
+        self.assertEqual((cache.hits, cache.misses, cache.stats()["entries"]), (1, 1, 0))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ParsedFileCache(max_bytes=700)
+        paths = [os.path.join(self._folder.name, f"{name}.csv") for name in "abc"]
+        for path in paths:
+            with open(path, mode="w", encoding="utf-8") as file:
+                file.write("x" * 300)
+            cache.put(path, cache.signature(path), (), ())
+            cache.get(paths[0])  # Keeps the first file in use
+        self.assertIsNotNone(cache.get(paths[0]))
+        self.assertIsNone(cache.get(paths[1]))
+        self.assertIsNotNone(cache.get(paths[2]))
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.stats()["bytes"], 700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from utils.file_lock import FileLock, StaleVersionError
+from utils.file_manager import FileManager
+
+FIELDS = ["Recipe Name", "Ingredients"]
+
+
+class FileLockVersionTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._folder.name, "recipes.csv")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_every_write_bumps_the_version(self):
+        lock = FileLock.for_path(self.path)
+        self.assertIs(FileLock.for_path(self.path), lock)
+        self.assertEqual(lock.version(), 0)
+        manager = FileManager(self.path)
+        manager.write_csv([{"Recipe Name": "Soup", "Ingredients": "water"}], FIELDS)
+        manager.append_csv([{"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS)
+        self.assertEqual(manager.version(), 2)
+        self.assertEqual(FileLock(self.path).version(), 2)  # Another process reads the same counter
+
+    def test_write_from_a_stale_version_is_refused(self):
+        mine, theirs = FileManager(self.path), FileManager(self.path)
+        mine.write_csv([{"Recipe Name": "Soup", "Ingredients": "water"}], FIELDS)
+        version = mine.version()
+        theirs.write_csv([{"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS)
+        with self.assertRaises(StaleVersionError) as raised:
+            mine.write_csv([{"Recipe Name": "Toast", "Ingredients": "bread"}], FIELDS, expected_version=version)
+        self.assertEqual((raised.exception.expected, raised.exception.actual), (version, version + 1))
+        self.assertEqual(mine.read_csv(), [{"Recipe Name": "Stew", "Ingredients": "beans"}])
+        mine.write_csv([{"Recipe Name": "Toast", "Ingredients": "bread"}], FIELDS, expected_version=mine.version())
+
+    def test_version_is_only_bumped_under_the_exclusive_lock(self):
+        lock = FileLock.for_path(self.path)
+        with self.assertRaises(RuntimeError):
+            lock.bump_version()
+        with lock.shared():
+            with self.assertRaises(RuntimeError):
+                lock.bump_version()
+            with lock.exclusive():
+                self.assertEqual(lock.bump_version(), 1)
+        self.assertEqual(lock.version(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.file_manager import FileManager
+
+FIELDS = ["Recipe Name", "Ingredients"]
+
+
+class IterCsvTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.manager = FileManager(os.path.join(self._folder.name, "recipes.csv"))
+        self.manager.write_csv(
+            [{"Recipe Name": "Soup", "Ingredients": "water"}, {"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS
+        )
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_projection_and_filter(self):
+        rows = self.manager.iter_csv(columns=["Recipe Name", "Steps"], predicate=lambda row: row["Ingredients"] == "beans")
+        self.assertEqual(list(rows), [{"Recipe Name": "Stew"}])
+
+    def test_missing_file_yields_nothing(self):
+        self.assertEqual(list(FileManager(os.path.join(self._folder.name, "missing.csv")).iter_csv()), [])
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.manager = FileManager(os.path.join(self._folder.name, "recipes.csv"))
+        self.manager.write_csv([{"Recipe Name": "Soup", "Ingredients": "water"}], FIELDS)
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_failed_write_leaves_the_file_untouched(self):
+        with mock.patch("utils.storage_backend.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.write_csv([{"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS)
+        self.assertEqual(self.manager.read_csv(), [{"Recipe Name": "Soup", "Ingredients": "water"}])
+        self.assertFalse([name for name in os.listdir(self._folder.name) if name.endswith(".tmp")])  # Cleaned up
+
+    def test_batch_writes_once(self):
+        with mock.patch.object(self.manager.backend, "write_rows", wraps=self.manager.backend.write_rows) as write_rows:
+            with self.manager.batch():
+                self.manager.write_csv([{"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS)
+                self.manager.append_csv([{"Recipe Name": "Toast", "Ingredients": "bread"}], FIELDS)
+                self.assertEqual(self.manager.read_csv()[0]["Recipe Name"], "Soup")  # Nothing written yet
+        self.assertEqual(write_rows.call_count, 1)
+        self.assertEqual([row["Recipe Name"] for row in self.manager.read_csv()], ["Stew", "Toast"])
+
+    def test_batch_is_discarded_if_it_raises(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.write_csv([{"Recipe Name": "Stew", "Ingredients": "beans"}], FIELDS)
+                raise RuntimeError("abort")
+        self.assertEqual(self.manager.read_csv(), [{"Recipe Name": "Soup", "Ingredients": "water"}])
+        self.manager.append_csv([{"Recipe Name": "Toast", "Ingredients": "bread"}], FIELDS)
+        self.assertEqual([row["Recipe Name"] for row in self.manager.read_csv()], ["Soup", "Toast"])
+
+
+if __name__ == "__main__":
+    unittest.main()
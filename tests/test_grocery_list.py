@@ -0,0 +1,47 @@
+import unittest
+from utils.grocery_list import format_quantity, join_meals_to_recipes
+from utils.ingredient_parser import parse_quantity
+
+
+class JoinMealsToRecipesTest(unittest.TestCase):
+    def test_meals_match_normalized_recipe_names(self):
+        recipes = [(0, ("Tomato  Soup", "tomatoes")), (1, ("Stew", "beans")),
+                   (2, ("tomato soup", "other")), (3, ("Ugali", "maize"))]
+        matched, unmatched = join_meals_to_recipes(["tomato soup", "Pilau", "", "TOMATO SOUP", "ugali", "pilau"], recipes)
+        self.assertEqual(matched, {"tomato soup": (0, "tomatoes"), "ugali": (3, "maize")})
+        self.assertEqual(unmatched, ["Pilau"])
+
+    def test_stops_reading_recipes_once_every_meal_is_found(self):
+        def recipes():
+            yield 0, ("Stew", "beans")
+            yield 1, ("Soup", "water")
+            raise AssertionError("read past the last planned meal")
+
+        matched, unmatched = join_meals_to_recipes(["soup", "stew"], recipes())
+        self.assertEqual((matched, unmatched), ({"stew": (0, "beans"), "soup": (1, "water")}, []))
+        self.assertEqual(join_meals_to_recipes([" "], recipes()), ({}, []))
+
+
+class FormatQuantityTest(unittest.TestCase):
+    def test_kitchen_units_are_kept(self):
+        for text, expected in (("2 cups flour", "2 cups"), ("1 cup milk", "1 cup"), ("3 tsp salt", "3 tsp"),
+                               ("1.5 tbsp oil", "1.5 tbsp"), ("1 lb beef", "1 lb"), ("2 oz cheese", "2 oz")):
+            quantity, unit, _ = parse_quantity(text)
+            self.assertEqual(format_quantity(quantity, unit), expected, text)
+
+    def test_metric_units_are_kept(self):
+        for text, expected in (("500 ml milk", "500 ml"), ("1.5 l water", "1.5 l"),
+                               ("250 g butter", "250 g"), ("2 kg flour", "2 kg")):
+            quantity, unit, _ = parse_quantity(text)
+            self.assertEqual(format_quantity(quantity, unit), expected, text)
+
+    def test_mixed_volumes_fall_back_to_millilitres(self):
+        self.assertEqual(format_quantity(236.588 + 100, "ml"), "336.59 ml")
+
+    def test_counts(self):
+        self.assertEqual(format_quantity(3, ""), "3")
+        self.assertEqual(format_quantity(2, "clove"), "2 clove")
+
+
+if __name__ == "__main__":
+    unittest.main()
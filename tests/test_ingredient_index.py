@@ -0,0 +1,30 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.ingredient_index import IngredientIndex
+from utils.recipe_store import RecipeStore
+
+
+class IngredientIndexPersistenceTest(unittest.TestCase):
+    def test_saved_index_catches_up_with_the_journal(self):
+        with tempfile.TemporaryDirectory() as folder:
+            store = RecipeStore(os.path.join(folder, "recipes.csv"), max_journal_records=1000, background=False)
+            index = IngredientIndex(store)
+            for name, ingredients in (("Soup", "water, 1 onion"), ("Stew", "beans, onion"), ("Toast", "bread")):
+                store.add(name, ingredients)
+            store.delete(0)
+            store.compact()  # Saves the index: Stew is 0, Toast is 1
+            store.add("Salad", "lettuce, onion")
+            store.edit(1, "Cheese Toast", "bread, cheese")
+            store.delete(0)
+            # The process dies here without saving; the next one must not need a rebuild
+            with mock.patch.object(IngredientIndex, "rebuild", side_effect=AssertionError("rebuilt the index")):
+                reloaded = IngredientIndex(RecipeStore(store.file_path, max_journal_records=1000, background=False))
+            self.assertEqual(reloaded.search(["onion"]), [2])
+            self.assertEqual(reloaded.search(["bread", "cheese"]), [1])
+            self.assertEqual(reloaded.search(["beans"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from utils.ingredient_parser import normalize_ingredient, parse_ingredients, parse_quantity
+
+
+class ParseQuantityTest(unittest.TestCase):
+    def test_mixed_number(self):
+        quantity, unit, name = parse_quantity("1 1/2 cups Rice")
+        self.assertAlmostEqual(quantity, 1.5 * 236.588)
+        self.assertEqual((unit, name), ("ml", "rice"))
+
+    def test_malformed_mixed_number_is_not_a_quantity(self):
+        self.assertEqual(parse_quantity("1 1/0 cup rice"), (1.0, "", "1 1/0 cup rice"))
+
+    def test_whole_number_before_a_word(self):
+        self.assertEqual(parse_quantity("3 eggs"), (3.0, "", "eggs"))
+
+    def test_number_glued_to_unit(self):
+        self.assertEqual(parse_quantity("200g sugar"), (200.0, "g", "sugar"))
+
+    def test_no_quantity_counts_as_one(self):
+        self.assertEqual(parse_quantity("Salt"), (1.0, "", "salt"))
+
+
+class NormalizeIngredientTest(unittest.TestCase):
+    def test_quantity_and_unit_are_stripped(self):
+        for text in ("2 cups Flour", "flour", "  FLOUR ", "200g flour", "1 1/2 cups of flour"):
+            self.assertEqual(normalize_ingredient(text), "flour", text)
+
+    def test_parse_ingredients(self):
+        self.assertEqual(parse_ingredients("2 cups flour, 1 egg, pinch of salt, , 2"), {"flour", "egg", "salt"})
+
+
+if __name__ == "__main__":
+    unittest.main()
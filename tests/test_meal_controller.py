@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from controllers.meal_controller import MealController
+from utils.auth_manager import AuthManager
+from utils.config_manager import ConfigManager
+from utils.folder_manager import ensure_data_folder_exists
+from utils.recipe_store import RecipeStore
+
+
+class MealWriteBehindTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The controllers keep their data under the working directory
+        ConfigManager().set("bcrypt_rounds", 4)  # Skip calibration; nobody logs in with a password here
+        self.store = RecipeStore(os.path.join(ensure_data_folder_exists(), "recipes.csv"))
+        self.store.add("Soup", "2 cups water, 1 onion")
+
+    def tearDown(self):
+        self.store.wait_for_compaction()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def _controller(self, write_behind=True):
+        controller = MealController(self.store, write_behind=write_behind, flush_interval=0)
+        controller.switch_user("cook@example.com")
+        self.addCleanup(controller.close)  # Runs before tearDown leaves the folder
+        return controller
+
+    def test_pending_changes_are_saved_on_logout(self):
+        controller = self._controller()
+        auth = AuthManager()
+        auth.subscribe(controller)
+        auth.current_user = "cook@example.com"
+        controller.save_meal_plan({"Monday": "Soup"})
+        self.assertTrue(os.path.exists(controller.journal_path))
+        self.assertNotEqual(controller._read_saved_meal_plan().get("Monday"), "Soup")
+        self.assertEqual(controller.read_meal_plan()["Monday"], "Soup")
+
+        auth.logout_user()
+        self.assertFalse(os.path.exists(controller.journal_path))
+        self.assertEqual(self._controller(write_behind=False).read_meal_plan()["Monday"], "Soup")
+
+    def test_journal_is_replayed_after_a_crash(self):
+        controller = self._controller()
+        controller.save_meal_plan({"Monday": "Soup"})
+        controller.save_meal_plan({"Tuesday": "Toast", "Monday": "Soup"})
+
+        # The process dies before it flushes; another one starts on the same folder
+        recovered = self._controller(write_behind=False)
+        self.assertFalse(os.path.exists(recovered.journal_path))
+        plan = recovered._read_saved_meal_plan()
+        self.assertEqual((plan["Monday"], plan["Tuesday"]), ("Soup", "Toast"))
+        self.assertEqual(recovered.grocery_tally.totals()[("onion", "")], 1.0)
+        self.assertEqual(recovered.refresh_grocery_list(), {"Tuesday": "Toast"})
+
+
+class MealPartitionTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)
+        self.store = RecipeStore(os.path.join(ensure_data_folder_exists(), "recipes.csv"))
+        self.controller = MealController(self.store, write_behind=False)
+
+    def tearDown(self):
+        self.store.wait_for_compaction()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def test_users_do_not_share_meal_plans(self):
+        self.controller.switch_user("ann@example.com")
+        self.controller.save_meal_plan({"Monday": "Soup"})
+        self.controller.switch_user("bob@example.com")
+        self.assertNotEqual(self.controller.read_meal_plan().get("Monday"), "Soup")
+        self.controller.save_meal_plan({"Monday": "Stew"})
+        self.controller.switch_user("Ann@Example.com")
+        self.assertEqual(self.controller.read_meal_plan()["Monday"], "Soup")
+
+
+class GroceryTallyTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)
+        self.store = RecipeStore(os.path.join(ensure_data_folder_exists(), "recipes.csv"))
+        for number in range(50):
+            self.store.add(f"Dish {number}", f"{number} g salt")
+        self.store.add("Tomato  SOUP", "2 tomatoes, 1 onion")
+        self.controller = MealController(self.store, write_behind=False)
+
+    def tearDown(self):
+        self.store.wait_for_compaction()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def test_meal_changes_read_only_the_planned_recipes(self):
+        with mock.patch.object(self.store, "recipes", side_effect=AssertionError("read every recipe")):
+            self.controller.save_meal_plan({"Monday": "tomato soup", "Tuesday": "Dish 3", "Friday": "Stew"})
+        totals = self.controller.grocery_tally.totals()
+        self.assertEqual((totals[("tomatoes", "")], totals[("onion", "")], totals[("salt", "g")]), (2.0, 1.0, 3.0))
+        self.assertEqual(self.controller.grocery_tally.pending, {"Friday": "Stew"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import io
+import unittest
+from unittest import mock
+from views.paginated_view import PaginatedView
+
+
+class PaginatedViewTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = [f"Dish {number}" for number in range(45)]
+        self.fetched = []
+
+    def view(self, rows=None):
+        rows = self.rows if rows is None else rows
+
+        def fetch_rows(start, count):
+            self.fetched.append((start, count))
+            return rows[start:start + count]
+
+        self.output = io.StringIO()
+        return PaginatedView(lambda: len(rows), fetch_rows, lambda number, row: f"{number}. {row}",
+                             page_size=20, output=self.output)
+
+    def test_pages_fetch_only_their_rows(self):
+        view = self.view()
+        self.assertEqual(view.page_count(), 3)
+        text = view.render_page(2)
+        self.assertEqual(text, "41. Dish 40\n42. Dish 41\n43. Dish 42\n44. Dish 43\n45. Dish 44\n"
+                               "-- Page 3 of 3 (45 items) --\n")
+        self.assertEqual(self.fetched, [(40, 20)])
+        self.assertEqual(self.view([]).render_page(0), "")
+
+    def test_navigation_and_selection(self):
+        view = self.view()
+        answers = iter(["n", "j", "9", "p", "23"])
+        with mock.patch("builtins.input", lambda prompt="": next(answers)):
+            self.assertEqual(view.show(select_prompt="Recipe number"), 23)
+        self.assertEqual([start for start, _ in self.fetched], [0, 20, 40, 20])
+
+    def test_single_page_has_no_navigation(self):
+        view = self.view(self.rows[:3])
+        with mock.patch("builtins.input", side_effect=AssertionError("prompted")):
+            self.assertIsNone(view.show())
+        self.assertEqual(self.output.getvalue(), "1. Dish 0\n2. Dish 1\n3. Dish 2\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
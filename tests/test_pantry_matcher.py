@@ -0,0 +1,30 @@
+import unittest
+from utils.pantry_matcher import PantryMatcher
+
+
+class _Store:
+    def __init__(self, recipes):
+        self._recipes = recipes
+
+    def recipes(self):
+        return self._recipes
+
+    def subscribe(self, listener):
+        pass
+
+
+class PantryMatcherTest(unittest.TestCase):
+    def test_recipes_without_ingredients_are_never_cookable(self):
+        matcher = PantryMatcher(_Store([(0, ("Water", "")), (1, ("Toast", "1 slice bread"))]))
+        matcher.add(2, "Air", " , ")
+        self.assertEqual(matcher.what_can_i_cook(["bread"]), {"cookable": [(1, "Toast")], "almost": []})
+        self.assertEqual(matcher.what_can_i_cook([]), {"cookable": [], "almost": [(1, "Toast", ["bread"])]})
+
+    def test_adding_ingredients_makes_a_recipe_cookable(self):
+        matcher = PantryMatcher(_Store([(0, ("Water", ""))]))
+        matcher.add(0, "Water", "water")
+        self.assertEqual(matcher.what_can_i_cook(["Water"])["cookable"], [(0, "Water")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+from unittest import mock
+from utils.password_hasher import PasswordHasher
+
+
+class PasswordHasherTest(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher(max_workers=4, rounds=4)
+        self.addCleanup(self.hasher.shutdown)
+
+    def test_hashes_and_verifies_on_the_pool(self):
+        hashed = self.hasher.hash_password("secret")
+        self.assertTrue(self.hasher.verify_password("secret", hashed))
+        self.assertFalse(self.hasher.verify_password("wrong", hashed))
+        futures = [self.hasher.submit_verify(password, hashed) for password in ("secret", "wrong") * 4]
+        self.assertEqual([future.result() for future in futures], [True, False] * 4)
+
+    def test_async_variants(self):
+        async def log_in():
+            hashed = await self.hasher.async_hash_password("secret")
+            return await asyncio.gather(
+                self.hasher.async_verify_password("secret", hashed), self.hasher.async_verify_password("wrong", hashed)
+            )
+
+        self.assertEqual(asyncio.run(log_in()), [True, False])
+
+    def test_process_pool(self):
+        hasher = PasswordHasher(max_workers=1, executor_type="process", rounds=4)
+        self.addCleanup(hasher.shutdown)
+        self.assertTrue(hasher.verify_password("secret", hasher.hash_password("secret")))
+
+    def test_unknown_executor_type(self):
+        with self.assertRaises(ValueError):
+            PasswordHasher(executor_type="fiber")
+
+
+class CostFactorTest(unittest.TestCase):
+    def test_calibration_picks_the_highest_cost_within_the_target(self):
+        clock = [0.0]
+
+        def checkpw(password, hashed_password):
+            clock[0] += 2 ** (PasswordHasher.get_cost(hashed_password.decode("ascii")) - 4) / 1000  # 1 ms at cost 4
+
+        with mock.patch("utils.password_hasher.bcrypt.hashpw", lambda password, salt: salt + b"hash"), \
+                mock.patch("utils.password_hasher.bcrypt.checkpw", checkpw), \
+                mock.patch("utils.password_hasher.time.perf_counter", lambda: clock[0]):
+            self.assertEqual(PasswordHasher.calibrate_rounds(target_ms=50, min_rounds=4), 9)  # 32 ms; cost 10 takes 64
+            self.assertEqual(PasswordHasher.calibrate_rounds(target_ms=50), PasswordHasher.MIN_ROUNDS)
+            self.assertEqual(PasswordHasher.calibrate_rounds(target_ms=10 ** 6, min_rounds=4, max_rounds=12), 12)
+
+    def test_needs_rehash_compares_the_cost(self):
+        hasher = PasswordHasher(rounds=5)
+        self.assertEqual(PasswordHasher.get_cost("$2b$04$abc"), 4)
+        self.assertIsNone(PasswordHasher.get_cost("plain"))
+        self.assertTrue(hasher.needs_rehash("$2b$04$abc"))
+        self.assertFalse(hasher.needs_rehash("$2b$05$abc"))
+        self.assertFalse(PasswordHasher().needs_rehash("$2b$04$abc"))  # No configured cost
+
+
+if __name__ == "__main__":
+    unittest.main()
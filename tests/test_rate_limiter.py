@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+from utils.rate_limiter import RateLimiter
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("utils.rate_limiter.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_refills_over_time(self):
+        limiter = RateLimiter(capacity=2, refill_per_second=0.5)
+        self.assertEqual(limiter.acquire("a"), (0.0, False))
+        self.assertEqual(limiter.acquire("a"), (0.0, False))
+        self.assertEqual(limiter.acquire("a"), (2.0, True))
+        self.assertEqual(limiter.acquire("a"), (2.0, False))  # Only the first rejection is reported
+        self.now += 1
+        self.assertEqual(limiter.acquire("a"), (1.0, False))
+        self.now += 1
+        self.assertEqual(limiter.acquire("a"), (0.0, False))
+        self.now += 60
+        for _ in range(2):  # Refills up to the capacity, not beyond
+            self.assertEqual(limiter.acquire("a")[0], 0.0)
+        self.assertGreater(limiter.acquire("a")[0], 0.0)
+
+    def test_backoff_doubles_after_the_free_failures(self):
+        limiter = RateLimiter(capacity=100, free_failures=2, base_backoff=1.0, max_backoff=4.0)
+        delays = []
+        for _ in range(6):
+            limiter.record_failure("a")
+            delays.append(limiter.acquire("a")[0])
+        self.assertEqual(delays, [0.0, 0.0, 1.0, 2.0, 4.0, 4.0])
+        limiter.record_success("a")
+        self.assertEqual(limiter.acquire("a")[0], 0.0)
+
+    def test_least_recently_used_key_is_evicted(self):
+        limiter = RateLimiter(capacity=1, max_keys=2)
+        limiter.acquire("a")
+        limiter.acquire("b")
+        self.assertGreater(limiter.acquire("a")[0], 0.0)  # Makes "b" the least recently used
+        limiter.acquire("c")
+        self.assertEqual(len(limiter), 2)
+        self.assertGreater(limiter.acquire("a")[0], 0.0)  # Kept, still empty
+        self.assertEqual(limiter.acquire("b")[0], 0.0)  # Evicted, starts with a full bucket
+
+
+if __name__ == "__main__":
+    unittest.main()
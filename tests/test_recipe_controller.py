@@ -0,0 +1,55 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from controllers.recipe_controller import RecipeController
+
+
+class RecipeChoiceTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The controller keeps its data under the working directory
+        self.controller = RecipeController()
+        self.store = self.controller.recipe_store
+        self.store.add("Soup", "water")
+        self.store.add("Stew", "beans")
+
+    def tearDown(self):
+        self.store.wait_for_compaction()
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def _count_after_a_compaction(self):
+        """
+        Stands in for count() waiting for a background compaction, which bumps the revision.
+        """
+        count, compactions = self.store.count, [self.store.compact]
+
+        def compact_then_count():
+            while compactions:
+                compactions.pop()()
+            return count()
+
+        return mock.patch.object(self.store, "count", side_effect=compact_then_count)
+
+    def test_edit_is_not_refused_because_of_a_compaction_it_waited_for(self):
+        answers = iter(["2", "Bean Stew", "beans, carrots"])
+        with self._count_after_a_compaction(), mock.patch("builtins.input", lambda prompt="": next(answers)), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            self.controller.edit_recipe()
+        self.assertIn("Recipe updated successfully!", output.getvalue())
+        self.assertEqual([tuple(row) for _, row in self.store.recipes()], [("Soup", "water"), ("Bean Stew", "beans, carrots")])
+
+    def test_delete_is_not_refused_because_of_a_compaction_it_waited_for(self):
+        answers = iter(["1", "y"])
+        with self._count_after_a_compaction(), mock.patch("builtins.input", lambda prompt="": next(answers)), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.controller.delete_recipe()
+        self.assertEqual([tuple(row) for _, row in self.store.recipes()], [("Stew", "beans")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from utils.recipe_search import BKTree, RecipeSearchEngine, levenshtein
+from utils.recipe_store import RecipeStore
+
+
+def naive_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class LevenshteinTest(unittest.TestCase):
+    def test_matches_the_dynamic_programming_distance(self):
+        rng = random.Random(7)
+        words = ["", "a", "soup", "sopu", "tomato soup", "tomatoe", "kitten", "sitting", "x" * 70, "xy" * 40]
+        words += ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 80))) for _ in range(200)]
+        for _ in range(1000):
+            a, b = rng.choice(words), rng.choice(words)
+            self.assertEqual(levenshtein(a, b), naive_levenshtein(a, b), (a, b))
+
+    def test_bk_tree_finds_every_word_within_the_distance(self):
+        rng = random.Random(11)
+        words = {"".join(rng.choice("abcd") for _ in range(rng.randint(1, 8))) for _ in range(300)}
+        tree = BKTree()
+        for word in words:
+            tree.add(word)
+        for query in ("abc", "dddd", "a", "bacd"):
+            expected = sorted((word, naive_levenshtein(query, word)) for word in words if naive_levenshtein(query, word) <= 2)
+            self.assertEqual(sorted(tree.search(query, 2)), expected, query)
+
+
+class RecipeSearchCompactionTest(unittest.TestCase):
+    def test_search_after_a_compaction(self):
+        with tempfile.TemporaryDirectory() as folder:
+            store = RecipeStore(os.path.join(folder, "recipes.csv"), max_journal_records=1000, background=False)
+            engine = RecipeSearchEngine(store)
+            for name in ("Tomato Soup", "Bean Stew", "Tomato Salad", "Onion Soup"):
+                store.add(name, "water")
+            store.delete(0)
+            store.delete(1)
+            # Renumbers Tomato Salad to 0 and Onion Soup to 1; the engine must not read the store back
+            with mock.patch.object(store, "recipes", side_effect=AssertionError("on_compact read the store")):
+                store.compact()
+
+            self.assertEqual(engine.autocomplete("tom"), [(0, "Tomato Salad")])
+            self.assertEqual(engine.fuzzy_search("sup"), [(1, "Onion Soup", 1)])
+            self.assertEqual(engine.search("salad"), [(0, "Tomato Salad")])
+            self.assertEqual(len(engine), 2)
+            store.edit(1, "Onion Tart", "pastry")
+            self.assertEqual(engine.autocomplete("onion"), [(1, "Onion Tart")])
+            self.assertEqual(engine.fuzzy_search("soup"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from utils.ingredient_index import IngredientIndex
+from utils.recipe_store import RecipeStore
+
+
+def _reload_while_compaction_waits(folder, results):
+    """
+    Reloads the store, with an ingredient index subscribed, while a background
+    compaction thread is waiting for the store's lock.
+    """
+    os.chdir(folder)
+    path = os.path.join(folder, "recipes.csv")
+    store = RecipeStore(path, max_journal_records=1)
+    index = IngredientIndex(store)
+    other = RecipeStore(path, max_journal_records=1000)  # Stands in for another process
+    with store._lock:  # Keep the compaction started by add() waiting for the lock
+        store.add("Soup", "water, salt")
+        other.add("Stew", "beans, carrots")
+        store.get(0)  # Sees the other store's change and notifies on_reload
+    store.wait_for_compaction()
+    results.put(sorted(index.search(["beans"])) + sorted(index.search(["water"])))
+
+
+class RecipeStoreReloadTest(unittest.TestCase):
+    def test_reload_does_not_deadlock_with_a_waiting_compaction(self):
+        with tempfile.TemporaryDirectory() as folder:
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(target=_reload_while_compaction_waits, args=(folder, results))
+            process.start()
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                self.fail("Reloading the store deadlocked with the waiting compaction thread.")
+            self.assertEqual(process.exitcode, 0)
+            self.assertEqual(len(results.get(timeout=5)), 2)
+
+
+class StaleJournalTest(unittest.TestCase):
+    def test_stale_journal_is_kept_as_a_backup(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "recipes.csv")
+            journal = os.path.join(folder, "recipes.journal")
+            with open(journal, mode="w", encoding="utf-8") as file:
+                file.write('{"header": {"rows": 99}}\n')
+            store = RecipeStore(path)
+            self.assertEqual(store.recipes(), [])
+            self.assertFalse(os.path.exists(journal))
+            backups = [name for name in os.listdir(folder) if name.endswith(".stale")]
+            self.assertEqual(len(backups), 1)
+            with open(os.path.join(folder, backups[0]), encoding="utf-8") as file:
+                self.assertEqual(file.read(), '{"header": {"rows": 99}}\n')
+
+
+class RecipeStorePageTest(unittest.TestCase):
+    def test_pages_follow_edits_deletes_and_compactions(self):
+        with tempfile.TemporaryDirectory() as folder:
+            store = RecipeStore(os.path.join(folder, "recipes.csv"), max_journal_records=1000, background=False)
+            for number in range(6):
+                store.add(f"Dish {number}", "salt")
+            store.compact()  # Dishes 0-5 are now CSV rows, read through the offset index
+            store.delete(1)
+            store.delete(2)
+            store.edit(4, "Dish 4b", "pepper")
+            store.add("Dish 6", "salt")
+
+            def check_pages():
+                live = [(recipe_id, tuple(row)) for recipe_id, row in store.recipes()]
+                for start in range(len(live) + 1):
+                    for count in (1, 2, 5):
+                        page = [(recipe_id, tuple(row)) for recipe_id, row in store.page(start, count)]
+                        self.assertEqual(page, live[start:start + count], (start, count))
+                return live
+
+            self.assertEqual([row[0] for _, row in check_pages()], ["Dish 0", "Dish 3", "Dish 4b", "Dish 5", "Dish 6"])
+            store.compact()
+            self.assertEqual(store.at_position(2), (2, ("Dish 4b", "pepper")))
+            check_pages()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from utils.session_manager import SessionManager
+
+
+class SessionManagerTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The session store and key live in the data folder
+        self.sessions = SessionManager(ttl_seconds=60)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def test_token_is_valid_until_it_expires(self):
+        token = self.sessions.issue("cook@example.com")
+        self.assertEqual(self.sessions.validate(token), "cook@example.com")
+        self.assertEqual(SessionManager().validate(token), "cook@example.com")  # Another process run
+        later = time.time() + 61
+        with mock.patch("utils.session_manager.time.time", return_value=later):
+            self.assertIsNone(self.sessions.validate(token))
+
+    def test_tampered_tokens_are_refused(self):
+        token = self.sessions.issue("cook@example.com")
+        session_id, expires, signature = token.split(".")
+        forged_signature = ("0" if signature[0] != "0" else "1") + signature[1:]
+        for forged in (
+            f"{session_id}.{int(expires) + 3600}.{signature}",  # Extended expiry
+            f"{session_id}.{expires}.{forged_signature}",
+            f"{session_id}x.{expires}.{signature}",
+            f"{session_id}.{expires}",
+            "",
+        ):
+            self.assertIsNone(self.sessions.validate(forged), forged)
+
+    def test_tokens_signed_with_another_key_are_refused(self):
+        token = self.sessions.issue("cook@example.com")
+        os.remove(self.sessions.key_path)
+        self.assertIsNone(SessionManager().validate(token))
+
+    def test_revoked_token_is_refused(self):
+        token = self.sessions.issue("cook@example.com")
+        other = self.sessions.issue("cook@example.com")
+        self.sessions.revoke(token)
+        self.assertIsNone(SessionManager().validate(token))
+        self.assertEqual(self.sessions.validate(other), "cook@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
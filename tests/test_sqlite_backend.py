@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from utils.sqlite_backend import SqliteBackend
+
+
+class SqliteConnectionPoolTest(unittest.TestCase):
+    def test_eviction_never_closes_a_connection_in_use(self):
+        with tempfile.TemporaryDirectory() as folder:
+            backend = SqliteBackend()
+            backend.MAX_CONNECTIONS = 2
+            paths = []
+            for number in range(6):
+                os.makedirs(os.path.join(folder, str(number)))
+                path = os.path.join(folder, str(number), "recipes.csv")
+                backend.write_rows(path, ["Recipe Name", "Ingredients"], [("Soup", "water")], durable=False)
+                paths.append(path)
+            errors = []
+
+            def use_databases(offset):
+                try:
+                    for step in range(300):
+                        backend.read_rows(paths[(offset + step) % len(paths)])
+                        backend.count(paths[(offset * 7 + step) % len(paths)])
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=use_databases, args=(offset,)) for offset in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            open_connections = len(backend._connections)
+            backend.close()
+            self.assertEqual(errors, [])
+            self.assertLessEqual(open_connections, backend.MAX_CONNECTIONS)
+
+
+class SqliteSchemaUpgradeTest(unittest.TestCase):
+    def test_email_index_of_an_older_database_becomes_case_insensitive(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "users.csv")
+            backend = SqliteBackend()
+            backend.write_rows(path, ["Email", "Password"], [("Bob@X.com", "hash")], durable=False)
+            backend.close()
+            connection = sqlite3.connect(os.path.join(folder, SqliteBackend.DATABASE_NAME))
+            connection.executescript(  # The schema before emails were matched regardless of case
+                "DROP INDEX users__c0; CREATE INDEX users__c0 ON users (c0); PRAGMA user_version = 2;"
+            )
+            connection.close()
+            backend = SqliteBackend()
+            self.assertEqual(backend.find_rows(path, "Email", "bob@x.com"), [(0, ("Bob@X.com", "hash"))])
+            self.assertTrue(backend.update_row(path, "Email", "BOB@x.com", {"Password": "new"}, durable=False))
+            self.assertEqual(backend.read_rows(path)[1], (("Bob@X.com", "new"),))
+            backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
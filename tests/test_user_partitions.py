@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+from utils.user_partitions import UserPartitions
+
+
+class UserPartitionsTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.partitions = UserPartitions(os.path.join(self._folder.name, "users"))
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_each_user_gets_one_folder(self):
+        ann = self.partitions.folder("ann@example.com")
+        self.assertTrue(os.path.isdir(ann))
+        self.assertEqual(self.partitions.folder(" Ann@Example.COM"), ann)
+        self.assertNotEqual(self.partitions.folder("bob@example.com"), ann)
+        key = self.partitions.key("ann@example.com")
+        self.assertEqual(os.path.relpath(ann, self.partitions.root), os.path.join(key[:2], key))
+
+    def test_users_are_listed_from_the_bucket_indexes(self):
+        self.assertEqual(list(self.partitions.users()), [])
+        emails = [f"cook{number}@example.com" for number in range(20)]
+        for email in emails + ["COOK1@example.com"]:
+            self.partitions.folder(email)
+        listed = dict(self.partitions.users())
+        self.assertEqual(sorted(listed), sorted(emails))
+        self.assertEqual(listed["cook3@example.com"], self.partitions.path("cook3@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
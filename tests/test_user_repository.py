@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import bcrypt
+
+from utils.auth_manager import AuthManager
+from utils.config_manager import ConfigManager
+from utils.file_manager import FileManager
+from utils.password_hasher import PasswordHasher
+from utils.sqlite_backend import SqliteBackend
+from utils.storage_backend import CsvBackend
+from utils.user_repository import UserRepository
+
+
+class UserRepositoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._folder.name, "users.csv")
+
+    def tearDown(self):
+        self._folder.cleanup()
+
+    def test_lookups_use_the_index_until_the_file_changes(self):
+        repository, other = UserRepository(self.path), UserRepository(self.path)  # Two processes
+        self.assertTrue(repository.add_user("Ann@X.com", "hash-a"))
+        self.assertFalse(repository.add_user("ann@x.com", "hash-b"))
+        with mock.patch.object(repository.file_manager, "read_rows", side_effect=AssertionError("re-read the file")):
+            self.assertEqual(repository.get_user("ANN@x.com")["Password"], "hash-a")
+            self.assertIsNone(repository.get_user("bob@x.com"))
+
+        self.assertTrue(other.add_user("bob@x.com", "hash-b"))
+        self.assertEqual(repository.get_user("bob@x.com")["Password"], "hash-b")
+        self.assertFalse(repository.add_user("bob@x.com", "hash-c"))
+        self.assertEqual(len(repository), 2)
+
+
+class LegacyEmailTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._folder = tempfile.TemporaryDirectory()
+        os.chdir(self._folder.name)  # The user store lives under the working directory
+        ConfigManager().set("bcrypt_rounds", 4)  # Skip calibration; the cost doesn't matter here
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._folder.cleanup()
+
+    def _log_in_to_mixed_case_row(self, backend):
+        with mock.patch("utils.storage_backend._default_backend", backend):
+            # A user registered before emails were normalized
+            hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode("utf-8")
+            FileManager("data/users.csv").write_csv([{"Email": "Bob@X.com", "Password": hashed}], ["Email", "Password"])
+            auth = AuthManager(password_hasher=PasswordHasher(max_workers=1))
+            self.assertTrue(auth.verify_credentials("bob@x.com", "secret"))
+            self.assertTrue(auth.verify_credentials(" BOB@x.COM", "secret"))
+            self.assertFalse(auth.verify_credentials("bob@x.com", "wrong"))
+            self.assertFalse(auth.user_repository.add_user("bob@x.com", hashed))
+            self.assertTrue(auth.user_repository.update_password("bob@x.com", "new-hash"))
+            self.assertEqual(auth.user_repository.get_user("BOB@x.com")["Password"], "new-hash")
+            auth.password_hasher.shutdown()
+
+    def test_csv_backend(self):
+        self._log_in_to_mixed_case_row(CsvBackend())
+
+    def test_sqlite_backend(self):
+        backend = SqliteBackend()
+        try:
+            self._log_in_to_mixed_case_row(backend)
+        finally:
+            backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
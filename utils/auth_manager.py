@@ -1,8 +1,12 @@
-import csv
-import os
-import bcrypt
+import math
+from utils.file_manager import FileManager
 from utils.logger import Logger
 from models.user_model import UserModel
+from utils.user_repository import UserRepository, normalize_email
+from utils.password_hasher import get_password_hasher
+from utils.config_manager import ConfigManager
+from utils.session_manager import SessionManager
+from utils.rate_limiter import LoginThrottledError, RateLimiter
 
 
 class AuthManager:
@@ -13,31 +17,80 @@ class AuthManager:
         user_model (UserModel): The user model for handling user data.
         current_user (str): The email of the currently logged-in user.
         user_file_path (str): Path to the CSV file storing user credentials.
+        user_repository (UserRepository): Email-indexed view over the user CSV file.
+        password_hasher (PasswordHasher): Runs bcrypt work on a worker pool.
+        config (ConfigManager): Application settings, including the calibrated bcrypt cost.
+        session_manager (SessionManager): Issues and checks signed session tokens.
+        session_token (str): The token of the current session, if any.
+        email_limiter (RateLimiter): Throttles login attempts per email address.
+        source_limiter (RateLimiter): Throttles login attempts per request source.
+
+    Emails are normalized (see `normalize_email`) wherever they enter, so a user is the
+    same account, and has the same data partition, whatever case they type.
+
+    Objects that hold unsaved per-user state (such as a write-behind MealController) can
+    `subscribe()` to be called with `on_logout(email)` before a user is logged out.
     """
 
-    def __init__(self):
+    DEFAULT_TARGET_VERIFY_MS = 50
+
+    def __init__(self, password_hasher=None):
         """
         Initializes the AuthManager with necessary attributes and ensures the user CSV file exists.
+
+        Args:
+            password_hasher (PasswordHasher, optional): The hasher to use for bcrypt work.
+                Defaults to the shared process-wide hasher.
         """
+        self.password_hasher = password_hasher or get_password_hasher()
+        self.config = ConfigManager()
+        self.password_hasher.rounds = self.get_bcrypt_rounds()
+        self.session_manager = SessionManager(
+            self.config.get("session_ttl_seconds", SessionManager.DEFAULT_TTL_SECONDS)
+        )
+        self.session_token = None
+        self._listeners = []
+        self.email_limiter = RateLimiter()
+        self.source_limiter = RateLimiter(capacity=20, refill_per_second=1.0, free_failures=20)
         self.user_model = UserModel()
         self.current_user = None  # Initialize current_user as None
         self.user_file_path = "data/users.csv"  # Path to the user CSV file
         self.create_user_csv_if_not_exists()
+        self.user_repository = UserRepository(self.user_file_path)
 
     def create_user_csv_if_not_exists(self):
         """
         Ensures the user CSV file exists. Creates it with headers if it doesn't.
         """
-        if not os.path.exists(self.user_file_path):
-            try:
-                with open(self.user_file_path, mode="w", newline="") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["Email", "Password"])  # Writing the headers
+        try:
+            if FileManager(self.user_file_path).create_if_missing(["Email", "Password"]):  # Writing the headers
                 Logger.log_info(f"Created new user CSV file with headers: {self.user_file_path}")
-            except Exception as e:
-                error_message = f"An error occurred while creating the users CSV file: {e}"
-                print(error_message)
-                Logger.log_error(error_message)
+        except Exception as e:
+            error_message = f"An error occurred while creating the users CSV file: {e}"
+            print(error_message)
+            Logger.log_error(error_message)
+
+    def get_bcrypt_rounds(self, recalibrate=False):
+        """
+        Returns the configured bcrypt cost, calibrating and storing it on first use.
+
+        The cost is picked from the target verify latency ("bcrypt_target_ms" in the
+        configuration, 50 ms by default) measured on the current machine.
+
+        Args:
+            recalibrate (bool): If True, measure again even if a cost is already stored.
+
+        Returns:
+            int: The bcrypt cost factor to use for new hashes.
+        """
+        rounds = self.config.get("bcrypt_rounds")
+        if rounds is None or recalibrate:
+            target_ms = self.config.get("bcrypt_target_ms", self.DEFAULT_TARGET_VERIFY_MS)
+            rounds = self.password_hasher.calibrate_rounds(target_ms)
+            self.config.set("bcrypt_target_ms", target_ms)
+            self.config.set("bcrypt_rounds", rounds)
+            Logger.log_info(f"Calibrated bcrypt cost factor {rounds} for a {target_ms} ms verify target.")
+        return rounds
 
     def register_user(self):
         """
@@ -47,7 +100,7 @@ class AuthManager:
         Raises:
             ValueError: If email or password input is invalid.
         """
-        email = input("Enter your email: ").strip()
+        email = normalize_email(input("Enter your email: "))
         password = input("Enter a password: ").strip()
 
         if not email or not password:
@@ -55,17 +108,14 @@ class AuthManager:
 
         try:
             # Check if the email already exists
-            with open(self.user_file_path, mode="r", newline="") as file:
-                reader = csv.DictReader(file)
-                if any(row["Email"] == email for row in reader):
-                    print("Email already registered. Please try again with a different email.")
-                    return
-
-            # Hash the password and save the user
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-            with open(self.user_file_path, mode="a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow([email, hashed_password.decode('utf-8')])
+            if self.user_repository.exists(email):
+                print("Email already registered. Please try again with a different email.")
+                return
+
+            # Hash the password and save the user; add_user re-checks the email under its lock
+            if not self.create_user(email, password):
+                print("Email already registered. Please try again with a different email.")
+                return
             print("User registered successfully!")
             Logger.log_info(f"User registered: {email}")
 
@@ -82,7 +132,7 @@ class AuthManager:
         Returns:
             bool: True if login is successful, False otherwise.
         """
-        email = input("Enter your email: ").strip()
+        email = normalize_email(input("Enter your email: "))
         password = input("Enter your password: ").strip()
 
         if not email or not password:
@@ -91,24 +141,235 @@ class AuthManager:
 
         try:
             # Check credentials
-            with open(self.user_file_path, mode="r", newline="") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if row["Email"] == email:
-                        stored_hashed_password = row["Password"]
-                        if bcrypt.checkpw(password.encode('utf-8'), stored_hashed_password.encode('utf-8')):
-                            self.current_user = email
-                            print(f"Login successful! Welcome, {self.current_user}")
-                            Logger.log_info(f"User logged in successfully: {email}")
-                            return True
+            if self.verify_credentials(email, password):
+                self.current_user = email
+                self.start_session()
+                print(f"Login successful! Welcome, {self.current_user}")
+                Logger.log_info(f"User logged in successfully: {email}")
+                return True
 
             # No match found
             print("Invalid email or password. Please try again.")
             Logger.log_warning(f"Failed login attempt for email: {email}")
             return False
 
+        except LoginThrottledError as e:
+            print(e)
+            return False
+
         except Exception as e:
             error_message = f"An error occurred during login: {e}"
             print(error_message)
             Logger.log_error(error_message)
             return False
+
+    def start_session(self):
+        """
+        Issues a session token for the current user and remembers it for the next run.
+
+        Returns:
+            str: The session token.
+        """
+        self.session_token = self.session_manager.issue(self.current_user)
+        self.session_manager.save_current_token(self.session_token)
+        return self.session_token
+
+    def resume_session(self):
+        """
+        Resumes the session remembered from a previous run, if it is still valid.
+
+        Returns:
+            bool: True if a session was resumed, False otherwise.
+        """
+        token = self.session_manager.load_current_token()
+        email = self.session_manager.validate(token)
+        if email is None:
+            self.session_manager.clear_current_token()
+            return False
+        self.current_user = email
+        self.session_token = token
+        Logger.log_info(f"Resumed session for {email}")
+        return True
+
+    def has_valid_session(self):
+        """
+        Checks that the current user's session is still valid, without re-running bcrypt.
+
+        Returns:
+            bool: True if the session token is valid and belongs to the current user.
+        """
+        return (
+            self.current_user is not None
+            and self.session_manager.validate(self.session_token) == self.current_user
+        )
+
+    def subscribe(self, listener):
+        """
+        Registers a listener to be called with `on_logout(email)` before each logout.
+
+        Args:
+            listener (object): An object implementing `on_logout`.
+        """
+        self._listeners.append(listener)
+
+    def logout_user(self):
+        """
+        Ends the current session and forgets the logged-in user.
+        Subscribed listeners are notified first; a failing listener never blocks the logout.
+        """
+        for listener in self._listeners:
+            try:
+                listener.on_logout(self.current_user)
+            except Exception as e:
+                Logger.log_error(f"Error notifying {type(listener).__name__}.on_logout: {e}")
+        self.session_manager.revoke(self.session_token)
+        self.session_manager.clear_current_token()
+        Logger.log_info(f"User logged out: {self.current_user}")
+        self.current_user = None
+        self.session_token = None
+
+    def create_user(self, email, password):
+        """
+        Hashes the password on the worker pool and stores a new user, without prompting.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's plain-text password.
+
+        Returns:
+            bool: True if the user was created, False if the email is already registered.
+
+        Raises:
+            OSError: If the user could not be stored.
+        """
+        email = normalize_email(email)
+        if self.user_repository.exists(email):
+            return False
+        hashed_password = self.password_hasher.hash_password(password)
+        return self.user_repository.add_user(email, hashed_password)
+
+    async def async_create_user(self, email, password):
+        """
+        Async variant of `create_user` that doesn't block the event loop while hashing.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's plain-text password.
+
+        Returns:
+            bool: True if the user was created, False if the email is already registered.
+
+        Raises:
+            OSError: If the user could not be stored.
+        """
+        email = normalize_email(email)
+        if self.user_repository.exists(email):
+            return False
+        hashed_password = await self.password_hasher.async_hash_password(password)
+        # add_user re-checks: the email may have been registered while we were hashing
+        return self.user_repository.add_user(email, hashed_password)
+
+    def _check_login_allowed(self, email, source):
+        """
+        Rejects a login attempt before any file I/O or hashing if either its email or its
+        source is being throttled. Throttling is logged once per episode, not per attempt.
+
+        Args:
+            email (str): The email address being logged into.
+            source (str): Where the attempt comes from (e.g. "local" or a client address).
+
+        Raises:
+            LoginThrottledError: If the attempt must be rejected.
+        """
+        for limiter, key in ((self.email_limiter, email), (self.source_limiter, source)):
+            retry_after, first_rejection = limiter.acquire(key)
+            if retry_after:
+                if first_rejection:
+                    Logger.log_warning(f"Throttling login attempts for {key} for {math.ceil(retry_after)} seconds.")
+                raise LoginThrottledError(retry_after)
+
+    def _record_login_result(self, email, source, success):
+        """
+        Feeds the outcome of a login attempt back into the rate limiters.
+
+        Args:
+            email (str): The email address being logged into.
+            source (str): Where the attempt came from.
+            success (bool): Whether the credentials were valid.
+        """
+        if success:
+            self.email_limiter.record_success(email)
+        else:
+            self.email_limiter.record_failure(email)
+            self.source_limiter.record_failure(source)
+
+    def verify_credentials(self, email, password, source="local"):
+        """
+        Checks an email and password against the stored hash, without prompting.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's plain-text password.
+            source (str): Where the attempt comes from, for throttling. Defaults to "local".
+
+        Returns:
+            bool: True if the credentials are valid, False otherwise.
+
+        Raises:
+            LoginThrottledError: If too many attempts were made for the email or source.
+        """
+        email = normalize_email(email)
+        self._check_login_allowed(email, source)
+        user = self.user_repository.get_user(email)
+        valid = user is not None and self.password_hasher.verify_password(password, user["Password"])
+        self._record_login_result(email, source, valid)
+        if not valid:
+            return False
+        if self.password_hasher.needs_rehash(user["Password"]):
+            try:
+                self._store_rehash(email, self.password_hasher.hash_password(password))
+            except Exception as e:
+                Logger.log_error(f"Error rehashing password for {email}: {e}")
+        return True
+
+    async def async_verify_credentials(self, email, password, source="local"):
+        """
+        Async variant of `verify_credentials` that doesn't block the event loop while verifying.
+
+        Args:
+            email (str): The user's email address.
+            password (str): The user's plain-text password.
+            source (str): Where the attempt comes from, for throttling. Defaults to "local".
+
+        Returns:
+            bool: True if the credentials are valid, False otherwise.
+
+        Raises:
+            LoginThrottledError: If too many attempts were made for the email or source.
+        """
+        email = normalize_email(email)
+        self._check_login_allowed(email, source)
+        user = self.user_repository.get_user(email)
+        valid = user is not None and await self.password_hasher.async_verify_password(password, user["Password"])
+        self._record_login_result(email, source, valid)
+        if not valid:
+            return False
+        if self.password_hasher.needs_rehash(user["Password"]):
+            try:
+                self._store_rehash(email, await self.password_hasher.async_hash_password(password))
+            except Exception as e:
+                Logger.log_error(f"Error rehashing password for {email}: {e}")
+        return True
+
+    def _store_rehash(self, email, new_hash):
+        """
+        Replaces a user's stored hash with one made at the configured cost.
+
+        Callers log failures instead of failing the login that triggered the rehash.
+
+        Args:
+            email (str): The user's email address.
+            new_hash (str): The new bcrypt hash.
+        """
+        self.user_repository.update_password(email, new_hash)
+        Logger.log_info(f"Rehashed password for {email} at cost {self.password_hasher.rounds}.")
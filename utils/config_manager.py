@@ -0,0 +1,67 @@
+import json
+import os
+from utils.folder_manager import ensure_data_folder_exists
+from utils.logger import Logger
+
+
+class ConfigManager:
+    """
+    A small JSON-backed settings store kept in the data folder.
+
+    Attributes:
+        file_path (str): Path to the JSON configuration file.
+    """
+
+    def __init__(self, file_name="config.json"):
+        """
+        Initializes the ConfigManager and loads any existing settings.
+
+        Args:
+            file_name (str): The name of the configuration file inside the data folder.
+                             Defaults to "config.json".
+        """
+        self.file_path = os.path.join(ensure_data_folder_exists(), file_name)
+        self._settings = self._load()
+
+    def _load(self):
+        """
+        Loads the settings from disk.
+
+        Returns:
+            dict: The stored settings, or an empty dictionary if the file is missing or unreadable.
+        """
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, mode="r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            Logger.log_error(f"Error reading configuration file {self.file_path}: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        """
+        Returns a setting.
+
+        Args:
+            key (str): The name of the setting.
+            default: The value to return if the setting isn't stored.
+
+        Returns:
+            The stored value, or `default`.
+        """
+        return self._settings.get(key, default)
+
+    def set(self, key, value):
+        """
+        Stores a setting and writes the configuration file.
+
+        Args:
+            key (str): The name of the setting.
+            value: A JSON-serializable value.
+        """
+        self._settings[key] = value
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as file:
+            json.dump(self._settings, file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.file_path)
@@ -0,0 +1,199 @@
+import csv
+import io
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from utils.logger import Logger
+
+
+class CsvOffsetIndex:
+    """
+    A sidecar index of the byte offset of every record in a CSV file, with an
+    `mmap`-based reader for random access by row number.
+
+    Reaching row N of a CSV file normally means parsing every row before it. The index
+    stores where each data record starts, so a row or a page of rows is read by mapping
+    the file, slicing out just those bytes and parsing only them: O(page) instead of
+    O(file). Rows are numbered from 0 after the header, skipping blank lines, the same
+    way as `FileManager.read_rows`.
+
+    The index is saved next to the CSV file together with the CSV file's (mtime_ns, size)
+    and is rebuilt with one scan of the file whenever they no longer match.
+
+    File layout (little-endian): magic, format version, CSV mtime_ns, CSV size,
+    row count, then one uint64 start offset per row.
+
+    Attributes:
+        csv_path (str): Path to the CSV file.
+        path (str): Path to the offset index file.
+    """
+
+    MAGIC = b"MPOFFS"
+    FORMAT_VERSION = 1
+    _HEADER = struct.Struct("<6sHqQQ")
+
+    def __init__(self, csv_path):
+        """
+        Initializes the CsvOffsetIndex for a CSV file. The index is loaded or built on first use.
+
+        Args:
+            csv_path (str): Path to the CSV file.
+        """
+        self.csv_path = csv_path
+        self.path = os.path.splitext(csv_path)[0] + ".offsets"
+        self._lock = threading.Lock()
+        self._signature = None
+        self._offsets = array("Q")
+
+    # ------------------------------------------------------------------ index maintenance
+
+    @staticmethod
+    def _stat_signature(stat):
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _current(self, file):
+        """
+        Returns the offsets for an open CSV file, loading or rebuilding them if needed.
+        Must be called with the lock held.
+        """
+        signature = self._stat_signature(os.fstat(file.fileno()))
+        if signature != self._signature:
+            offsets = self._load(signature)
+            if offsets is None:
+                offsets = self._build(signature, file)
+            self._offsets, self._signature = offsets, signature
+        return self._offsets
+
+    def _load(self, signature):
+        """
+        Loads the saved index if it matches the CSV file.
+        """
+        try:
+            with open(self.path, mode="rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        if len(data) < self._HEADER.size:
+            return None
+        magic, version, mtime_ns, size, count = self._HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC or version != self.FORMAT_VERSION or (mtime_ns, size) != signature:
+            return None
+        offsets = array("Q")
+        offsets.frombytes(data[self._HEADER.size:])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return offsets if len(offsets) == count else None
+
+    def _build(self, signature, file):
+        """
+        Scans the CSV file for record boundaries and saves the index.
+
+        A newline ends a record unless it is inside a quoted field, i.e. unless the record
+        so far holds an odd number of quote characters (escaped quotes come in pairs).
+        """
+        offsets = array("Q")
+        position = 0
+        record_start = None
+        open_quotes = False
+        seen_header = False
+        file.seek(0)
+        for line in file:
+            if record_start is None:
+                if seen_header and not line.strip(b"\r\n"):
+                    position += len(line)
+                    continue  # Blank lines between records are skipped, as csv.reader does
+                record_start = position
+            if line.count(b'"') % 2:
+                open_quotes = not open_quotes
+            position += len(line)
+            if not open_quotes:
+                if seen_header:
+                    offsets.append(record_start)
+                seen_header = True
+                record_start = None
+        if record_start is not None and seen_header:
+            offsets.append(record_start)  # An unterminated quoted field runs to the end of the file
+        self._save(signature, offsets)
+        Logger.log_info(f"Built CSV offset index for {self.csv_path} ({len(offsets)} rows).")
+        return offsets
+
+    def _save(self, signature, offsets):
+        """
+        Writes the index next to the CSV file. Failures are logged and otherwise ignored.
+        """
+        data = array("Q", offsets)
+        if sys.byteorder == "big":
+            data.byteswap()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            descriptor, temp_path = tempfile.mkstemp(
+                prefix=f".{os.path.basename(self.path)}.", suffix=".tmp", dir=directory
+            )
+            try:
+                with os.fdopen(descriptor, mode="wb") as file:
+                    file.write(self._HEADER.pack(self.MAGIC, self.FORMAT_VERSION, *signature, len(offsets)))
+                    file.write(data.tobytes())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError as e:
+            Logger.log_warning(f"Could not write offset index {self.path}: {e}")
+
+    # ------------------------------------------------------------------ reading rows
+
+    def __len__(self):
+        """
+        Returns the number of data rows in the CSV file.
+        """
+        try:
+            with open(self.csv_path, mode="rb") as file:
+                with self._lock:
+                    return len(self._current(file))
+        except FileNotFoundError:
+            return 0
+
+    def read(self, start, stop):
+        """
+        Reads the data rows numbered `start` to `stop - 1`, parsing only their bytes.
+
+        Args:
+            start (int): The first row number.
+            stop (int): One past the last row number. Clamped to the number of rows.
+
+        Returns:
+            list[tuple]: The rows, each a tuple of strings.
+        """
+        try:
+            file = open(self.csv_path, mode="rb")
+        except FileNotFoundError:
+            return []
+        with file:
+            with self._lock:
+                # Validate against the file we actually opened, in case it was just replaced
+                offsets = self._current(file)
+            start, stop = max(0, start), min(stop, len(offsets))
+            if start >= stop:
+                return []
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                end = offsets[stop] if stop < len(offsets) else len(view)
+                text = view[offsets[start]:end].decode("utf-8")
+        return [tuple(row) for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+    def row(self, number):
+        """
+        Reads a single data row.
+
+        Args:
+            number (int): The row number.
+
+        Returns:
+            tuple | None: The row, or None if there is no such row.
+        """
+        rows = self.read(number, number + 1)
+        return rows[0] if rows else None
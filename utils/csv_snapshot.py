@@ -0,0 +1,168 @@
+import gc
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from utils.logger import Logger
+
+
+class CsvSnapshot:
+    """
+    A versioned binary snapshot of a parsed CSV file, stored next to it.
+
+    Parsing CSV text row by row is the bulk of the application's startup time. The
+    snapshot stores the already-parsed fields of a CSV file as one block of UTF-8 text
+    separated by the ASCII unit separator, together with the (mtime_ns, size) of the
+    CSV file it was taken from. Loading it maps the file with `mmap`, checks the header
+    and CRC32, and rebuilds the rows with a single decode and split instead of running
+    the CSV parser. A snapshot that doesn't match the CSV file's current mtime and size
+    (the CSV file was changed since) or fails its checks is ignored, and the caller falls
+    back to parsing the CSV file and rewriting the snapshot.
+
+    File layout (little-endian):
+        header: magic, format version, CSV mtime_ns, CSV size, column count, row count,
+                flags, CRC32 of everything after the header
+        row widths: one uint32 per row, only present if rows differ in width from the header
+        fields: the header fields then every row's fields, UTF-8, joined by "\\x1f"
+
+    Attributes:
+        csv_path (str): Path to the CSV file.
+        path (str): Path to the snapshot file.
+    """
+
+    MAGIC = b"MPSNAP"
+    FORMAT_VERSION = 1
+    SEPARATOR = "\x1f"
+    FLAG_RAGGED = 1
+    _HEADER = struct.Struct("<6sHqQIIII")
+
+    def __init__(self, csv_path):
+        """
+        Initializes the CsvSnapshot for a CSV file.
+
+        Args:
+            csv_path (str): Path to the CSV file.
+        """
+        self.csv_path = csv_path
+        self.path = os.path.splitext(csv_path)[0] + ".snapshot"
+
+    def load(self, signature):
+        """
+        Loads the parsed CSV contents if the snapshot matches the CSV file.
+
+        Args:
+            signature (tuple): The CSV file's current (mtime_ns, size).
+
+        Returns:
+            tuple | None: (header, rows) as tuples, or None if the snapshot is missing,
+                          stale or damaged.
+        """
+        try:
+            with open(self.path, mode="rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    return self._decode(view, signature)
+        except (OSError, ValueError) as e:
+            if os.path.exists(self.path):
+                Logger.log_warning(f"Ignoring unreadable snapshot {self.path}: {e}")
+            return None
+
+    def _decode(self, view, signature):
+        if len(view) < self._HEADER.size:
+            return None
+        magic, version, mtime_ns, size, columns, row_count, flags, crc = self._HEADER.unpack_from(view, 0)
+        if magic != self.MAGIC or version != self.FORMAT_VERSION or (mtime_ns, size) != tuple(signature):
+            return None
+        with memoryview(view) as buffer:
+            checksum = zlib.crc32(buffer[self._HEADER.size:])
+        if checksum != crc:
+            Logger.log_warning(f"Ignoring damaged snapshot {self.path}.")
+            return None
+
+        offset = self._HEADER.size
+        widths = None
+        if flags & self.FLAG_RAGGED:
+            widths = array("I")
+            widths.frombytes(view[offset:offset + 4 * row_count])
+            if sys.byteorder == "big":
+                widths.byteswap()
+            offset += 4 * row_count
+        text = view[offset:].decode("utf-8")
+        # Building millions of tuples would otherwise trigger many pointless cyclic GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            fields = text.split(self.SEPARATOR) if text or columns else []
+            header = tuple(fields[:columns])
+            if widths is None:
+                values = iter(fields[columns:])
+                rows = tuple(zip(*[values] * columns))
+            else:
+                rows, position = [], columns
+                for width in widths:
+                    rows.append(tuple(fields[position:position + width]))
+                    position += width
+                rows = tuple(rows)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if len(rows) != row_count:
+            return None
+        return header, rows
+
+    def save(self, signature, header, rows):
+        """
+        Writes a snapshot of parsed CSV contents. Failures are logged and otherwise ignored,
+        since the snapshot can always be rebuilt from the CSV file.
+
+        Args:
+            signature (tuple): The (mtime_ns, size) of the CSV file the rows were read from.
+            header (tuple): The header row.
+            rows (tuple): The data rows, each a tuple of strings.
+
+        Returns:
+            bool: True if the snapshot was written.
+        """
+        columns = len(header)
+        ragged = columns == 0 or any(len(row) != columns for row in rows)
+        fields = list(header)
+        for row in rows:
+            fields.extend(row)
+        text = self.SEPARATOR.join(fields)
+        if fields and text.count(self.SEPARATOR) != len(fields) - 1:
+            return False  # A field contains the separator itself; keep using the CSV file
+        if not fields and rows:
+            return False  # Rows of zero fields can't be told apart in the text block
+
+        body = b""
+        if ragged:
+            widths = array("I", (len(row) for row in rows))
+            if sys.byteorder == "big":
+                widths.byteswap()
+            body = widths.tobytes()
+        body += text.encode("utf-8")
+        header_bytes = self._HEADER.pack(
+            self.MAGIC, self.FORMAT_VERSION, signature[0], signature[1], columns, len(rows),
+            self.FLAG_RAGGED if ragged else 0, zlib.crc32(body),
+        )
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            descriptor, temp_path = tempfile.mkstemp(
+                prefix=f".{os.path.basename(self.path)}.", suffix=".tmp", dir=directory
+            )
+            try:
+                with os.fdopen(descriptor, mode="wb") as file:
+                    file.write(header_bytes)
+                    file.write(body)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError as e:
+            Logger.log_warning(f"Could not write snapshot {self.path}: {e}")
+            return False
+        return True
@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class ParsedFileCache:
+    """
+    A process-wide, memory-capped LRU cache of parsed CSV files.
+
+    Entries are keyed on the absolute path and validated against `os.stat` on every
+    lookup: if the file's mtime_ns or size changed since it was parsed, the entry is
+    stale and the caller re-parses. Rows are stored as tuples so cached contents can be
+    shared between callers without copying. When the estimated size of all entries
+    exceeds `max_bytes`, the least recently used entries are evicted.
+
+    Attributes:
+        max_bytes (int): The approximate memory budget for all entries.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to parse the file.
+        evictions (int): Entries dropped to stay under the memory budget.
+    """
+
+    # Rough per-row and per-field overheads of tuples and str objects on CPython
+    ROW_OVERHEAD = 64
+    FIELD_OVERHEAD = 56
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Initializes the ParsedFileCache.
+
+        Args:
+            max_bytes (int): The approximate memory budget. Defaults to 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # path -> (signature, header, rows, cost)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(path):
+        """
+        Returns the stat fingerprint used to validate an entry.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            tuple | None: (mtime_ns, size), or None if the file doesn't exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _estimate_cost(self, signature, header, rows):
+        fields = len(header) or 1
+        return signature[1] + len(rows) * (self.ROW_OVERHEAD + fields * self.FIELD_OVERHEAD)
+
+    def get(self, path, signature=None):
+        """
+        Returns the parsed contents of a file if the cached copy is still current.
+
+        Args:
+            path (str): The file path.
+            signature (tuple, optional): The current fingerprint, for contents that aren't
+                                         validated with `os.stat` (e.g. database tables).
+
+        Returns:
+            tuple | None: (header, rows) as tuples, or None on a miss.
+        """
+        key = os.path.abspath(path)
+        if signature is None:
+            signature = self.signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            if entry is not None:
+                self._remove(key)
+            return None
+
+    def put(self, path, signature, header, rows):
+        """
+        Stores the parsed contents of a file.
+
+        Args:
+            path (str): The file path.
+            signature (tuple): The stat fingerprint the contents were read at.
+            header (tuple): The header row.
+            rows (tuple): The data rows, each a tuple of strings.
+        """
+        if signature is None:
+            return
+        key = os.path.abspath(path)
+        cost = self._estimate_cost(signature, header, rows)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if cost > self.max_bytes:
+                return  # Never worth evicting everything else for one huge file
+            self._entries[key] = (signature, header, rows, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, path):
+        """
+        Drops the entry for a file, if any.
+
+        Args:
+            path (str): The file path.
+        """
+        with self._lock:
+            self._remove(os.path.abspath(path))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: hits, misses, evictions, entries and approximate bytes held.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,217 @@
+import os
+import struct
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows; fall back to msvcrt byte-range locks
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+class StaleVersionError(Exception):
+    """
+    Raised when a write expected a file version that another writer has since replaced.
+    The caller should re-read the file and retry its change.
+    """
+
+    def __init__(self, path, expected, actual):
+        super().__init__(f"{path} changed (version {actual}, expected {expected}); re-read and retry.")
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+
+
+class FileLock:
+    """
+    A cross-process reader/writer lock for a data file, with a version counter.
+
+    The lock is held on a small sidecar file next to the data file (`recipes.csv` ->
+    `recipes.lock`) with `fcntl.flock`: any number of processes may hold it shared
+    (readers), or one process exclusively (a writer). On Windows, where only `msvcrt`
+    byte-range locks exist, shared locks are taken exclusively.
+
+    The first eight bytes of the lock file hold a counter that writers bump on every
+    change. Reading it before a read-modify-write and passing it back as the expected
+    version lets a writer detect that someone else changed the file in between (see
+    `check_version`), instead of silently overwriting their change.
+
+    Locks are re-entrant within a process: there is one FileLock per path (see `for_path`),
+    threads take turns holding it, and nested blocks in the holding thread just count
+    depth. Taking the exclusive lock inside a shared block upgrades it for the inner block
+    (not atomically, as with `flock` itself).
+
+    Attributes:
+        path (str): Path to the lock file.
+    """
+
+    _VERSION = struct.Struct("<Q")
+    _MSVCRT_OFFSET = 4096  # Windows locks a byte range; lock one past the version counter
+    _instances = weakref.WeakValueDictionary()
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, data_path):
+        """
+        Returns the process-wide FileLock for a data file.
+
+        Args:
+            data_path (str): Path to the data file.
+
+        Returns:
+            FileLock: The lock shared by everything in this process that uses the file.
+        """
+        key = os.path.abspath(data_path)
+        with cls._instances_lock:
+            lock = cls._instances.get(key)
+            if lock is None:
+                lock = cls._instances[key] = cls(key)
+            return lock
+
+    def __init__(self, data_path):
+        """
+        Initializes the FileLock. Prefer `for_path`, which shares one instance per file.
+
+        Args:
+            data_path (str): Path to the data file.
+        """
+        self.path = os.path.splitext(data_path)[0] + ".lock"
+        self._thread_lock = threading.RLock()
+        self._descriptor = None
+        self._modes = []  # Lock mode of each nested block in the holding thread
+
+    # ------------------------------------------------------------------ OS locks
+
+    def _os_lock(self, exclusive):
+        if fcntl is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        elif msvcrt is not None:
+            os.lseek(self._descriptor, self._MSVCRT_OFFSET, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(self._descriptor, msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    time.sleep(0.01)  # LK_LOCK gives up after ten one-second attempts
+
+    def _os_unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(self._descriptor, self._MSVCRT_OFFSET, os.SEEK_SET)
+            msvcrt.locking(self._descriptor, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _hold(self, exclusive):
+        with self._thread_lock:
+            outer = self._modes[-1] if self._modes else None
+            if outer is None:
+                self._descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    self._os_lock(exclusive)
+                except BaseException:
+                    os.close(self._descriptor)
+                    self._descriptor = None
+                    raise
+            elif exclusive and outer == "shared" and fcntl is not None:
+                fcntl.flock(self._descriptor, fcntl.LOCK_EX)  # Upgrade for the inner block
+            mode = "exclusive" if exclusive or outer == "exclusive" else "shared"
+            self._modes.append(mode)
+            try:
+                yield self
+            finally:
+                self._modes.pop()
+                if outer is None:
+                    try:
+                        self._os_unlock()
+                    finally:
+                        os.close(self._descriptor)
+                        self._descriptor = None
+                elif mode == "exclusive" and outer == "shared" and fcntl is not None:
+                    fcntl.flock(self._descriptor, fcntl.LOCK_SH)
+
+    def shared(self):
+        """
+        Holds the lock shared (for reading) for the duration of a `with` block.
+
+        Example:
+            with FileLock.for_path(path).shared():
+                rows = read_rows(path)
+        """
+        return self._hold(exclusive=False)
+
+    def exclusive(self):
+        """
+        Holds the lock exclusively (for writing) for the duration of a `with` block.
+
+        Example:
+            with FileLock.for_path(path).exclusive() as lock:
+                write_rows(path, rows)
+                lock.bump_version()
+        """
+        return self._hold(exclusive=True)
+
+    # ------------------------------------------------------------------ version counter
+
+    def _read_version(self):
+        if hasattr(os, "pread"):
+            data = os.pread(self._descriptor, self._VERSION.size, 0)
+        else:
+            os.lseek(self._descriptor, 0, os.SEEK_SET)
+            data = os.read(self._descriptor, self._VERSION.size)
+        return self._VERSION.unpack(data)[0] if len(data) == self._VERSION.size else 0
+
+    def version(self):
+        """
+        Returns the file's version counter (0 for a file that was never written under the lock).
+
+        Returns:
+            int: The current version.
+        """
+        with self.shared():
+            return self._read_version()
+
+    def bump_version(self):
+        """
+        Increments the version counter. Must be called while holding the lock exclusively.
+
+        Returns:
+            int: The new version.
+
+        Raises:
+            RuntimeError: If the lock isn't held exclusively by the calling thread.
+        """
+        with self._thread_lock:
+            if not self._modes or self._modes[-1] != "exclusive":
+                raise RuntimeError(f"bump_version needs the exclusive lock on {self.path}")
+            version = self._read_version() + 1
+            data = self._VERSION.pack(version)
+            if hasattr(os, "pwrite"):
+                os.pwrite(self._descriptor, data, 0)
+            else:
+                os.lseek(self._descriptor, 0, os.SEEK_SET)
+                os.write(self._descriptor, data)
+            return version
+
+    def check_version(self, expected):
+        """
+        Raises StaleVersionError unless the counter still has the expected value.
+        Call it while holding the lock exclusively, right before writing.
+
+        Args:
+            expected (int | None): The version the caller read; None skips the check.
+
+        Raises:
+            StaleVersionError: If another writer changed the file since.
+        """
+        if expected is None:
+            return
+        actual = self.version()
+        if actual != expected:
+            raise StaleVersionError(self.path, expected, actual)
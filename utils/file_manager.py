@@ -1,23 +1,113 @@
-import csv
-import os
+from contextlib import contextmanager
+from itertools import zip_longest
+from utils.csv_snapshot import CsvSnapshot
+from utils.file_lock import FileLock
+from utils.storage_backend import CsvBackend, get_storage_backend
 
 
 class FileManager:
     """
     A utility class for managing CSV file operations, such as reading, appending, and initializing files.
 
+    Every read and write goes through the configured storage backend (see
+    `StorageBackend`): the CSV backend keeps each table in its CSV file, the SQLite
+    backend keeps the tables of a folder in an indexed `storage.db`. Callers keep
+    addressing data by its CSV path either way.
+
+    Parsed file contents are kept in a process-wide cache shared by all FileManager
+    instances (see `ParsedFileCache`), so re-reading an unchanged file doesn't re-parse it.
+    Files that are read at every startup can also keep a binary snapshot of their parsed
+    contents (see `CsvSnapshot`), so a new process doesn't have to re-parse them either.
+
+    Several processes can share a data folder: parsing a file holds its lock shared and
+    every write holds it exclusively (see `FileLock`), and every write bumps the file's
+    version counter. A read-modify-write that may take a while (e.g. waiting for user
+    input) reads `version()` first and passes it to `write_csv` as `expected_version`,
+    which raises StaleVersionError instead of overwriting someone else's change.
+
     Attributes:
         file_path (str): Path to the CSV file.
+        durable (bool): Whether full rewrites are fsynced before they replace the file.
+        snapshot (CsvSnapshot | None): The binary snapshot kept next to the file, if enabled.
+        backend (StorageBackend): The storage engine holding the data.
+        cache (ParsedFileCache): The process-wide parsed-file cache of the CSV backend.
+        lock (FileLock): The cross-process lock and version counter of the file.
     """
 
-    def __init__(self, file_path):
+    cache = CsvBackend.cache
+
+    def __init__(self, file_path, durable=True, snapshot=False, backend=None):
         """
         Initializes the FileManager with the path to the CSV file.
 
         Args:
             file_path (str): Path to the CSV file to be managed.
+            durable (bool): If True (the default), `write_csv` fsyncs the new contents and the
+                            directory entry so a completed write survives a power loss. If False,
+                            writes are still atomic but may be lost if the machine crashes.
+            snapshot (bool): If True, `read_rows` loads the parsed contents from a binary
+                             snapshot next to the file when it is current, and rewrites the
+                             snapshot whenever it has to parse the file. Defaults to False.
+            backend (StorageBackend, optional): The storage engine to use. Defaults to the
+                                                configured one (see `get_storage_backend`).
         """
         self.file_path = file_path
+        self.durable = durable
+        self.backend = backend or get_storage_backend()
+        self.snapshot = CsvSnapshot(file_path) if snapshot and self.backend.name == "csv" else None
+        self.lock = FileLock.for_path(file_path)
+        self._batch_depth = 0
+        self._pending = None  # (rows, fieldnames) waiting for the batch to commit
+        self._pending_version = None  # The version the batch's writes expect, if any
+
+    def exists(self):
+        """
+        Checks whether the file exists.
+
+        Returns:
+            bool: True if the file (or its table) exists.
+        """
+        return self.backend.exists(self.file_path)
+
+    def signature(self):
+        """
+        Returns a cheap fingerprint of the file that changes with every write, for derived
+        data (indexes, journals) to record which contents they were built from.
+
+        Returns:
+            tuple | None: The fingerprint, or None if the file doesn't exist.
+        """
+        return self.backend.signature(self.file_path)
+
+    def checksum(self):
+        """
+        Returns a checksum of the file's contents.
+
+        Returns:
+            int: The checksum, or 0 if the file doesn't exist.
+        """
+        with self.lock.shared():
+            return self.backend.checksum(self.file_path)
+
+    def create_if_missing(self, fieldnames):
+        """
+        Creates the file with just a header row if it doesn't exist yet.
+
+        Args:
+            fieldnames (list[str]): The column headers.
+
+        Returns:
+            bool: True if the file was created, False if it already existed.
+
+        Raises:
+            OSError: If the file could not be created.
+        """
+        with self.lock.exclusive():
+            if self.backend.exists(self.file_path):
+                return False
+            self.backend.write_rows(self.file_path, fieldnames, (), durable=self.durable)
+            self.lock.bump_version()
+        return True
 
     def read_csv(self):
         """
@@ -27,17 +117,243 @@ class FileManager:
             list[dict]: A list of dictionaries representing rows in the CSV file.
                         Returns an empty list if the file doesn't exist or is empty.
         """
-        if not os.path.exists(self.file_path) or os.path.getsize(self.file_path) == 0:
-            return []  # Return an empty list if the file doesn't exist or is empty
-
         try:
-            with open(self.file_path, mode="r", newline="", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                return list(reader)
+            header, rows = self.read_rows()
+            return [dict(zip_longest(header, row)) for row in rows]
         except Exception as e:
             print(f"Error reading CSV file: {e}")
             return []
 
+    def read_rows(self):
+        """
+        Returns the parsed header and data rows of the CSV file, served from the
+        process-wide cache when the file hasn't changed since it was last parsed, or from
+        the binary snapshot if one is enabled and current.
+
+        The returned tuples are shared with other callers and must not be modified.
+        Blank lines are skipped.
+
+        Returns:
+            tuple[tuple, tuple[tuple]]: The header row and the data rows.
+                                        Both are empty if the file doesn't exist or is empty.
+        """
+        cached = self.backend.cached_rows(self.file_path)
+        if cached is not None:
+            return cached
+
+        with self.lock.shared():
+            return self.backend.read_rows(self.file_path, snapshot=self.snapshot)
+
+    def fieldnames(self):
+        """
+        Returns the header of the CSV file without reading its rows.
+
+        Returns:
+            tuple: The column headers; empty if the file doesn't exist or is empty.
+        """
+        with self.lock.shared():
+            return self.backend.fieldnames(self.file_path)
+
+    def count(self):
+        """
+        Returns the number of data rows without reading them all.
+
+        Returns:
+            int: The number of rows.
+        """
+        with self.lock.shared():
+            return self.backend.count(self.file_path)
+
+    def read_range(self, start, stop):
+        """
+        Reads the data rows numbered `start` to `stop - 1` (from 0, in file order), without
+        reading the rows before them.
+
+        Args:
+            start (int): The first row number.
+            stop (int): One past the last row number.
+
+        Returns:
+            list[Sequence[str]]: The rows.
+        """
+        with self.lock.shared():
+            return self.backend.read_range(self.file_path, start, stop)
+
+    def find_rows(self, field, value):
+        """
+        Returns the rows whose `field` equals `value`, through an index if the backend has
+        one (see `StorageBackend.find_rows`).
+
+        Args:
+            field (str): The column to match.
+            value (str): The value to look for.
+
+        Returns:
+            list[tuple[int, Sequence[str]]]: (row number, row) pairs, in file order.
+        """
+        with self.lock.shared():
+            return self.backend.find_rows(self.file_path, field, value)
+
+    def version(self):
+        """
+        Returns the file's version counter, which every write through a FileManager bumps.
+
+        Returns:
+            int: The current version.
+        """
+        return self.lock.version()
+
+    @classmethod
+    def cache_stats(cls):
+        """
+        Returns the hit/miss counters of the process-wide parsed-file cache.
+
+        Returns:
+            dict: hits, misses, evictions, entries and approximate bytes held.
+        """
+        return get_storage_backend().cache.stats()
+
+    def iter_csv(self, columns=None, predicate=None):
+        """
+        Lazily yields rows of the CSV file as dictionaries, one at a time.
+
+        Unlike `read_csv`, the file is never held in memory as a whole, so callers can
+        stop at the first match and peak memory stays constant however large the file is.
+
+        Args:
+            columns (list[str], optional): Only include these columns in each yielded row.
+                                           Columns the file doesn't have are left out.
+            predicate (callable, optional): A function taking the full row dictionary;
+                                            only rows for which it returns True are yielded.
+
+        Yields:
+            dict: A dictionary for each matching row in the CSV file.
+                  Nothing is yielded if the file doesn't exist or is empty.
+        """
+        try:
+            for row in self.backend.iter_records(self.file_path):
+                if predicate is not None and not predicate(row):
+                    continue
+                if columns is not None:
+                    row = {column: row[column] for column in columns if column in row}
+                yield row
+        except Exception as e:
+            print(f"Error reading CSV file: {e}")
+
+    def write_csv(self, data, fieldnames, expected_version=None):
+        """
+        Replaces the contents of the CSV file atomically.
+
+        The backend makes the replacement atomic (the CSV backend writes a temporary file,
+        fsyncs it in durable mode and moves it over the original with `os.replace`), so
+        readers and crashes only ever see the old or the new contents, never a truncated
+        file. Inside a `batch()` the write is deferred and coalesced with the other writes
+        of the batch.
+
+        Args:
+            data (list[dict]): A list of dictionaries to be written as rows in the CSV file.
+            fieldnames (list[str]): A list of strings representing the column headers.
+            expected_version (int, optional): The `version()` the rows were derived from. If
+                                              another writer changed the file since, nothing is
+                                              written and StaleVersionError is raised.
+
+        Raises:
+            OSError: If the file could not be written. The original file is left untouched.
+            ValueError: If a row has a field that isn't in `fieldnames`.
+            StaleVersionError: If `expected_version` is given and no longer current.
+        """
+        if self._batch_depth:
+            self._pending = (list(data), list(fieldnames))
+            if self._pending_version is None:
+                self._pending_version = expected_version
+            return
+        self._write_atomic(data, fieldnames, expected_version)
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups several logical writes into a single atomic commit.
+
+        `write_csv` and `append_csv` calls made inside the block only update the pending
+        contents; the file is written (and fsynced) once when the outermost block exits.
+        If the block raises, the pending writes are discarded.
+
+        Example:
+            with file_manager.batch():
+                file_manager.write_csv(rows, fieldnames)
+                file_manager.append_csv(more_rows, fieldnames)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._batch_depth == 1:
+                self._pending = None
+                self._pending_version = None
+            raise
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth == 0 and self._pending is not None:
+            (data, fieldnames), expected_version = self._pending, self._pending_version
+            self._pending = self._pending_version = None
+            self._write_atomic(data, fieldnames, expected_version)
+
+    @staticmethod
+    def _to_rows(data, fieldnames):
+        """
+        Converts row dictionaries to tuples of strings in header order, the way
+        `csv.DictWriter` writes them (missing and None values become empty strings).
+
+        Raises:
+            ValueError: If a row has a field that isn't in `fieldnames`.
+        """
+        fields = set(fieldnames)
+        rows = []
+        for row in data:
+            if not fields.issuperset(row):
+                extra = ", ".join(repr(field) for field in row if field not in fields)
+                raise ValueError(f"dict contains fields not in fieldnames: {extra}")
+            rows.append(tuple("" if row.get(field) is None else str(row[field]) for field in fieldnames))
+        return rows
+
+    def _write_atomic(self, data, fieldnames, expected_version=None):
+        """
+        Replaces the file's contents through the backend, holding the file's lock
+        exclusively and bumping its version.
+
+        Args:
+            data (list[dict]): The rows to write.
+            fieldnames (list[str]): The column headers.
+            expected_version (int, optional): The version the write expects.
+        """
+        rows = self._to_rows(data, fieldnames)
+        with self.lock.exclusive():
+            self.lock.check_version(expected_version)
+            self.backend.write_rows(self.file_path, fieldnames, rows, durable=self.durable, snapshot=self.snapshot)
+            self.lock.bump_version()
+
+    def update_row(self, field, value, changes):
+        """
+        Changes some fields of the first row whose `field` equals `value`, in place where
+        the backend supports it (the CSV backend rewrites the file atomically).
+
+        Args:
+            field (str): The column to look the row up by.
+            value (str): The value to look for.
+            changes (dict): New values by column name.
+
+        Returns:
+            bool: True if a row was updated, False if none matched.
+
+        Raises:
+            OSError: If the file could not be written.
+        """
+        with self.lock.exclusive():
+            updated = self.backend.update_row(self.file_path, field, value, changes, durable=self.durable)
+            if updated:
+                self.lock.bump_version()
+        return updated
+
     def append_csv(self, data, fieldnames):
         """
         Appends rows of data to the CSV file. If the file doesn't exist or is empty, writes headers first.
@@ -46,17 +362,35 @@ class FileManager:
             data (list[dict]): A list of dictionaries to be written as rows in the CSV file.
             fieldnames (list[str]): A list of strings representing the column headers.
         """
-        file_exists = os.path.exists(self.file_path)
-
         try:
-            with open(self.file_path, mode="a", newline="", encoding="utf-8") as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                if not file_exists or os.path.getsize(self.file_path) == 0:
-                    writer.writeheader()  # Write headers if the file is new or empty
-                writer.writerows(data)
+            self.append_rows(data, fieldnames)
         except Exception as e:
             print(f"Error appending to CSV file: {e}")
 
+    def append_rows(self, data, fieldnames):
+        """
+        Appends rows of data to the CSV file like `append_csv`, but raises if the append fails
+        instead of printing the error, for callers that must know whether the rows were stored.
+
+        Args:
+            data (list[dict]): A list of dictionaries to be written as rows in the CSV file.
+            fieldnames (list[str]): A list of strings representing the column headers.
+
+        Raises:
+            OSError: If the file could not be written.
+            ValueError: If a row has a field that isn't in `fieldnames`.
+        """
+        if self._batch_depth:
+            # Fold the append into the batch's pending contents
+            if self._pending is None:
+                self._pending = (self.read_csv(), list(fieldnames))
+            self._pending[0].extend(data)
+            return
+        rows = self._to_rows(data, fieldnames)
+        with self.lock.exclusive():
+            self.backend.append_rows(self.file_path, fieldnames, rows)
+            self.lock.bump_version()
+
     def initialize_csv(self, fieldnames):
         """
         Initializes the CSV file by creating or overwriting it with the specified headers.
@@ -65,8 +399,8 @@ class FileManager:
             fieldnames (list[str]): A list of strings representing the column headers.
         """
         try:
-            with open(self.file_path, mode="w", newline="", encoding="utf-8") as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
+            with self.lock.exclusive():
+                self.backend.write_rows(self.file_path, fieldnames, (), durable=self.durable)
+                self.lock.bump_version()
         except Exception as e:
             print(f"Error initializing CSV file: {e}")
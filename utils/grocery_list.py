@@ -0,0 +1,419 @@
+import json
+import math
+import os
+from array import array
+from utils.ingredient_parser import parse_quantity
+from utils.logger import Logger
+from utils.recipe_search import normalize_name
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; GroceryAggregator falls back to a pure-Python group-by
+    np = None
+
+# Canonical unit -> kitchen units to display it in, tried in order: (singular, plural,
+# factor to the canonical unit, steps per unit). A total is shown in the first unit it
+# is a whole number of steps of (e.g. quarter cups), which is the unit the recipes used
+# unless they mixed units; other totals are shown in metric.
+_DISPLAY_UNITS = {
+    "ml": (("cup", "cups", 236.588, 4), ("tbsp", "tbsp", 14.7868, 2), ("tsp", "tsp", 4.92892, 4)),
+    "g": (("lb", "lb", 453.592, 4), ("oz", "oz", 28.3495, 4)),
+}
+
+
+def join_meals_to_recipes(meals, recipes):
+    """
+    Resolves planned meals to recipes with a hash join on the normalized recipe name.
+
+    The meal plan is the small side of the join, so its distinct normalized names are
+    put in a hash table and the recipes are streamed past it once, stopping early as
+    soon as every meal has found its recipe. If several recipes share a name, the first
+    one in display order wins.
+
+    Args:
+        meals (Iterable[str]): The planned meal names, as typed into the meal plan.
+        recipes (Iterable[tuple[int, Sequence[str]]]): (recipe ID, (name, ingredients)) pairs,
+                                                       e.g. from `RecipeStore.recipes()`.
+
+    Returns:
+        tuple[dict, list]: A dict from normalized meal name to the matching recipe's
+                           (recipe ID, ingredients string), and the distinct meal names
+                           with no matching recipe, in plan order.
+
+    Example:
+        matched, unmatched = join_meals_to_recipes(["Ugali", "Pilau"], store.recipes())
+    """
+    wanted = {}
+    for meal in meals:
+        key = normalize_name(meal)
+        if key:
+            wanted.setdefault(key, meal)
+
+    matched = {}
+    if wanted:
+        for recipe_id, row in recipes:
+            key = normalize_name(row[0])
+            if key in wanted and key not in matched:
+                matched[key] = (recipe_id, row[1])
+                if len(matched) == len(wanted):
+                    break
+    unmatched = [meal for key, meal in wanted.items() if key not in matched]
+    return matched, unmatched
+
+
+def format_quantity(quantity, unit):
+    """
+    Formats a canonical quantity for display. Volumes and masses that are a whole number
+    of quarter cups, half tablespoons, quarter teaspoons, quarter pounds or quarter ounces
+    are shown in that unit, so "2 cups flour" stays "2 cups"; other volumes and masses are
+    shown in millilitres and grams, switching to litres and kilograms when large.
+
+    Args:
+        quantity (float): The quantity in the canonical unit.
+        unit (str): The canonical unit ("ml", "g", "" for plain counts, or a counted unit).
+
+    Returns:
+        str: e.g. "2 cups", "1.5 tbsp", "1.5 l", "250 g", "3", "2 clove".
+    """
+    for singular, plural, factor, steps in _DISPLAY_UNITS.get(unit, ()):
+        value = quantity / factor
+        rounded = round(value * steps) / steps
+        if rounded and math.isclose(value, rounded, rel_tol=1e-6):
+            text = f"{rounded:.2f}".rstrip("0").rstrip(".")
+            return f"{text} {singular if rounded == 1 else plural}"
+    if unit == "ml" and quantity >= 1000:
+        quantity, unit = quantity / 1000, "l"
+    elif unit == "g" and quantity >= 1000:
+        quantity, unit = quantity / 1000, "kg"
+    text = f"{quantity:.2f}".rstrip("0").rstrip(".")
+    return f"{text} {unit}" if unit else text
+
+
+class GroceryAggregator:
+    """
+    Sums ingredient quantities across meal plans.
+
+    Every entry is parsed into (quantity, canonical unit, name) once per distinct entry
+    text (and once per distinct meal), and each (name, unit) pair is interned to an
+    integer ID. Adding a meal only appends its IDs and quantities to flat arrays; the totals are then computed in one
+    vectorized group-by (`numpy.bincount` weighted by the quantities) when NumPy is
+    installed, or with a plain loop otherwise. Entries can be tagged with an owner (e.g.
+    a user's email) to aggregate many users' plans at once and still get per-user totals.
+
+    Attributes:
+        keys (list[tuple[str, str]]): Group ID -> (ingredient name, canonical unit).
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty GroceryAggregator.
+        """
+        self.keys = []
+        self._key_ids = {}  # (name, unit) -> group ID
+        self._parsed = {}  # entry text -> (group ID, quantity), or None if it names nothing
+        self._parsed_meals = {}  # ingredients string -> (group IDs, quantities)
+        self._owners = []
+        self._owner_ids = {}
+        self._group_ids = array("q")
+        self._quantities = array("d")
+        self._entry_owners = array("q")
+
+    def _parse(self, text):
+        parsed = self._parsed.get(text, False)
+        if parsed is False:
+            quantity, unit, name = parse_quantity(text)
+            if name:
+                key = (name, unit)
+                group_id = self._key_ids.get(key)
+                if group_id is None:
+                    group_id = self._key_ids[key] = len(self.keys)
+                    self.keys.append(key)
+                parsed = (group_id, quantity)
+            else:
+                parsed = None
+            self._parsed[text] = parsed
+        return parsed
+
+    def _parse_meal(self, ingredients):
+        """
+        Returns the (group IDs, quantities) of a comma-separated ingredients string,
+        cached because the same recipes come back in plan after plan.
+        """
+        parsed = self._parsed_meals.get(ingredients)
+        if parsed is None:
+            group_ids, quantities = array("q"), array("d")
+            for text in ingredients.split(","):
+                entry = self._parse(text)
+                if entry is not None:
+                    group_ids.append(entry[0])
+                    quantities.append(entry[1])
+            parsed = self._parsed_meals[ingredients] = (group_ids, quantities)
+        return parsed
+
+    def add(self, ingredients, owner=None):
+        """
+        Adds the ingredients of one meal.
+
+        Args:
+            ingredients (str | Iterable[str]): A comma-separated string or a list of entries.
+            owner (Hashable, optional): Who the meal belongs to, for `totals_by_owner`.
+        """
+        if not isinstance(ingredients, str):
+            ingredients = ",".join(ingredients)
+        owner_id = self._owner_ids.get(owner)
+        if owner_id is None:
+            owner_id = self._owner_ids[owner] = len(self._owners)
+            self._owners.append(owner)
+        group_ids, quantities = self._parse_meal(ingredients)
+        self._group_ids.extend(group_ids)
+        self._quantities.extend(quantities)
+        self._entry_owners.extend(array("q", [owner_id]) * len(group_ids))
+
+    def _sums(self, combined, size):
+        """
+        Sums the quantities per combined group ID.
+        """
+        if not self._quantities:
+            return [0.0] * size
+        if np is not None:
+            ids = np.frombuffer(combined, dtype=np.int64) if isinstance(combined, array) else combined
+            return np.bincount(ids, weights=np.frombuffer(self._quantities, dtype=np.float64), minlength=size)
+        sums = [0.0] * size
+        for group_id, quantity in zip(combined, self._quantities):
+            sums[group_id] += quantity
+        return sums
+
+    def totals(self):
+        """
+        Returns the total quantity of every ingredient across all entries.
+
+        Returns:
+            dict[tuple[str, str], float]: (ingredient name, canonical unit) -> total quantity,
+                                          sorted by name.
+        """
+        sums = self._sums(self._group_ids, len(self.keys))
+        return {
+            self.keys[group_id]: float(sums[group_id])
+            for group_id in sorted(range(len(self.keys)), key=self.keys.__getitem__)
+            if sums[group_id]
+        }
+
+    def totals_by_owner(self):
+        """
+        Returns the totals of every owner, computed in a single group-by over all entries.
+
+        Returns:
+            dict[Hashable, dict[tuple[str, str], float]]: owner -> (name, unit) -> total quantity.
+        """
+        groups = len(self.keys)
+        if np is not None:
+            combined = (
+                np.frombuffer(self._entry_owners, dtype=np.int64) * groups
+                + np.frombuffer(self._group_ids, dtype=np.int64)
+            )
+        else:
+            combined = [owner_id * groups + group_id for owner_id, group_id in zip(self._entry_owners, self._group_ids)]
+        sums = self._sums(combined, len(self._owners) * groups)
+        order = sorted(range(groups), key=self.keys.__getitem__)
+        ordered_keys = [self.keys[group_id] for group_id in order]
+        result = {}
+        if np is not None:
+            # Reorder the columns by name once, then only visit each owner's non-zero totals
+            matrix = np.asarray(sums).reshape(len(self._owners), groups)[:, order]
+            for owner_id, owner in enumerate(self._owners):
+                row = matrix[owner_id]
+                columns = np.flatnonzero(row)
+                if len(columns):
+                    result[owner] = dict(zip([ordered_keys[column] for column in columns.tolist()],
+                                             row[columns].tolist()))
+            return result
+        for owner_id, owner in enumerate(self._owners):
+            base = owner_id * groups
+            totals = {key: sums[base + group_id] for key, group_id in zip(ordered_keys, order) if sums[base + group_id]}
+            if totals:
+                result[owner] = totals
+        return result
+
+    def __len__(self):
+        """
+        Returns the number of entries added.
+        """
+        return len(self._group_ids)
+
+
+class GroceryTally:
+    """
+    A materialized grocery list that is kept up to date by deltas as the meal plan changes.
+
+    The tally remembers which ingredients each plan entry (e.g. a day) contributed and the
+    running (name, unit) -> quantity totals. Changing an entry subtracts what it used to
+    contribute and adds the new ingredients, so reading the grocery list costs
+    O(distinct items) and never re-aggregates the plan. Entries whose ingredients are not
+    known yet (a meal without a matching recipe) are tracked as pending.
+
+    Entries resolved from a recipe remember its ID, and the tally remembers the version of
+    the recipe store it last checked them against, so the owner can re-resolve the entries
+    whose recipe was edited or deleted since (see `MealController.check_grocery_recipes`).
+
+    The tally is saved as JSON next to the meal plan, together with the (mtime_ns, size)
+    of the plan file it matches; if the plan was changed behind its back, `load` reports
+    it as stale and the owner rebuilds it.
+
+    Attributes:
+        path (str): Path to the tally file.
+        entries (dict[str, str]): Entry key -> the comma-separated ingredients it contributes.
+        pending (dict[str, str]): Entry key -> meal name, for entries without known ingredients.
+        recipe_ids (dict[str, int]): Entry key -> the ID of the recipe its ingredients came from.
+        recipes_version (list | None): The recipe store version the recipe entries were
+                                       last checked against, or None if never.
+    """
+
+    EPSILON = 1e-9  # Totals this close to zero after a subtraction are dropped
+
+    def __init__(self, path):
+        """
+        Initializes an empty GroceryTally.
+
+        Args:
+            path (str): Path to the tally file.
+        """
+        self.path = path
+        self.entries = {}
+        self.pending = {}
+        self.recipe_ids = {}
+        self.recipes_version = None
+        self._totals = {}
+        self._parsed = {}
+
+    def _parse(self, ingredients):
+        parsed = self._parsed.get(ingredients)
+        if parsed is None:
+            parsed = []
+            for text in ingredients.split(","):
+                quantity, unit, name = parse_quantity(text)
+                if name:
+                    parsed.append(((name, unit), quantity))
+            self._parsed[ingredients] = parsed
+        return parsed
+
+    def _apply(self, ingredients, sign):
+        totals = self._totals
+        for key, quantity in self._parse(ingredients):
+            total = totals.get(key, 0.0) + sign * quantity
+            if abs(total) < self.EPSILON:
+                totals.pop(key, None)
+            else:
+                totals[key] = total
+
+    def set_entry(self, key, ingredients, recipe_id=None):
+        """
+        Sets what a plan entry contributes, applying only the difference to the totals.
+
+        Args:
+            key (str): The plan entry, e.g. a day.
+            ingredients (str): Its comma-separated ingredients.
+            recipe_id (int, optional): The recipe the ingredients come from, if any.
+        """
+        if recipe_id is None:
+            self.recipe_ids.pop(key, None)
+        else:
+            self.recipe_ids[key] = recipe_id
+        previous = self.entries.get(key)
+        if previous == ingredients:
+            self.pending.pop(key, None)
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+        self.entries[key] = ingredients
+        self.pending.pop(key, None)
+        self._apply(ingredients, +1)
+
+    def set_pending(self, key, meal):
+        """
+        Marks a plan entry as planned but with unknown ingredients, removing its old contribution.
+
+        Args:
+            key (str): The plan entry, e.g. a day.
+            meal (str): The meal name, for prompting the user later.
+        """
+        self.remove_entry(key)
+        self.pending[key] = meal
+
+    def remove_entry(self, key):
+        """
+        Removes a plan entry and its contribution.
+
+        Args:
+            key (str): The plan entry, e.g. a day.
+        """
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self._apply(previous, -1)
+        self.pending.pop(key, None)
+        self.recipe_ids.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        self.entries.clear()
+        self.pending.clear()
+        self.recipe_ids.clear()
+        self.recipes_version = None
+        self._totals.clear()
+
+    def totals(self):
+        """
+        Returns the grocery list.
+
+        Returns:
+            dict[tuple[str, str], float]: (ingredient name, canonical unit) -> total quantity, sorted by name.
+        """
+        return {key: self._totals[key] for key in sorted(self._totals)}
+
+    def load(self, plan_signature):
+        """
+        Loads the saved tally if it matches the meal plan file.
+
+        Args:
+            plan_signature (tuple | None): The plan file's current signature (see `FileManager.signature`).
+
+        Returns:
+            bool: True if the tally was loaded, False if it is missing or stale.
+        """
+        try:
+            with open(self.path, mode="r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if plan_signature is None or data.get("plan") != list(plan_signature):
+            return False
+        self.entries = dict(data.get("entries", {}))
+        self.pending = dict(data.get("pending", {}))
+        self.recipe_ids = dict(data.get("recipe_ids", {}))
+        self.recipes_version = data.get("recipes_version")
+        self._totals = {(name, unit): quantity for name, unit, quantity in data.get("totals", [])}
+        return True
+
+    def save(self, plan_signature):
+        """
+        Saves the tally, recording the meal plan file it matches.
+
+        Args:
+            plan_signature (tuple | None): The plan file's signature after the last write.
+        """
+        data = {
+            "plan": list(plan_signature) if plan_signature else None,
+            "entries": self.entries,
+            "pending": self.pending,
+            "recipe_ids": self.recipe_ids,
+            "recipes_version": self.recipes_version,
+            "totals": [[name, unit, quantity] for (name, unit), quantity in self.totals().items()],
+        }
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, mode="w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            Logger.log_error(f"Error saving grocery tally {self.path}: {e}")
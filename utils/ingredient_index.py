@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from utils.ingredient_parser import normalize_ingredient, parse_ingredients
+from utils.logger import Logger
+
+
+class IngredientIndex:
+    """
+    An inverted index from normalized ingredient to the IDs of the recipes that use it.
+
+    The index subscribes to a RecipeStore and is updated incrementally as recipes are
+    added, edited and deleted (and remapped when the store compacts), so "recipes using
+    X" queries never scan recipes.csv. It is saved next to the CSV file after every
+    rebuild and compaction, together with the CSV file it was built on. On load, the
+    store's journal (which holds every change since the last compaction) is replayed
+    on top, so a saved index stays usable after a crash; only if the CSV file changed
+    since (e.g. another process compacted the store) is the index rebuilt from the store.
+
+    Attributes:
+        store (RecipeStore): The recipe store being indexed.
+        index_path (str): Path to the persisted index file.
+    """
+
+    FORMAT = 3  # Bumped whenever `normalize_ingredient` or the file layout changes, so old indexes are rebuilt
+
+    def __init__(self, store):
+        """
+        Initializes the IngredientIndex, loading the persisted index or rebuilding it.
+
+        Args:
+            store (RecipeStore): The recipe store to index.
+        """
+        self.store = store
+        self.index_path = os.path.splitext(store.file_path)[0] + ".index.json"
+        self._lock = threading.RLock()
+        self._recipes = {}  # recipe ID -> frozenset of ingredients
+        self._postings = defaultdict(set)  # ingredient -> recipe IDs
+        self._version = None
+        self._dirty = False
+        if not self._load():
+            self.rebuild()
+        store.subscribe(self)
+
+    def _load(self):
+        """
+        Loads the persisted index if it was built on the store's current CSV file and has the
+        current format, and replays the store's journal on top of it.
+
+        Returns:
+            bool: True if the index was loaded, False if it is missing or stale.
+        """
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, mode="r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            Logger.log_warning(f"Ignoring unreadable ingredient index {self.index_path}: {e}")
+            return False
+        base, rows, changed, deleted = self.store.journal_changes()
+        if data.get("format") != self.FORMAT or data.get("base") != list(base):
+            return False
+        with self._lock:
+            self._clear()
+            for recipe_id, ingredients in data["recipes"].items():
+                self._insert(int(recipe_id), frozenset(ingredients))
+            # The index was saved somewhere along the same journal; every change it may
+            # have seen is still in the journal, so replaying the whole journal catches up
+            for recipe_id in list(self._recipes):
+                if recipe_id in deleted or (rows is not None and recipe_id >= rows and recipe_id not in changed):
+                    self._remove(recipe_id)
+            for recipe_id, row in changed.items():
+                self._remove(recipe_id)
+                self._insert(recipe_id, frozenset(parse_ingredients(row[1])))
+            self._version = self.store.version()
+        if changed or deleted:
+            Logger.log_info(f"Replayed {len(changed) + len(deleted)} journaled recipe changes into the ingredient index.")
+        return True
+
+    def save(self):
+        """
+        Persists the index if it changed since it was last saved. Called after every rebuild
+        and compaction; changes in between are recovered from the store's journal.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "format": self.FORMAT,
+                "base": list(self._version[0]),  # The CSV file the IDs refer to
+                "recipes": {str(recipe_id): sorted(names) for recipe_id, names in self._recipes.items()},
+            }
+            temp_path = f"{self.index_path}.tmp"
+            try:
+                with open(temp_path, mode="w", encoding="utf-8") as file:
+                    json.dump(data, file)
+                os.replace(temp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                Logger.log_error(f"Error saving ingredient index: {e}")
+
+    def rebuild(self, recipes=None):
+        """
+        Rebuilds the whole index from the store's live view.
+
+        Args:
+            recipes (list, optional): The live view to rebuild from, as (recipe ID, row)
+                                      pairs. Defaults to `store.recipes()`.
+        """
+        if recipes is None:
+            recipes = self.store.recipes()
+        with self._lock:
+            self._clear()
+            for recipe_id, row in recipes:
+                self._insert(recipe_id, frozenset(parse_ingredients(row[1])))
+            self._touch()
+            self.save()
+        Logger.log_info(f"Rebuilt ingredient index ({len(self._recipes)} recipes).")
+
+    # ------------------------------------------------------------------ maintenance
+
+    def _clear(self):
+        self._recipes.clear()
+        self._postings.clear()
+
+    def _insert(self, recipe_id, ingredients):
+        self._recipes[recipe_id] = ingredients
+        for ingredient in ingredients:
+            self._postings[ingredient].add(recipe_id)
+
+    def _remove(self, recipe_id):
+        for ingredient in self._recipes.pop(recipe_id, ()):
+            postings = self._postings[ingredient]
+            postings.discard(recipe_id)
+            if not postings:
+                del self._postings[ingredient]
+
+    def _touch(self):
+        self._version = self.store.version()
+        self._dirty = True
+
+    def on_add(self, recipe_id, row):
+        with self._lock:
+            self._insert(recipe_id, frozenset(parse_ingredients(row[1])))
+            self._touch()
+
+    def on_edit(self, recipe_id, row):
+        with self._lock:
+            self._remove(recipe_id)
+            self._insert(recipe_id, frozenset(parse_ingredients(row[1])))
+            self._touch()
+
+    def on_delete(self, recipe_id):
+        with self._lock:
+            self._remove(recipe_id)
+            self._touch()
+
+    def on_compact(self, id_map):
+        with self._lock:
+            recipes = self._recipes
+            self._recipes = {}
+            self._postings = defaultdict(set)
+            for old_id, ingredients in recipes.items():
+                if old_id in id_map:
+                    self._insert(id_map[old_id], ingredients)
+            self._touch()
+            self.save()
+
+    def on_reload(self, recipes):
+        self.rebuild(recipes)
+
+    # ------------------------------------------------------------------ queries
+
+    def search(self, ingredients, match_all=True):
+        """
+        Finds the recipes that use the given ingredients.
+
+        Args:
+            ingredients (Iterable[str]): The ingredients to look for.
+            match_all (bool): If True, recipes must use every ingredient (AND);
+                              otherwise any one of them is enough (OR). Defaults to True.
+
+        Returns:
+            list[int]: The matching recipe IDs, in ascending order.
+        """
+        names = {normalize_ingredient(name) for name in ingredients} - {""}
+        if not names:
+            return []
+        with self._lock:
+            postings = [self._postings.get(name, set()) for name in names]
+            if match_all:
+                # Intersect starting from the rarest ingredient
+                postings.sort(key=len)
+                result = set(postings[0])
+                for other in postings[1:]:
+                    result &= other
+                    if not result:
+                        break
+            else:
+                result = set().union(*postings)
+        return sorted(result)
+
+    def __len__(self):
+        """
+        Returns the number of distinct indexed ingredients.
+        """
+        return len(self._postings)
@@ -0,0 +1,139 @@
+import re
+from functools import lru_cache
+
+# Unit aliases -> (canonical unit, factor to the canonical unit). Volumes are summed in
+# millilitres and masses in grams; other units are counted as they are.
+UNITS = {}
+for _aliases, _canonical, _factor in (
+    (("ml", "milliliter", "milliliters", "millilitre", "millilitres"), "ml", 1.0),
+    (("l", "liter", "liters", "litre", "litres"), "ml", 1000.0),
+    (("tsp", "teaspoon", "teaspoons"), "ml", 4.92892),
+    (("tbsp", "tbs", "tablespoon", "tablespoons"), "ml", 14.7868),
+    (("cup", "cups", "c"), "ml", 236.588),
+    (("fl oz", "fluid ounce", "fluid ounces"), "ml", 29.5735),
+    (("pint", "pints", "pt"), "ml", 473.176),
+    (("quart", "quarts", "qt"), "ml", 946.353),
+    (("gallon", "gallons", "gal"), "ml", 3785.41),
+    (("g", "gram", "grams", "gr"), "g", 1.0),
+    (("kg", "kilogram", "kilograms", "kilo", "kilos"), "g", 1000.0),
+    (("mg", "milligram", "milligrams"), "g", 0.001),
+    (("oz", "ounce", "ounces"), "g", 28.3495),
+    (("lb", "lbs", "pound", "pounds"), "g", 453.592),
+    (("clove", "cloves"), "clove", 1.0),
+    (("pinch", "pinches"), "pinch", 1.0),
+    (("can", "cans", "tin", "tins"), "can", 1.0),
+    (("slice", "slices"), "slice", 1.0),
+    (("bunch", "bunches"), "bunch", 1.0),
+    (("piece", "pieces", "pc", "pcs"), "", 1.0),
+):
+    for _alias in _aliases:
+        UNITS[_alias] = (_canonical, _factor)
+
+_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅛": 0.125}
+_NUMBER = re.compile(r"^(\d+(?:\.\d+)?|\.\d+)([½⅓⅔¼¾⅛])?$")
+_RATIO = re.compile(r"^(\d+)/(\d+)$")
+_NUMBER_WITH_UNIT = re.compile(r"^(\d+(?:\.\d+)?|\.\d+)([a-z]+)$")  # e.g. "200g", "1.5kg"
+
+
+def _parse_number(token):
+    """
+    Returns the value of a numeric token ("2", "2.5", "1/2", "2½", "½"), or None.
+    """
+    if token in _FRACTIONS:
+        return _FRACTIONS[token]
+    match = _NUMBER.match(token)
+    if match:
+        return float(match.group(1)) + _FRACTIONS.get(match.group(2), 0.0)
+    match = _RATIO.match(token)
+    if match and int(match.group(2)):
+        return int(match.group(1)) / int(match.group(2))
+    return None
+
+
+def parse_quantity(text):
+    """
+    Splits an ingredient entry into quantity, canonical unit and normalized ingredient name.
+
+    Understands a leading quantity (whole numbers, decimals, fractions such as "1/2" or
+    "½", and mixed numbers such as "1 1/2"), an optional unit ("2 cups", "200g",
+    "1 fl oz"), and an optional "of". Volumes are converted to millilitres and masses to
+    grams; an entry without a quantity counts as one.
+
+    Args:
+        text (str): The ingredient as written, e.g. "2 cups rice".
+
+    Returns:
+        tuple[float, str, str]: (quantity, canonical unit, ingredient name). The unit is ""
+                                for plain counts. The name is "" if nothing is left.
+
+    Example:
+        parse_quantity("1 1/2 cups Rice")  # (354.882, "ml", "rice")
+    """
+    tokens = text.lower().split()
+    quantity, factor, unit = None, 1.0, ""
+    if tokens:
+        quantity = _parse_number(tokens[0])
+        if quantity is not None:
+            if len(tokens) > 1 and _RATIO.match(tokens[1]):
+                # A mixed number such as "1 1/2"; a malformed one ("1 1/0") is no quantity at all
+                fraction = _parse_number(tokens[1])
+                if fraction is None:
+                    quantity = None
+                else:
+                    quantity += fraction
+                    tokens = tokens[1:]
+            if quantity is not None:
+                tokens = tokens[1:]
+        else:
+            match = _NUMBER_WITH_UNIT.match(tokens[0])
+            if match and match.group(2) in UNITS:
+                quantity = float(match.group(1))
+                unit, factor = UNITS[match.group(2)]
+                tokens = tokens[1:]
+    if quantity is not None and not unit and tokens:
+        two_words = " ".join(tokens[:2])
+        if len(tokens) > 2 and two_words in UNITS:
+            unit, factor = UNITS[two_words]
+            tokens = tokens[2:]
+        elif len(tokens) > 1 and tokens[0] in UNITS:
+            unit, factor = UNITS[tokens[0]]
+            tokens = tokens[1:]
+    if quantity is None and len(tokens) > 2 and tokens[1] == "of" and tokens[0] in UNITS:
+        quantity = 1.0  # e.g. "pinch of salt", "cup of tea"
+        unit, factor = UNITS[tokens[0]]
+        tokens = tokens[1:]
+    if tokens and tokens[0] == "of" and len(tokens) > 1:
+        tokens = tokens[1:]
+    if quantity is None:
+        quantity = 1.0
+    return quantity * factor, unit, " ".join(tokens)
+
+
+@lru_cache(maxsize=65536)
+def normalize_ingredient(ingredient):
+    """
+    Normalizes an ingredient name for indexing: strips its quantity and unit (see
+    `parse_quantity`), lowercases it and collapses whitespace, so "2 cups Flour" and
+    "flour" are the same ingredient. Results are cached, since the same entries come
+    back across recipes and rebuilds.
+
+    Args:
+        ingredient (str): The ingredient as typed by the user.
+
+    Returns:
+        str: The normalized ingredient, or an empty string if nothing is left.
+    """
+    return parse_quantity(ingredient)[2]
+
+
+def parse_ingredients(ingredients):
+    """
+    Splits a comma-joined ingredients string (as stored in recipes.csv) into normalized names.
+
+    Args:
+        ingredients (str): The comma-separated ingredients.
+
+    Returns:
+        set[str]: The distinct, non-empty normalized ingredients.
+    """
+    return {name for name in (normalize_ingredient(part) for part in ingredients.split(",")) if name}
@@ -0,0 +1,251 @@
+import threading
+from operator import itemgetter
+from utils.ingredient_parser import normalize_ingredient, parse_ingredients
+from utils.logger import Logger
+
+
+def _bit_positions(bits):
+    """
+    Returns the positions of the set bits of a non-negative int, in ascending order.
+    """
+    digits = bin(bits)[:1:-1]  # Least significant bit first, without the "0b" prefix
+    positions = []
+    position = digits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = digits.find("1", position + 1)
+    return positions
+
+
+class PantryMatcher:
+    """
+    Answers "what can I cook with what I have?" over the recipe library.
+
+    Every distinct ingredient is interned to a small integer ID, and recipes are kept in
+    two bitset forms. Each recipe has a Python-int bitset over ingredient IDs (used to
+    name the ingredients it is missing). Each ingredient also has a Python-int bitset
+    over recipe slots, marking the recipes that use it. A pantry query walks the
+    ingredients the pantry lacks, once each, and keeps "missing exactly k ingredients"
+    counters as bitsets over all recipes at once. The per-recipe work is therefore done
+    by big-int AND/OR operations in C, not by a Python loop over recipes comparing
+    ingredient sets. The matcher subscribes to a RecipeStore and is maintained
+    incrementally.
+
+    Attributes:
+        store (RecipeStore): The recipe store being matched against.
+    """
+
+    def __init__(self, store=None):
+        """
+        Initializes the PantryMatcher and builds it from the store, if one is given.
+
+        Args:
+            store (RecipeStore, optional): The recipe store to match against and subscribe to.
+        """
+        self.store = store
+        self._lock = threading.RLock()
+        self._ingredient_ids = {}  # normalized ingredient -> ingredient ID
+        self._ingredient_names = []  # ingredient ID -> normalized ingredient
+        self._clear()
+        if store is not None:
+            self.rebuild()
+            store.subscribe(self)
+
+    def _clear(self):
+        self._recipes = {}  # recipe ID -> (slot, ingredient bitset, name)
+        self._slot_ids = []  # slot -> recipe ID, or None if the slot is free
+        self._free_slots = []
+        self._users = []  # ingredient ID -> bitset of the slots of recipes using it
+        self._live = 0  # Bitset of the slots of recipes with at least one ingredient
+
+    # ------------------------------------------------------------------ maintenance
+
+    def _intern(self, ingredient):
+        ingredient_id = self._ingredient_ids.get(ingredient)
+        if ingredient_id is None:
+            ingredient_id = self._ingredient_ids[ingredient] = len(self._ingredient_names)
+            self._ingredient_names.append(ingredient)
+            self._users.append(0)
+        return ingredient_id
+
+    def add(self, recipe_id, name, ingredients):
+        """
+        Adds or replaces a recipe.
+
+        Args:
+            recipe_id (int): The recipe ID.
+            name (str): The recipe name.
+            ingredients (str): The comma-separated ingredients.
+        """
+        with self._lock:
+            self.remove(recipe_id)
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._slot_ids[slot] = recipe_id
+            else:
+                slot = len(self._slot_ids)
+                self._slot_ids.append(recipe_id)
+            slot_bit = 1 << slot
+            bits = 0
+            for ingredient in parse_ingredients(ingredients):
+                ingredient_id = self._intern(ingredient)
+                bits |= 1 << ingredient_id
+                self._users[ingredient_id] |= slot_bit
+            self._recipes[recipe_id] = (slot, bits, name)
+            if bits:  # A recipe without ingredients isn't cookable from any pantry
+                self._live |= slot_bit
+
+    def remove(self, recipe_id):
+        """
+        Removes a recipe.
+
+        Args:
+            recipe_id (int): The recipe ID.
+        """
+        with self._lock:
+            entry = self._recipes.pop(recipe_id, None)
+            if entry is None:
+                return
+            slot, bits, _ = entry
+            keep = ~(1 << slot)
+            for ingredient_id in _bit_positions(bits):
+                self._users[ingredient_id] &= keep
+            self._live &= keep
+            self._slot_ids[slot] = None
+            self._free_slots.append(slot)
+
+    def rebuild(self, recipes=None):
+        """
+        Rebuilds the bitsets from the store's live view.
+
+        Args:
+            recipes (list, optional): The live view to rebuild from, as (recipe ID, row)
+                                      pairs. Defaults to `store.recipes()`.
+        """
+        if recipes is None:
+            recipes = self.store.recipes()
+        with self._lock:
+            self._clear()
+            slots_by_ingredient = []
+            empty = 0  # Bitset of the slots of recipes without ingredients
+            for slot, (recipe_id, row) in enumerate(recipes):
+                bits = 0
+                for ingredient in parse_ingredients(row[1]):
+                    ingredient_id = self._intern(ingredient)
+                    bits |= 1 << ingredient_id
+                    while len(slots_by_ingredient) <= ingredient_id:
+                        slots_by_ingredient.append([])
+                    slots_by_ingredient[ingredient_id].append(slot)
+                if not bits:
+                    empty |= 1 << slot
+                self._recipes[recipe_id] = (slot, bits, row[0])
+                self._slot_ids.append(recipe_id)
+            # Set each ingredient's bits in a bytearray once, rather than growing a big int per recipe
+            size = (len(self._slot_ids) + 7) // 8
+            for ingredient_id, slots in enumerate(slots_by_ingredient):
+                buffer = bytearray(size)
+                for slot in slots:
+                    buffer[slot >> 3] |= 1 << (slot & 7)
+                self._users[ingredient_id] = int.from_bytes(buffer, "little")
+            self._live = ((1 << len(self._slot_ids)) - 1) & ~empty
+        Logger.log_info(f"Rebuilt pantry matcher ({len(self._recipes)} recipes, "
+                        f"{len(self._ingredient_names)} ingredients).")
+
+    def on_add(self, recipe_id, row):
+        self.add(recipe_id, row[0], row[1])
+
+    def on_edit(self, recipe_id, row):
+        self.add(recipe_id, row[0], row[1])
+
+    def on_delete(self, recipe_id):
+        self.remove(recipe_id)
+
+    def on_compact(self, id_map):
+        with self._lock:
+            self._slot_ids = [None if recipe_id is None else id_map.get(recipe_id) for recipe_id in self._slot_ids]
+            self._recipes = {
+                id_map[recipe_id]: entry for recipe_id, entry in self._recipes.items() if recipe_id in id_map
+            }
+
+    def on_reload(self, recipes):
+        self.rebuild(recipes)
+
+    # ------------------------------------------------------------------ queries
+
+    def pantry_bits(self, pantry):
+        """
+        Converts a pantry into a bitset over ingredient IDs. Ingredients no recipe uses are ignored.
+
+        Args:
+            pantry (Iterable[str]): The ingredients on hand.
+
+        Returns:
+            int: The pantry bitset.
+        """
+        bits = 0
+        for ingredient in pantry:
+            ingredient_id = self._ingredient_ids.get(normalize_ingredient(ingredient))
+            if ingredient_id is not None:
+                bits |= 1 << ingredient_id
+        return bits
+
+    def _missing_counts(self, pantry_bits, max_missing):
+        """
+        Counts, for every recipe at once, how many of its ingredients the pantry lacks.
+
+        Returns:
+            list[int]: Slot bitsets; entry k marks the recipes missing exactly k ingredients,
+                       for k from 0 to max_missing. Recipes missing more are in none of them.
+        """
+        exactly = [self._live] + [0] * max_missing
+        for ingredient_id, users in enumerate(self._users):
+            if not users or (pantry_bits >> ingredient_id) & 1:
+                continue
+            # Move every recipe using this ingredient up one counter; those at max_missing drop out
+            for count in range(max_missing, 0, -1):
+                exactly[count] = (exactly[count] & ~users) | (exactly[count - 1] & users)
+            exactly[0] &= ~users
+        return exactly
+
+    def what_can_i_cook(self, pantry, max_missing=2):
+        """
+        Finds the recipes a pantry fully covers, and those it misses only a few items for.
+        Recipes without ingredients are never returned.
+
+        Args:
+            pantry (Iterable[str]): The ingredients on hand.
+            max_missing (int): Also return recipes missing up to this many ingredients. Defaults to 2.
+
+        Returns:
+            dict: {"cookable": [(recipe ID, name)], "almost": [(recipe ID, name, [missing ingredients])]},
+                  with the almost-cookable recipes ordered by how few ingredients they miss.
+        """
+        with self._lock:
+            pantry_bits = self.pantry_bits(pantry)
+            exactly = self._missing_counts(pantry_bits, max(0, max_missing))
+            recipes, slot_ids, names = self._recipes, self._slot_ids, self._ingredient_names
+            cookable = [(slot_ids[slot], recipes[slot_ids[slot]][2]) for slot in _bit_positions(exactly[0])]
+            cookable.sort(key=itemgetter(1))
+            almost = []
+            for count in range(1, len(exactly)):
+                matches = []
+                for slot in _bit_positions(exactly[count]):
+                    recipe_id = slot_ids[slot]
+                    _, bits, name = recipes[recipe_id]
+                    missing_bits = bits & ~pantry_bits
+                    missing = []
+                    while missing_bits:
+                        low_bit = missing_bits & -missing_bits
+                        missing.append(names[low_bit.bit_length() - 1])
+                        missing_bits ^= low_bit
+                    missing.sort()
+                    matches.append((recipe_id, name, missing))
+                matches.sort(key=itemgetter(1))
+                almost.extend(matches)
+            return {"cookable": cookable, "almost": almost}
+
+    def __len__(self):
+        """
+        Returns the number of recipes held.
+        """
+        return len(self._recipes)
@@ -0,0 +1,252 @@
+import asyncio
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+
+
+def _hash_password(password, rounds):
+    """
+    Hashes a password with bcrypt. Module-level so it can be pickled for process pools.
+
+    Args:
+        password (bytes): The UTF-8 encoded password.
+        rounds (int | None): The bcrypt cost factor, or None for the library default.
+
+    Returns:
+        bytes: The bcrypt hash.
+    """
+    salt = bcrypt.gensalt(rounds) if rounds else bcrypt.gensalt()
+    return bcrypt.hashpw(password, salt)
+
+
+def _verify_password(password, hashed_password):
+    """
+    Verifies a password against a bcrypt hash. Module-level so it can be pickled for process pools.
+
+    Args:
+        password (bytes): The UTF-8 encoded password.
+        hashed_password (bytes): The stored bcrypt hash.
+
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+    """
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a worker pool instead of the calling thread.
+
+    bcrypt is deliberately slow, so running it inline blocks everything else the process
+    is doing. The hasher sends the work to a ThreadPoolExecutor (bcrypt releases the GIL
+    while hashing, so threads scale across cores) or a ProcessPoolExecutor, and offers
+    blocking wrappers as well as `async` variants for use from an event loop.
+
+    Attributes:
+        max_workers (int): The number of workers in the pool.
+        executor_type (str): Either "thread" or "process".
+        rounds (int | None): The bcrypt cost factor used for new hashes.
+    """
+
+    EXECUTOR_TYPES = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    MIN_ROUNDS = 10  # Never calibrate below this, however slow the machine
+    MAX_ROUNDS = 16
+
+    def __init__(self, max_workers=None, executor_type="thread", rounds=None):
+        """
+        Initializes the PasswordHasher. The worker pool is created on first use.
+
+        Args:
+            max_workers (int, optional): The number of workers. Defaults to the CPU count.
+            executor_type (str): "thread" or "process". Defaults to "thread".
+            rounds (int, optional): The bcrypt cost factor. Defaults to the library default.
+
+        Raises:
+            ValueError: If the executor type is unknown.
+        """
+        if executor_type not in self.EXECUTOR_TYPES:
+            raise ValueError(f"Unknown executor type: {executor_type}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor_type = executor_type
+        self.rounds = rounds
+        self._executor = None
+
+    @property
+    def executor(self):
+        """
+        The worker pool, created lazily so importing the hasher stays cheap.
+
+        Returns:
+            Executor: The thread or process pool.
+        """
+        if self._executor is None:
+            self._executor = self.EXECUTOR_TYPES[self.executor_type](max_workers=self.max_workers)
+        return self._executor
+
+    def submit_hash(self, password):
+        """
+        Schedules a password hash on the worker pool.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            Future: A future resolving to the bcrypt hash as bytes.
+        """
+        return self.executor.submit(_hash_password, password.encode("utf-8"), self.rounds)
+
+    def submit_verify(self, password, hashed_password):
+        """
+        Schedules a password verification on the worker pool.
+
+        Args:
+            password (str): The plain-text password.
+            hashed_password (str): The stored bcrypt hash.
+
+        Returns:
+            Future: A future resolving to True if the password matches, False otherwise.
+        """
+        return self.executor.submit(
+            _verify_password, password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+
+    def hash_password(self, password):
+        """
+        Hashes a password on the worker pool and waits for the result.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The bcrypt hash.
+        """
+        return self.submit_hash(password).result().decode("utf-8")
+
+    def verify_password(self, password, hashed_password):
+        """
+        Verifies a password on the worker pool and waits for the result.
+
+        Args:
+            password (str): The plain-text password.
+            hashed_password (str): The stored bcrypt hash.
+
+        Returns:
+            bool: True if the password matches the hash, False otherwise.
+        """
+        return self.submit_verify(password, hashed_password).result()
+
+    async def async_hash_password(self, password):
+        """
+        Hashes a password on the worker pool without blocking the event loop.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The bcrypt hash.
+        """
+        hashed = await asyncio.wrap_future(self.submit_hash(password))
+        return hashed.decode("utf-8")
+
+    async def async_verify_password(self, password, hashed_password):
+        """
+        Verifies a password on the worker pool without blocking the event loop.
+
+        Args:
+            password (str): The plain-text password.
+            hashed_password (str): The stored bcrypt hash.
+
+        Returns:
+            bool: True if the password matches the hash, False otherwise.
+        """
+        return await asyncio.wrap_future(self.submit_verify(password, hashed_password))
+
+    @staticmethod
+    def get_cost(hashed_password):
+        """
+        Reads the cost factor out of a bcrypt hash (e.g. "$2b$12$..." has cost 12).
+
+        Args:
+            hashed_password (str): A bcrypt hash.
+
+        Returns:
+            int | None: The cost factor, or None if the hash isn't in bcrypt format.
+        """
+        parts = hashed_password.split("$")
+        if len(parts) < 4 or not parts[2].isdigit():
+            return None
+        return int(parts[2])
+
+    def needs_rehash(self, hashed_password):
+        """
+        Checks whether a stored hash was made with a different cost factor than the configured one.
+
+        Args:
+            hashed_password (str): The stored bcrypt hash.
+
+        Returns:
+            bool: True if the hash should be replaced with one at the configured cost.
+        """
+        return self.rounds is not None and self.get_cost(hashed_password) != self.rounds
+
+    @classmethod
+    def calibrate_rounds(cls, target_ms=50, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+        """
+        Picks the highest bcrypt cost whose verify latency on this machine stays within a target.
+
+        Each extra round doubles the work, so the cost is measured from the cheapest
+        setting upwards and the search stops as soon as the target is exceeded.
+
+        Args:
+            target_ms (float): The target verification latency in milliseconds. Defaults to 50.
+            min_rounds (int): The lowest cost that may be chosen, even if it exceeds the target.
+            max_rounds (int): The highest cost that may be chosen.
+
+        Returns:
+            int: The calibrated cost factor.
+        """
+        password = b"calibration-password"
+        chosen = min_rounds
+        for rounds in range(4, max_rounds + 1):
+            hashed_password = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+            samples = []
+            for _ in range(3):
+                start = time.perf_counter()
+                bcrypt.checkpw(password, hashed_password)
+                samples.append((time.perf_counter() - start) * 1000)
+            elapsed_ms = sorted(samples)[1]  # Median of three
+            if elapsed_ms > target_ms:
+                break
+            chosen = max(rounds, min_rounds)
+        return chosen
+
+    def shutdown(self, wait=True):
+        """
+        Shuts down the worker pool. A new pool is created if the hasher is used again.
+
+        Args:
+            wait (bool): Whether to wait for pending work to finish. Defaults to True.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_default_hasher = None
+
+
+def get_password_hasher():
+    """
+    Returns the process-wide PasswordHasher, creating it on first use.
+
+    Returns:
+        PasswordHasher: The shared password hasher.
+    """
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = PasswordHasher()
+        atexit.register(_default_hasher.shutdown)
+    return _default_hasher
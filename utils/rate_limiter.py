@@ -0,0 +1,150 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class LoginThrottledError(Exception):
+    """
+    Raised when a login attempt is rejected by the rate limiter before any work is done.
+
+    Attributes:
+        retry_after (float): Seconds until the next attempt may be allowed.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many login attempts. Try again in {math.ceil(retry_after)} seconds.")
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    """
+    Token-bucket and backoff state for a single key.
+    """
+
+    __slots__ = ("tokens", "updated", "failures", "blocked_until", "throttled")
+
+    def __init__(self, capacity, now):
+        self.tokens = float(capacity)
+        self.updated = now
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.throttled = False
+
+
+class RateLimiter:
+    """
+    An in-memory token-bucket limiter with exponential backoff on repeated failures.
+
+    Each key (for example an email address or a request source) gets a bucket of
+    `capacity` tokens that refills at `refill_per_second`; every attempt takes one
+    token. On top of that, once a key has failed more than `free_failures` times in a
+    row it is blocked for `base_backoff * 2 ** n` seconds (capped at `max_backoff`).
+    Memory is bounded: at most `max_keys` buckets are kept and the least recently used
+    one is evicted first. The limiter is thread-safe.
+
+    Attributes:
+        capacity (int): The burst size of each bucket.
+        refill_per_second (float): How fast tokens come back.
+        free_failures (int): Consecutive failures allowed before backoff starts.
+        base_backoff (float): The first backoff delay in seconds.
+        max_backoff (float): The longest backoff delay in seconds.
+        max_keys (int): The maximum number of buckets kept in memory.
+    """
+
+    def __init__(self, capacity=5, refill_per_second=0.1, free_failures=3,
+                 base_backoff=1.0, max_backoff=300.0, max_keys=10000):
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            capacity (int): The burst size of each bucket. Defaults to 5.
+            refill_per_second (float): Tokens regained per second. Defaults to 0.1.
+            free_failures (int): Consecutive failures allowed before backoff starts. Defaults to 3.
+            base_backoff (float): The first backoff delay in seconds. Defaults to 1.
+            max_backoff (float): The longest backoff delay in seconds. Defaults to 300.
+            max_keys (int): The maximum number of buckets kept in memory. Defaults to 10000.
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.free_failures = free_failures
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, now):
+        """
+        Returns the bucket for a key, creating it (and evicting idle ones) if needed.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.capacity, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket.updated
+            bucket.tokens = min(self.capacity, bucket.tokens + elapsed * self.refill_per_second)
+            bucket.updated = now
+        return bucket
+
+    def acquire(self, key):
+        """
+        Takes one token for an attempt.
+
+        Args:
+            key (str): The key the attempt is made under.
+
+        Returns:
+            tuple[float, bool]: The number of seconds to wait (0 if the attempt is allowed),
+                and whether this is the first rejection since the key was last allowed,
+                so callers can log throttling once instead of once per attempt.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(key, now)
+            if bucket.blocked_until > now:
+                retry_after = bucket.blocked_until - now
+            elif bucket.tokens < 1:
+                retry_after = (1 - bucket.tokens) / self.refill_per_second
+            else:
+                bucket.tokens -= 1
+                bucket.throttled = False
+                return 0.0, False
+            first_rejection = not bucket.throttled
+            bucket.throttled = True
+            return retry_after, first_rejection
+
+    def record_failure(self, key):
+        """
+        Records a failed attempt, starting or extending the key's backoff.
+
+        Args:
+            key (str): The key the attempt was made under.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(key, now)
+            bucket.failures += 1
+            excess = bucket.failures - self.free_failures
+            if excess > 0:
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (excess - 1))
+                bucket.blocked_until = now + delay
+
+    def record_success(self, key):
+        """
+        Records a successful attempt, clearing the key's backoff.
+
+        Args:
+            key (str): The key the attempt was made under.
+        """
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        """
+        Returns the number of buckets currently held in memory.
+        """
+        return len(self._buckets)
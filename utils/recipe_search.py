@@ -0,0 +1,485 @@
+import threading
+from collections import defaultdict
+from utils.logger import Logger
+
+
+def normalize_name(name):
+    """
+    Normalizes a recipe name for searching: lowercases it and collapses whitespace.
+
+    Args:
+        name (str): The recipe name.
+
+    Returns:
+        str: The normalized name.
+    """
+    return " ".join(name.lower().split())
+
+
+def levenshtein(a, b):
+    """
+    Computes the edit distance (insertions, deletions, substitutions) between two strings.
+
+    Uses Myers' bit-parallel algorithm (in Hyyro's formulation): each column of the
+    dynamic-programming matrix is encoded in the bits of a Python int, so the cost is
+    O(len(a)) big-int operations instead of O(len(a) * len(b)) Python steps.
+
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+
+    Returns:
+        int: The edit distance.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    return _pattern_distance(_compile_pattern(b), a)
+
+
+def _compile_pattern(pattern):
+    """
+    Precomputes the per-character bit masks of a non-empty pattern for `_pattern_distance`,
+    so a query word can be compared against many candidates without redoing this work.
+    """
+    match_masks = {}
+    for position, char in enumerate(pattern):
+        match_masks[char] = match_masks.get(char, 0) | (1 << position)
+    return match_masks, len(pattern)
+
+
+def _pattern_distance(compiled, text):
+    """
+    Returns the edit distance between a compiled pattern and a text.
+    """
+    match_masks, length = compiled
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = full, 0, length
+    for char in text:
+        equal = match_masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full
+        negative = horizontal_positive & vertical & full
+    return score
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = None  # Set of recipe IDs whose full name ends here
+
+
+class Trie:
+    """
+    A character trie over normalized recipe names for prefix autocomplete.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, name, recipe_id):
+        node = self.root
+        for char in name:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        if node.ids is None:
+            node.ids = set()
+        node.ids.add(recipe_id)
+
+    def remove(self, name, recipe_id):
+        """
+        Removes a recipe ID from a name, pruning branches that become empty.
+        """
+        path = [self.root]
+        for char in name:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        node = path[-1]
+        if node.ids is None:
+            return
+        node.ids.discard(recipe_id)
+        if not node.ids:
+            node.ids = None
+        for depth in range(len(name), 0, -1):
+            node = path[depth]
+            if node.ids or node.children:
+                break
+            del path[depth - 1].children[name[depth - 1]]
+
+    def get(self, name):
+        """
+        Returns the recipe IDs whose full name is `name`, without copying them.
+        """
+        node = self.root
+        for char in name:
+            node = node.children.get(char)
+            if node is None:
+                return ()
+        return node.ids or ()
+
+    def remap(self, id_map):
+        """
+        Replaces every recipe ID with its new ID in `id_map`, e.g. after a compaction
+        renumbered the recipes. The shape of the trie doesn't change.
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.ids:
+                node.ids = {id_map[recipe_id] for recipe_id in node.ids}
+            stack.extend(node.children.values())
+
+    def with_prefix(self, prefix, limit):
+        """
+        Returns up to `limit` (name, recipe ID) pairs whose name starts with `prefix`,
+        in alphabetical order, without visiting the rest of the trie.
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        results = []
+        stack = [(node, prefix)]
+        while stack and len(results) < limit:
+            node, name = stack.pop()
+            if node.ids:
+                for recipe_id in sorted(node.ids):
+                    results.append((name, recipe_id))
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], name + char))
+        return results[:limit]
+
+
+class BKTree:
+    """
+    A Burkhard-Keller tree over words for typo-tolerant lookups by edit distance.
+
+    Words are never physically removed; callers track which words are still in use
+    and skip the rest, rebuilding the tree when too many dead words pile up.
+    """
+
+    def __len__(self):
+        return self.size
+
+    def __init__(self):
+        self.root = None  # (word, {distance: child})
+        self.size = 0
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """
+        Returns (word, distance) pairs within `max_distance` of `word`.
+        """
+        if self.root is None or not word:
+            return []
+        compiled = _compile_pattern(word)
+        results = []
+        stack = [self.root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = _pattern_distance(compiled, candidate)
+            if distance <= max_distance:
+                results.append((candidate, distance))
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        return results
+
+
+class BKForest:
+    """
+    One BK-tree per word length. Words whose lengths differ by more than the tolerated
+    distance can never match, so a query only descends the few trees of nearby lengths,
+    and each of those trees is much smaller than a single tree over the whole vocabulary.
+    """
+
+    def __init__(self):
+        self.trees = {}
+        self.size = 0
+
+    def add(self, word):
+        tree = self.trees.get(len(word))
+        if tree is None:
+            tree = self.trees[len(word)] = BKTree()
+        before = tree.size
+        tree.add(word)
+        self.size += tree.size - before
+
+    def search(self, word, max_distance):
+        results = []
+        for length in range(len(word) - max_distance, len(word) + max_distance + 1):
+            tree = self.trees.get(length)
+            if tree is not None:
+                results.extend(tree.search(word, max_distance))
+        return results
+
+
+class RecipeSearchEngine:
+    """
+    Prefix and typo-tolerant search over recipe names.
+
+    A trie over full normalized names answers autocomplete queries in time proportional
+    to the prefix and the number of results. Fuzzy queries are answered per word: every
+    distinct word of every recipe name is kept in a BK-tree (one per word length), each
+    query word is matched to the vocabulary words within a small edit distance, and recipes
+    must match every query word. The vocabulary is far smaller than the number of recipes,
+    which keeps BK-tree queries fast. The engine subscribes to a RecipeStore and is maintained incrementally.
+
+    Attributes:
+        store (RecipeStore): The recipe store being searched.
+    """
+
+    def __init__(self, store=None):
+        """
+        Initializes the RecipeSearchEngine and builds it from the store, if one is given.
+
+        Args:
+            store (RecipeStore, optional): The recipe store to search and subscribe to.
+        """
+        self.store = store
+        self._lock = threading.RLock()
+        self._clear()
+        if store is not None:
+            self.rebuild()
+            store.subscribe(self)
+
+    def _clear(self):
+        self._names = {}  # recipe ID -> display name
+        self._trie = Trie()
+        self._bk_tree = BKForest()
+        self._word_ids = defaultdict(set)  # word -> recipe IDs
+        self._dead_words = 0  # Words still in the BK-tree but no longer used by any recipe
+
+    # ------------------------------------------------------------------ maintenance
+
+    def rebuild(self, recipes=None):
+        """
+        Rebuilds the engine from the store's live view.
+
+        Args:
+            recipes (list, optional): The live view to rebuild from, as (recipe ID, row)
+                                      pairs. Defaults to `store.recipes()`.
+        """
+        if recipes is None:
+            recipes = self.store.recipes()
+        with self._lock:
+            self._clear()
+            for recipe_id, row in recipes:
+                self.add(recipe_id, row[0])
+        Logger.log_info(f"Rebuilt recipe name search ({len(self._names)} recipes).")
+
+    def add(self, recipe_id, name):
+        """
+        Indexes a recipe name.
+
+        Args:
+            recipe_id (int): The recipe ID.
+            name (str): The recipe name.
+        """
+        with self._lock:
+            normalized = normalize_name(name)
+            self._names[recipe_id] = name
+            self._trie.insert(normalized, recipe_id)
+            for word in set(normalized.split()):
+                if word not in self._word_ids:
+                    self._bk_tree.add(word)
+                elif not self._word_ids[word]:
+                    self._dead_words -= 1
+                self._word_ids[word].add(recipe_id)
+
+    def remove(self, recipe_id):
+        """
+        Removes a recipe from the index.
+
+        Args:
+            recipe_id (int): The recipe ID.
+        """
+        with self._lock:
+            name = self._names.pop(recipe_id, None)
+            if name is None:
+                return
+            normalized = normalize_name(name)
+            self._trie.remove(normalized, recipe_id)
+            for word in set(normalized.split()):
+                ids = self._word_ids[word]
+                ids.discard(recipe_id)
+                if not ids:
+                    self._dead_words += 1
+            if self._dead_words > 1024 and self._dead_words > self._bk_tree.size // 2:
+                self._rebuild_bk_tree()
+
+    def _rebuild_bk_tree(self):
+        """
+        Rebuilds the BK-tree from the words still in use, dropping dead ones.
+        """
+        self._word_ids = defaultdict(set, {word: ids for word, ids in self._word_ids.items() if ids})
+        self._bk_tree = BKForest()
+        for word in self._word_ids:
+            self._bk_tree.add(word)
+        self._dead_words = 0
+
+    def on_add(self, recipe_id, row):
+        self.add(recipe_id, row[0])
+
+    def on_edit(self, recipe_id, row):
+        with self._lock:
+            self.remove(recipe_id)
+            self.add(recipe_id, row[0])
+
+    def on_delete(self, recipe_id):
+        self.remove(recipe_id)
+
+    def on_compact(self, id_map):
+        # Only the IDs change; names, words and the BK-trees stay as they are
+        with self._lock:
+            for recipe_id in [recipe_id for recipe_id in self._names if recipe_id not in id_map]:
+                self.remove(recipe_id)
+            self._names = {id_map[recipe_id]: name for recipe_id, name in self._names.items()}
+            self._trie.remap(id_map)
+            for word, ids in self._word_ids.items():
+                self._word_ids[word] = {id_map[recipe_id] for recipe_id in ids}
+
+    def on_reload(self, recipes):
+        self.rebuild(recipes)
+
+    # ------------------------------------------------------------------ queries
+
+    @staticmethod
+    def default_max_distance(word):
+        """
+        Returns how many typos to tolerate in a query word of a given length.
+        """
+        if len(word) <= 2:
+            return 0
+        if len(word) <= 8:
+            return 1
+        return 2
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Returns recipes whose name starts with the given prefix.
+
+        Args:
+            prefix (str): The beginning of a recipe name.
+            limit (int): The maximum number of results. Defaults to 10.
+
+        Returns:
+            list[tuple[int, str]]: (recipe ID, name) pairs.
+        """
+        with self._lock:
+            matches = self._trie.with_prefix(normalize_name(prefix), limit)
+            return [(recipe_id, self._names[recipe_id]) for _, recipe_id in matches]
+
+    def fuzzy_search(self, query, limit=10, max_distance=None):
+        """
+        Returns recipes whose name contains a close match for every word of the query.
+
+        Args:
+            query (str): The (possibly misspelled) words to look for.
+            limit (int): The maximum number of results. Defaults to 10.
+            max_distance (int, optional): The edit distance tolerated per word.
+                                          Defaults to 0-2 depending on the word length.
+
+        Returns:
+            list[tuple[int, str, int]]: (recipe ID, name, total edit distance) tuples,
+                                        closest matches first.
+        """
+        words = normalize_name(query).split()
+        if not words:
+            return []
+        with self._lock:
+            candidates = None
+            for word in words:
+                tolerance = self.default_max_distance(word) if max_distance is None else max_distance
+                best = {}
+                for match, distance in self._bk_tree.search(word, tolerance):
+                    for recipe_id in self._word_ids.get(match, ()):
+                        if distance < best.get(recipe_id, tolerance + 1):
+                            best[recipe_id] = distance
+                if candidates is None:
+                    candidates = best
+                else:
+                    candidates = {
+                        recipe_id: total + best[recipe_id]
+                        for recipe_id, total in candidates.items() if recipe_id in best
+                    }
+                if not candidates:
+                    return []
+            ranked = sorted(candidates.items(), key=lambda item: (item[1], self._names[item[0]]))
+            return [(recipe_id, self._names[recipe_id], distance) for recipe_id, distance in ranked[:limit]]
+
+    def lookup(self, name):
+        """
+        Returns the recipes named exactly `name`, compared normalized (see `normalize_name`).
+
+        Args:
+            name (str): The recipe name.
+
+        Returns:
+            list[int]: The recipe IDs, in ascending (display) order.
+        """
+        with self._lock:
+            return sorted(self._trie.get(normalize_name(name)))
+
+    def search(self, query, limit=10):
+        """
+        Combined search: prefix matches first, then typo-tolerant matches.
+
+        Args:
+            query (str): The search text.
+            limit (int): The maximum number of results. Defaults to 10.
+
+        Returns:
+            list[tuple[int, str]]: (recipe ID, name) pairs.
+        """
+        results = self.autocomplete(query, limit)
+        seen = {recipe_id for recipe_id, _ in results}
+        if len(results) < limit:
+            for recipe_id, name, _ in self.fuzzy_search(query, limit):
+                if recipe_id not in seen and len(results) < limit:
+                    results.append((recipe_id, name))
+                    seen.add(recipe_id)
+        return results
+
+    def __len__(self):
+        """
+        Returns the number of indexed recipes.
+        """
+        return len(self._names)
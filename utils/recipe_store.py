@@ -0,0 +1,619 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from utils.file_manager import FileManager
+from utils.logger import Logger
+
+
+class RecipeStore:
+    """
+    A journaled store for the recipes CSV file.
+
+    Adds, edits and deletes are appended to a small journal file next to the CSV
+    instead of rewriting the whole file, so a single-recipe mutation costs O(1) I/O.
+    Reads fold the journal into the rows of the CSV file to produce the live view.
+    Once the journal grows past a record count or a size ratio of the CSV file it is
+    compacted in a background thread: the live view is written back to the CSV file
+    atomically and the journal starts over.
+
+    Every recipe has an integer ID: rows of the CSV file are numbered from 0 in file
+    order, and recipes added through the journal get the next free numbers. IDs are
+    stable until the next compaction, which renumbers the live view from 0. Single
+    recipes and pages of the live view are read by row number (through a row-offset
+    index of the CSV file, or the table's primary key on the SQLite backend), so they
+    don't require reading the whole file.
+
+    The first line of the journal is a header describing the CSV file it applies to
+    (row count, the file's signature and its checksum). A journal whose header doesn't
+    match the CSV file, e.g. because a compaction crashed after replacing the CSV file,
+    is discarded instead of being replayed twice.
+
+    Derived structures (such as search indexes) can `subscribe()` to the store. They are
+    called with `on_add(recipe_id, row)`, `on_edit(recipe_id, row)`, `on_delete(recipe_id)`
+    after each mutation, `on_compact(id_map)` with the old-to-new ID mapping after a
+    compaction, and `on_reload(recipes)` with the new live view when another process
+    changed the files. All callbacks are optional and run while the store's lock is held,
+    so they must not call back into methods that wait for a compaction, such as `recipes()`.
+
+    Several processes can share the store. Reads hold the CSV file's cross-process lock
+    shared and mutations and compactions hold it exclusively (see `FileLock`), re-reading
+    the journal first, so no process appends to a journal that another one has just
+    compacted. Every mutation bumps the store's `revision()`; callers that chose a recipe
+    a while ago pass it back as `expected_revision` to detect that someone else changed
+    the recipes in the meantime (StaleVersionError) and retry, e.g. after `find`.
+
+    Attributes:
+        file_path (str): Path to the recipes CSV file.
+        journal_path (str): Path to the journal file.
+        max_journal_records (int): Compact once the journal holds this many records.
+        max_journal_ratio (float): Compact once the journal is this large relative to the CSV file.
+    """
+
+    FIELDNAMES = ["Recipe Name", "Ingredients"]
+    MIN_COMPACTION_BYTES = 64 * 1024  # Don't bother compacting tiny journals on ratio alone
+
+    def __init__(self, file_path, max_journal_records=1000, max_journal_ratio=0.5, background=True):
+        """
+        Initializes the RecipeStore and replays any existing journal.
+
+        Args:
+            file_path (str): Path to the recipes CSV file.
+            max_journal_records (int): Record count that triggers compaction. Defaults to 1000.
+            max_journal_ratio (float): Journal/CSV size ratio that triggers compaction. Defaults to 0.5.
+            background (bool): Whether compaction runs in a background thread. Defaults to True.
+        """
+        self.file_path = file_path
+        self.journal_path = os.path.splitext(file_path)[0] + ".journal"
+        self.max_journal_records = max_journal_records
+        self.max_journal_ratio = max_journal_ratio
+        self.background = background
+        self.file_manager = FileManager(file_path, snapshot=True)
+        self.file_lock = self.file_manager.lock
+        self._lock = threading.RLock()
+        self._compaction_thread = None
+        self._listeners = []
+        self._batch_depth = 0
+        with self._lock, self.file_lock.shared():
+            self._load_journal()
+            self._signature = self.version()
+
+    # ------------------------------------------------------------------ CSV file
+
+    def _base_stat(self):
+        """
+        Returns the (size, mtime_ns) of the CSV file, or (0, 0) if it doesn't exist.
+        On the SQLite backend these are the table's byte count and version stamp.
+        """
+        signature = self.file_manager.signature()
+        if signature is None:
+            return 0, 0
+        mtime_ns, size = signature
+        return size, mtime_ns
+
+    def _base_crc(self):
+        """
+        Returns the checksum (CRC32) of the CSV file's contents.
+        """
+        return self.file_manager.checksum()
+
+    def _iter_base(self):
+        """
+        Returns an iterator over the non-empty data rows of the CSV file as (name, ingredients)
+        tuples. Parsed rows come from the FileManager cache when the file hasn't changed.
+        """
+        _, rows = self.file_manager.read_rows()
+        return iter(rows)
+
+    # ------------------------------------------------------------------ journal
+
+    def _reset_state(self):
+        self._header = None
+        self._edits = {}
+        self._deleted = set()
+        self._added = {}
+        self._next_id = None
+        self._records = 0
+        self._signature = None
+
+    def _journal_stat(self):
+        """
+        Returns the (size, mtime_ns) of the journal, or None if it doesn't exist.
+        """
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _header_matches_base(self, header):
+        """
+        Checks whether a journal header describes the current CSV file.
+        """
+        size, mtime_ns = self._base_stat()
+        if header.get("size") != size:
+            return False
+        if header.get("mtime_ns") == mtime_ns:
+            return True
+        # The file may have been copied or touched; fall back to comparing contents
+        return header.get("crc") == self._base_crc()
+
+    def _load_journal(self):
+        """
+        Replays the journal into memory, setting it aside if it belongs to an older CSV file.
+        """
+        self._reset_state()
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, mode="r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        try:
+            header = json.loads(lines[0])["header"]
+        except (IndexError, ValueError, KeyError, TypeError):
+            header = None
+        if header is None or not self._header_matches_base(header):
+            self._set_aside_journal()
+            return
+
+        self._header = header
+        self._next_id = header["rows"]
+        for number, line in enumerate(lines[1:], start=2):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash mid-append can only damage the last line
+                Logger.log_warning(f"Ignoring damaged recipe journal line {number}.")
+                continue
+            self._apply(record)
+        self._signature = self.version()
+
+    def _set_aside_journal(self):
+        """
+        Renames a journal that doesn't match the CSV file to a timestamped `.stale` backup
+        (e.g. `recipes.journal.20250101-120000.stale`), so changes that never reached the
+        CSV file can still be recovered by hand.
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        backup, number = f"{self.journal_path}.{stamp}.stale", 1
+        while os.path.exists(backup):
+            number += 1
+            backup = f"{self.journal_path}.{stamp}-{number}.stale"
+        try:
+            os.rename(self.journal_path, backup)
+        except FileNotFoundError:
+            return  # Another process set it aside first
+        Logger.log_error(f"Recipe journal {self.journal_path} doesn't match the CSV file; moved it to {backup}.")
+
+    def _refresh(self):
+        """
+        Reloads the journal if another process changed the CSV file or the journal.
+        """
+        if self.version() != self._signature:
+            self._load_journal()
+            self._signature = self.version()
+            if any(hasattr(listener, "on_reload") for listener in self._listeners):
+                # Hand listeners the live view: a compaction thread may be waiting for the
+                # lock held here, so they can't wait for it in `recipes()`
+                self._notify("on_reload", self._live())
+
+    def _notify(self, event, *args):
+        """
+        Calls `event` on every subscribed listener that implements it.
+        A failing listener is logged and never fails the mutation.
+        """
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)
+            if handler is None:
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                Logger.log_error(f"Error notifying {type(listener).__name__}.{event}: {e}")
+
+    def _apply(self, record):
+        """
+        Applies one journal record to the in-memory state.
+        """
+        op, recipe_id = record["op"], record["id"]
+        if op == "add":
+            self._added[recipe_id] = record["row"]
+            self._next_id = max(self._next_id, recipe_id + 1)
+        elif op == "edit":
+            if recipe_id in self._added:
+                self._added[recipe_id] = record["row"]
+            else:
+                self._edits[recipe_id] = record["row"]
+        elif op == "delete":
+            if self._added.pop(recipe_id, None) is None:
+                self._edits.pop(recipe_id, None)
+                self._deleted.add(recipe_id)
+        self._records += 1
+
+    def _write_header(self, rows, crc):
+        """
+        Starts a new, empty journal for the current CSV file.
+        """
+        size, mtime_ns = self._base_stat()
+        self._reset_state()
+        self._header = {"rows": rows, "size": size, "mtime_ns": mtime_ns, "crc": crc}
+        self._next_id = rows
+        temp_path = f"{self.journal_path}.tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as file:
+            file.write(json.dumps({"header": self._header}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.journal_path)
+        self._signature = self.version()
+
+    def _ensure_header(self):
+        """
+        Creates the journal on the first mutation after a compaction (or ever).
+        """
+        if self._header is None:
+            self._write_header(sum(1 for _ in self._iter_base()), self._base_crc())
+
+    def _append(self, record):
+        """
+        Durably appends a record to the journal, bumps the revision and applies the record.
+        Must be called with the file lock held exclusively.
+        """
+        self._ensure_header()
+        with open(self.journal_path, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            if self.file_manager.durable and not self._batch_depth:
+                os.fsync(file.fileno())
+        self.file_lock.bump_version()
+        self._apply(record)
+        self._signature = self.version()
+
+    # ------------------------------------------------------------------ public API
+
+    def _live(self):
+        """
+        Folds the journal into the CSV rows. Must be called with the lock held.
+        """
+        live = []
+        for recipe_id, row in enumerate(self._iter_base()):
+            if recipe_id in self._deleted:
+                continue
+            live.append((recipe_id, self._edits.get(recipe_id, row)))
+        live.extend(sorted(self._added.items()))
+        return live
+
+    def recipes(self):
+        """
+        Returns the live view of the recipes: the CSV rows with the journal folded in.
+
+        A background compaction renumbers IDs, so this waits for a running one to finish;
+        the IDs returned stay valid until the caller's next mutation.
+
+        Returns:
+            list[tuple[int, Sequence[str]]]: (recipe ID, (name, ingredients)) pairs in display order.
+        """
+        self.wait_for_compaction()
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            return self._live()
+
+    def get(self, recipe_id):
+        """
+        Returns a single recipe by ID without folding the whole journal.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+
+        Returns:
+            Sequence[str] | None: The (name, ingredients) row, or None if there is no such recipe.
+        """
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            if recipe_id in self._added:
+                return self._added[recipe_id]
+            if recipe_id in self._deleted or recipe_id < 0:
+                return None
+            if recipe_id in self._edits:
+                return self._edits[recipe_id]
+            rows = self.file_manager.read_range(recipe_id, recipe_id + 1)
+            return rows[0] if rows else None
+
+    def _base_deleted(self, base_rows):
+        """
+        Returns the deleted IDs of CSV rows, in ascending order. Must be called with the lock held.
+        """
+        return sorted(recipe_id for recipe_id in self._deleted if recipe_id < base_rows)
+
+    def count(self):
+        """
+        Returns the number of recipes in the live view, without reading the CSV rows.
+
+        Returns:
+            int: The number of recipes.
+        """
+        self.wait_for_compaction()
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            base_rows = self.file_manager.count()
+            return base_rows - len(self._base_deleted(base_rows)) + len(self._added)
+
+    def page(self, start, count):
+        """
+        Returns a slice of the live view by position, reading only the CSV rows it covers.
+
+        Positions are the 0-based display order of `recipes()`. Deleted CSV rows are
+        skipped, edits are applied, and recipes added through the journal follow the
+        CSV rows.
+
+        Args:
+            start (int): The position of the first recipe.
+            count (int): The maximum number of recipes to return.
+
+        Returns:
+            list[tuple[int, Sequence[str]]]: (recipe ID, (name, ingredients)) pairs.
+        """
+        self.wait_for_compaction()
+        if start < 0 or count <= 0:
+            return []
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            base_rows = self.file_manager.count()
+            deleted = self._base_deleted(base_rows)
+            live_base = base_rows - len(deleted)
+            result = []
+            if start < live_base:
+                # Find the CSV row at this position by stepping over the deleted rows before it
+                first = start
+                for recipe_id in deleted:
+                    if recipe_id > first:
+                        break
+                    first += 1
+                last = first
+                wanted = min(count, live_base - start)
+                deleted_set = set(deleted)
+                while wanted:
+                    if last not in deleted_set:
+                        wanted -= 1
+                    last += 1
+                for recipe_id, row in enumerate(self.file_manager.read_range(first, last), start=first):
+                    if recipe_id not in deleted_set:
+                        result.append((recipe_id, self._edits.get(recipe_id, row)))
+            added_start = max(0, start - live_base)
+            added_count = count - len(result)
+            if added_count > 0 and self._added:
+                result.extend(sorted(self._added.items())[added_start:added_start + added_count])
+            return result
+
+    def at_position(self, position):
+        """
+        Returns the recipe at a position of the live view.
+
+        Args:
+            position (int): The 0-based position, as numbered by `recipes()`.
+
+        Returns:
+            tuple[int, Sequence[str]] | None: (recipe ID, (name, ingredients)), or None if out of range.
+        """
+        recipes = self.page(position, 1)
+        return recipes[0] if recipes else None
+
+    def version(self):
+        """
+        Returns a fingerprint of the store's files that changes with every mutation.
+        Derived structures persist it to tell whether they are still current.
+
+        Returns:
+            tuple: The (size, mtime_ns) of the CSV file and of the journal.
+        """
+        return (self._base_stat(), self._journal_stat())
+
+    def journal_changes(self):
+        """
+        Returns what the journal changes in the CSV rows, so a derived structure saved for
+        the same CSV file can catch up without reading it.
+
+        Returns:
+            tuple: The CSV file's part of `version()`, its row count when the journal was
+                   started (None if there is no journal), the edited and added rows by
+                   recipe ID, and the set of deleted recipe IDs.
+        """
+        self.wait_for_compaction()
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            rows = self._header["rows"] if self._header is not None else None
+            return self._base_stat(), rows, {**self._edits, **self._added}, set(self._deleted)
+
+    def revision(self):
+        """
+        Returns the store's version counter, which every mutation and compaction bumps,
+        in this process or any other.
+
+        Returns:
+            int: The current revision.
+        """
+        return self.file_lock.version()
+
+    def find(self, row):
+        """
+        Returns the ID of the first recipe with the given name and ingredients, e.g. to
+        locate a recipe again after its ID was renumbered by another process.
+
+        Args:
+            row (Sequence[str]): The (name, ingredients) of the recipe.
+
+        Returns:
+            int | None: The recipe's current ID, or None if no recipe matches.
+        """
+        wanted = tuple(row)
+        self.wait_for_compaction()
+        with self._lock, self.file_lock.shared():
+            self._refresh()
+            # Look the name up in the CSV rows (an index lookup on the SQLite backend),
+            # then let the journal override what it changed
+            matches = [
+                recipe_id for recipe_id, candidate in self.file_manager.find_rows(self.FIELDNAMES[0], wanted[0])
+                if recipe_id not in self._deleted and recipe_id not in self._edits and tuple(candidate) == wanted
+            ]
+            matches.extend(recipe_id for recipe_id, candidate in self._edits.items() if tuple(candidate) == wanted)
+            matches.extend(recipe_id for recipe_id, candidate in self._added.items() if tuple(candidate) == wanted)
+            return min(matches, default=None)
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups many mutations into one commit, for bulk imports.
+
+        Inside the block, journal appends are flushed but not fsynced one by one; the
+        journal is fsynced once when the outermost block exits, and compaction waits
+        until then, so recipe IDs stay stable for the whole block. The file lock is held
+        exclusively throughout, so other processes see none of the batch until it is done
+        and keep batches short enough not to stall them.
+
+        Example:
+            with store.batch():
+                for name, ingredients in rows:
+                    store.add(name, ingredients)
+        """
+        self.wait_for_compaction()
+        with self._lock, self.file_lock.exclusive():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self.file_manager.durable and os.path.exists(self.journal_path):
+                    with open(self.journal_path, mode="a", encoding="utf-8") as file:
+                        os.fsync(file.fileno())
+            if not self._batch_depth:
+                self._maybe_compact()
+
+    def _begin_mutation(self, expected_revision):
+        """
+        Brings the state up to date and checks the expected revision.
+        Must be called with the lock and the file lock (exclusive) held.
+        """
+        self._refresh()
+        self.file_lock.check_version(expected_revision)
+
+    def subscribe(self, listener):
+        """
+        Registers a listener for mutation events (see the class docstring).
+
+        Args:
+            listener: An object implementing any of the `on_*` callbacks.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def add(self, name, ingredients, expected_revision=None):
+        """
+        Adds a recipe.
+
+        Args:
+            name (str): The recipe name.
+            ingredients (str): The comma-separated ingredients.
+            expected_revision (int, optional): The `revision()` the change is based on.
+
+        Returns:
+            int: The new recipe's ID.
+
+        Raises:
+            StaleVersionError: If `expected_revision` is given and another change came first.
+        """
+        with self._lock, self.file_lock.exclusive():
+            self._begin_mutation(expected_revision)
+            self._ensure_header()
+            recipe_id = self._next_id
+            row = [name, ingredients]
+            self._append({"op": "add", "id": recipe_id, "row": row})
+            self._notify("on_add", recipe_id, row)
+            self._maybe_compact()
+            return recipe_id
+
+    def edit(self, recipe_id, name, ingredients, expected_revision=None):
+        """
+        Replaces a recipe's name and ingredients.
+
+        Args:
+            recipe_id (int): The ID of the recipe, as returned by `recipes()`.
+            name (str): The new recipe name.
+            ingredients (str): The new comma-separated ingredients.
+            expected_revision (int, optional): The `revision()` the ID was read at.
+
+        Raises:
+            StaleVersionError: If `expected_revision` is given and another change came first.
+        """
+        with self._lock, self.file_lock.exclusive():
+            self._begin_mutation(expected_revision)
+            row = [name, ingredients]
+            self._append({"op": "edit", "id": recipe_id, "row": row})
+            self._notify("on_edit", recipe_id, row)
+            self._maybe_compact()
+
+    def delete(self, recipe_id, expected_revision=None):
+        """
+        Deletes a recipe.
+
+        Args:
+            recipe_id (int): The ID of the recipe, as returned by `recipes()`.
+            expected_revision (int, optional): The `revision()` the ID was read at.
+
+        Raises:
+            StaleVersionError: If `expected_revision` is given and another change came first.
+        """
+        with self._lock, self.file_lock.exclusive():
+            self._begin_mutation(expected_revision)
+            self._append({"op": "delete", "id": recipe_id})
+            self._notify("on_delete", recipe_id)
+            self._maybe_compact()
+
+    # ------------------------------------------------------------------ compaction
+
+    def _needs_compaction(self):
+        if self._records >= self.max_journal_records:
+            return True
+        journal_size = (self._journal_stat() or (0, 0))[0]
+        base_size = self._base_stat()[0]
+        return journal_size > max(self.MIN_COMPACTION_BYTES, self.max_journal_ratio * base_size)
+
+    def _maybe_compact(self):
+        """
+        Starts a compaction if the journal passed its thresholds and none is running.
+        Inside a `batch()` it waits for the batch to end.
+        """
+        if self._batch_depth or not self._needs_compaction():
+            return
+        if not self.background:
+            self.compact()
+        elif self._compaction_thread is None or not self._compaction_thread.is_alive():
+            self._compaction_thread = threading.Thread(target=self.compact, name="recipe-compaction")
+            self._compaction_thread.start()
+
+    def compact(self):
+        """
+        Folds the journal into the CSV file and starts a fresh journal.
+        Mutations made while compaction runs wait for it to finish.
+        """
+        with self._lock, self.file_lock.exclusive():
+            self._refresh()
+            if self._header is None:
+                return
+            try:
+                live = self._live()
+                rows = [dict(zip(self.FIELDNAMES, row)) for _, row in live]
+                self.file_manager.write_csv(rows, self.FIELDNAMES)
+                self._write_header(len(live), self._base_crc())
+                Logger.log_info(f"Compacted recipe journal into {self.file_path} ({len(live)} recipes).")
+            except Exception as e:
+                Logger.log_error(f"Error compacting recipe journal: {e}")
+                return
+            self._notify("on_compact", {old_id: new_id for new_id, (old_id, _) in enumerate(live)})
+
+    def wait_for_compaction(self):
+        """
+        Blocks until a running background compaction has finished.
+        """
+        thread = self._compaction_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
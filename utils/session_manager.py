@@ -0,0 +1,204 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from utils.folder_manager import ensure_data_folder_exists
+from utils.logger import Logger
+
+
+class SessionManager:
+    """
+    Issues and checks signed, expiring session tokens so that bcrypt only runs at login.
+
+    A token has the form "<session id>.<expiry>.<signature>", where the signature is an
+    HMAC-SHA256 over the session id, expiry and email, keyed with a secret stored in the
+    data folder. Checking a token costs one HMAC and a constant-time comparison. Sessions
+    are kept in a small JSON store so they can be revoked and resumed across process runs.
+    Expired sessions are evicted whenever the store is written. A SessionManager can be
+    shared by threads (e.g. the request handlers of the API server).
+
+    Attributes:
+        ttl_seconds (int): How long a new session stays valid.
+        store_path (str): Path to the JSON session store.
+        key_path (str): Path to the file holding the HMAC secret.
+        current_path (str): Path to the file holding this machine's active CLI session token.
+    """
+
+    DEFAULT_TTL_SECONDS = 12 * 60 * 60
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        """
+        Initializes the SessionManager, creating the HMAC secret on first use.
+
+        Args:
+            ttl_seconds (int): How long a new session stays valid. Defaults to 12 hours.
+        """
+        data_folder = ensure_data_folder_exists()
+        self.ttl_seconds = ttl_seconds
+        self.store_path = os.path.join(data_folder, "sessions.json")
+        self.key_path = os.path.join(data_folder, "session.key")
+        self.current_path = os.path.join(data_folder, "current_session")
+        self._key = self._load_or_create_key()
+        self._sessions = {}
+        self._signature = None
+        self._lock = threading.RLock()
+
+    def _load_or_create_key(self):
+        """
+        Loads the HMAC secret, generating a random one readable only by the owner if missing.
+
+        Returns:
+            bytes: The secret key.
+        """
+        if os.path.exists(self.key_path):
+            with open(self.key_path, mode="rb") as file:
+                return file.read()
+        key = secrets.token_bytes(32)
+        descriptor = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, mode="wb") as file:
+            file.write(key)
+        Logger.log_info("Generated a new session signing key.")
+        return key
+
+    def _sign(self, session_id, expires, email):
+        """
+        Computes the token signature.
+
+        Returns:
+            str: The hex HMAC-SHA256 of the session fields.
+        """
+        message = f"{session_id}.{expires}.{email}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()
+
+    def _refresh(self):
+        """
+        Reloads the session store if another process changed it.
+        """
+        try:
+            stat = os.stat(self.store_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return
+
+        sessions = {}
+        if signature is not None:
+            try:
+                with open(self.store_path, mode="r", encoding="utf-8") as file:
+                    sessions = json.load(file)
+            except (OSError, ValueError) as e:
+                Logger.log_error(f"Error reading session store: {e}")
+        self._sessions = sessions
+        self._signature = signature
+
+    def _save(self):
+        """
+        Evicts expired sessions and writes the store through a temporary file.
+        """
+        now = time.time()
+        self._sessions = {
+            session_id: session for session_id, session in self._sessions.items() if session["expires"] > now
+        }
+        temp_path = f"{self.store_path}.tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as file:
+            json.dump(self._sessions, file)
+        os.replace(temp_path, self.store_path)
+        stat = os.stat(self.store_path)
+        self._signature = (stat.st_mtime_ns, stat.st_size)
+
+    def issue(self, email):
+        """
+        Starts a new session for a user who has just logged in.
+
+        Args:
+            email (str): The email of the authenticated user.
+
+        Returns:
+            str: The signed session token.
+        """
+        session_id = secrets.token_urlsafe(16)
+        expires = int(time.time()) + self.ttl_seconds
+        with self._lock:
+            self._refresh()
+            self._sessions[session_id] = {"email": email, "expires": expires}
+            self._save()
+        return f"{session_id}.{expires}.{self._sign(session_id, expires, email)}"
+
+    def validate(self, token):
+        """
+        Checks a session token without touching bcrypt.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            str | None: The email the session belongs to, or None if the token is
+                        malformed, forged, expired or revoked.
+        """
+        if not token:
+            return None
+        try:
+            session_id, expires, signature = token.split(".")
+            expires = int(expires)
+        except ValueError:
+            return None
+        if expires <= time.time():
+            return None
+
+        with self._lock:
+            self._refresh()
+            session = self._sessions.get(session_id)
+        if session is None or session["expires"] != expires:
+            return None
+        expected = self._sign(session_id, expires, session["email"])
+        if not hmac.compare_digest(expected, signature):
+            return None
+        return session["email"]
+
+    def revoke(self, token):
+        """
+        Ends a session so its token can no longer be used.
+
+        Args:
+            token (str): The session token.
+        """
+        if not token:
+            return
+        with self._lock:
+            self._refresh()
+            if self._sessions.pop(token.split(".")[0], None) is not None:
+                self._save()
+
+    def save_current_token(self, token):
+        """
+        Remembers the CLI's active session so it can be resumed by the next process run.
+
+        Args:
+            token (str): The session token.
+        """
+        descriptor = os.open(self.current_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, mode="w", encoding="utf-8") as file:
+            file.write(token)
+
+    def load_current_token(self):
+        """
+        Returns the CLI's remembered session token.
+
+        Returns:
+            str | None: The token, or None if no session is remembered.
+        """
+        if not os.path.exists(self.current_path):
+            return None
+        with open(self.current_path, mode="r", encoding="utf-8") as file:
+            return file.read().strip() or None
+
+    def clear_current_token(self):
+        """
+        Forgets the CLI's remembered session.
+        """
+        if os.path.exists(self.current_path):
+            os.remove(self.current_path)
@@ -0,0 +1,463 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from utils.file_cache import ParsedFileCache
+from utils.storage_backend import StorageBackend
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "lock", "users")
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lock = threading.Lock()  # Serializes the connection's use across threads
+        self.users = 0  # Threads that have checked the connection out
+
+
+class SqliteBackend(StorageBackend):
+    """
+    The SQLite storage engine: the tables of a folder live in one `storage.db` database
+    in that folder, so per-user partitions each get their own small database.
+
+    A table addressed as `data/recipes.csv` is stored as the table "recipes" of
+    `data/storage.db`, with a `position` primary key (the row number) and one text column
+    per field. A `_tables` catalog records every table's field names, row count, byte
+    count and a version stamp (a nanosecond clock, bumped on every write), which serve as
+    the cheap `signature` callers use to detect changes, like a CSV file's mtime and size.
+
+    Email and recipe-name fields are indexed, and the ingredients of a multi-valued field
+    are split into a side table with an index on each normalized ingredient, so
+    `find_rows` is an index lookup rather than a scan. Writes are single transactions
+    (`BEGIN IMMEDIATE`); the database runs in WAL mode so readers never wait for a writer,
+    with `synchronous=FULL` for durable writes and `NORMAL` otherwise. All SQL is
+    parameterized and reused, so sqlite3 keeps it prepared in each connection's
+    statement cache.
+
+    Attributes:
+        cache (ParsedFileCache): Whole tables read recently, validated against their signature.
+    """
+
+    name = "sqlite"
+    indexed = True
+    DATABASE_NAME = "storage.db"
+    INDEXED_FIELDS = {"Email", "Recipe Name"}
+    MULTI_VALUED_FIELDS = {"Ingredients"}
+    MAX_CONNECTIONS = 32
+    CACHED_STATEMENTS = 256
+    FETCH_SIZE = 1000
+    SCHEMA_VERSION = 3  # Stored as the database's user_version; bumped whenever `split_values` or the indexes change
+
+    def __init__(self):
+        """
+        Initializes the SqliteBackend. Databases are opened on first use.
+        """
+        self.cache = ParsedFileCache()
+        self._connections = OrderedDict()  # database path -> _PooledConnection, least recently used first
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ connections
+
+    @classmethod
+    def database_path(cls, path):
+        """
+        Returns the database holding a table.
+
+        Args:
+            path (str): The table's CSV path.
+
+        Returns:
+            str: The path of the folder's storage.db.
+        """
+        return os.path.join(os.path.dirname(os.path.abspath(path)), cls.DATABASE_NAME)
+
+    @staticmethod
+    def table_name(path):
+        """
+        Returns the name of the table a CSV path is stored as.
+        """
+        return os.path.splitext(os.path.basename(path))[0]
+
+    @staticmethod
+    def _quote(identifier):
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def _open(self, database):
+        connection = sqlite3.connect(
+            database, timeout=30, isolation_level=None, check_same_thread=False,
+            cached_statements=self.CACHED_STATEMENTS,
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS _tables (name TEXT PRIMARY KEY, fieldnames TEXT NOT NULL, "
+            "version INTEGER NOT NULL, rows INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+        )
+        if connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self._upgrade_schema(connection)
+        return connection
+
+    def _upgrade_schema(self, connection):
+        """
+        Brings a database written with another `SCHEMA_VERSION` up to date: rebuilds the
+        side tables of multi-valued fields, so lookups compare values normalized the
+        current way, and recreates the field indexes with their current collation.
+        """
+        with self._transaction(connection, durable=True):
+            if connection.execute("PRAGMA user_version").fetchone()[0] == self.SCHEMA_VERSION:
+                return  # Another process got here first
+            for name, fieldnames in connection.execute("SELECT name, fieldnames FROM _tables").fetchall():
+                fieldnames = fieldnames.split("\x1f") if fieldnames else []
+                for number, field in enumerate(fieldnames):
+                    if field in self.INDEXED_FIELDS:
+                        connection.execute(f"DROP INDEX IF EXISTS {self._quote(f'{name}__c{number}')}")
+                        self._create_field_index(connection, name, number, field)
+                column = self._multi_valued_column(fieldnames)
+                if column is None:
+                    continue
+                values = self._quote(name + "__values")
+                connection.execute(f"DELETE FROM {values}")
+                rows = connection.execute(f"SELECT position, c{column} FROM {self._quote(name)}").fetchall()
+                connection.executemany(
+                    f"INSERT INTO {values} (position, value) VALUES (?, ?)",
+                    ((position, value) for position, field in rows for value in self.split_values(field or "")),
+                )
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connection(self, path, create=False):
+        """
+        Yields the connection to a table's database, holding its lock. Yields None if the
+        database doesn't exist and `create` is False, so reads never create files.
+
+        Connections are checked out while in use: when more than MAX_CONNECTIONS are
+        open, the least recently used idle ones are closed, never one a thread holds or
+        is about to take the lock of.
+        """
+        database = self.database_path(path)
+        with self._lock:
+            entry = self._connections.pop(database, None)
+            if entry is None and (create or os.path.exists(database)):
+                entry = _PooledConnection(self._open(database))
+            if entry is not None:
+                self._connections[database] = entry
+                entry.users += 1
+            self._evict()
+        if entry is None:
+            yield None
+            return
+        try:
+            with entry.lock:
+                yield entry.connection
+        finally:
+            with self._lock:
+                entry.users -= 1
+                self._evict()
+
+    def _evict(self):
+        """
+        Closes the least recently used idle connections while there are more than
+        MAX_CONNECTIONS. The caller holds `self._lock`.
+        """
+        excess = len(self._connections) - self.MAX_CONNECTIONS
+        if excess <= 0:
+            return
+        for database in [database for database, entry in self._connections.items() if not entry.users][:excess]:
+            self._connections.pop(database).connection.close()
+
+    @contextmanager
+    def _transaction(self, connection, durable):
+        connection.execute("PRAGMA synchronous = FULL" if durable else "PRAGMA synchronous = NORMAL")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self):
+        """
+        Closes every open database connection.
+        """
+        with self._lock:
+            while self._connections:
+                _, entry = self._connections.popitem()
+                with entry.lock:
+                    entry.connection.close()
+
+    # ------------------------------------------------------------------ catalog
+
+    def _table_info(self, connection, path):
+        """
+        Returns (fieldnames, version, rows, bytes) of a table, or None if it doesn't exist.
+        """
+        if connection is None:
+            return None
+        row = connection.execute(
+            "SELECT fieldnames, version, rows, bytes FROM _tables WHERE name = ?", (self.table_name(path),)
+        ).fetchone()
+        if row is None:
+            return None
+        fieldnames = tuple(row[0].split("\x1f")) if row[0] else ()
+        return fieldnames, row[1], row[2], row[3]
+
+    def _record_write(self, connection, path, fieldnames, rows, size):
+        """
+        Updates a table's catalog entry after a write, with a version stamp newer than the last one.
+        """
+        previous = connection.execute(
+            "SELECT version FROM _tables WHERE name = ?", (self.table_name(path),)
+        ).fetchone()
+        version = max(time.time_ns(), previous[0] + 1 if previous else 0)
+        connection.execute(
+            "INSERT OR REPLACE INTO _tables (name, fieldnames, version, rows, bytes) VALUES (?, ?, ?, ?, ?)",
+            (self.table_name(path), "\x1f".join(fieldnames), version, rows, size),
+        )
+
+    @staticmethod
+    def _row_bytes(rows):
+        return sum(len(value) + 1 for row in rows for value in row)
+
+    def _columns(self, fieldnames):
+        return ", ".join(f"c{number}" for number in range(len(fieldnames)))
+
+    def _values_table(self, path):
+        return self._quote(self.table_name(path) + "__values")
+
+    def _multi_valued_column(self, fieldnames):
+        for number, field in enumerate(fieldnames):
+            if field in self.MULTI_VALUED_FIELDS:
+                return number
+        return None
+
+    def _create_table(self, connection, path, fieldnames):
+        table = self._quote(self.table_name(path))
+        columns = "".join(f", c{number} TEXT" for number in range(len(fieldnames)))
+        connection.execute(f"DROP TABLE IF EXISTS {table}")
+        connection.execute(f"DROP TABLE IF EXISTS {self._values_table(path)}")
+        connection.execute(f"CREATE TABLE {table} (position INTEGER PRIMARY KEY{columns})")
+        if self._multi_valued_column(fieldnames) is not None:
+            connection.execute(f"CREATE TABLE {self._values_table(path)} (position INTEGER NOT NULL, value TEXT NOT NULL)")
+
+    def _create_indexes(self, connection, path, fieldnames):
+        """
+        Indexes a table's lookup fields. Bulk loads call this after inserting the rows,
+        which is much faster than maintaining the indexes row by row.
+        """
+        for number, field in enumerate(fieldnames):
+            if field in self.INDEXED_FIELDS:
+                self._create_field_index(connection, self.table_name(path), number, field)
+        if self._multi_valued_column(fieldnames) is not None:
+            index = self._quote(self.table_name(path) + "__values_value")
+            connection.execute(f"CREATE INDEX {index} ON {self._values_table(path)} (value, position)")
+
+    def _create_field_index(self, connection, name, number, field):
+        """
+        Indexes column `number` of table `name`, with the collation its lookups use.
+        """
+        index = self._quote(f"{name}__c{number}")
+        connection.execute(f"CREATE INDEX {index} ON {self._quote(name)} (c{number}{self._collation(field)})")
+
+    def _collation(self, field):
+        """
+        Returns the COLLATE clause for comparisons on a field: case-insensitive fields use
+        NOCASE, which their index is built with too, so the lookup can use the index.
+        """
+        return " COLLATE NOCASE" if field in self.CASE_INSENSITIVE_FIELDS else ""
+
+    def _insert(self, connection, path, fieldnames, rows, first_position):
+        table = self._quote(self.table_name(path))
+        width = len(fieldnames)
+        placeholders = ", ".join("?" * (width + 1))
+        connection.executemany(
+            f"INSERT INTO {table} (position{''.join(f', c{n}' for n in range(width))}) VALUES ({placeholders})",
+            ((position, *self._fit(row, width)) for position, row in enumerate(rows, start=first_position)),
+        )
+        column = self._multi_valued_column(fieldnames)
+        if column is not None:
+            connection.executemany(
+                f"INSERT INTO {self._values_table(path)} (position, value) VALUES (?, ?)",
+                (
+                    (position, value)
+                    for position, row in enumerate(rows, start=first_position)
+                    for value in self.split_values(self._fit(row, width)[column])
+                ),
+            )
+
+    @staticmethod
+    def _fit(row, width):
+        """
+        Pads or truncates a row to the table's width, like a CSV reader sees a ragged row.
+        """
+        if len(row) == width:
+            return row
+        return tuple(row[:width]) + ("",) * (width - len(row))
+
+    # ------------------------------------------------------------------ StorageBackend
+
+    def exists(self, path):
+        with self._connection(path) as connection:
+            return self._table_info(connection, path) is not None
+
+    def signature(self, path):
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+        return None if info is None else (info[1], info[3])
+
+    def checksum(self, path):
+        crc = 0
+        header, rows = self.read_rows(path)
+        for row in (header, *rows):
+            crc = zlib.crc32(("\x1f".join(row) + "\x1e").encode("utf-8"), crc)
+        return crc
+
+    def cached_rows(self, path):
+        signature = self.signature(path)
+        if signature is None:
+            return None
+        return self.cache.get(path, signature)
+
+    def fieldnames(self, path):
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+        return () if info is None else info[0]
+
+    def read_rows(self, path, snapshot=None):
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+            if info is None or not info[0]:
+                return (), ()
+            fieldnames, version, _, size = info
+            cached = self.cache.get(path, (version, size))
+            if cached is not None:
+                return cached
+            rows = tuple(connection.execute(
+                f"SELECT {self._columns(fieldnames)} FROM {self._quote(self.table_name(path))} ORDER BY position"
+            ))
+        self.cache.put(path, (version, size), fieldnames, rows)
+        return fieldnames, rows
+
+    def iter_records(self, path):
+        start = 0
+        while True:
+            header = self.fieldnames(path)
+            rows = self.read_range(path, start, start + self.FETCH_SIZE)
+            for row in rows:
+                yield dict(zip(header, row))
+            if len(rows) < self.FETCH_SIZE:
+                return
+            start += len(rows)
+
+    def count(self, path):
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+        return 0 if info is None else info[2]
+
+    def read_range(self, path, start, stop):
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+            if info is None or not info[0]:
+                return []
+            return connection.execute(
+                f"SELECT {self._columns(info[0])} FROM {self._quote(self.table_name(path))} "
+                f"WHERE position >= ? AND position < ? ORDER BY position",
+                (start, stop),
+            ).fetchall()
+
+    def find_rows(self, path, field, value):
+        with self._connection(path) as connection:
+            info = self._table_info(connection, path)
+            if info is None or field not in info[0]:
+                return []
+            fieldnames = info[0]
+            table = self._quote(self.table_name(path))
+            columns = self._columns(fieldnames)
+            if field in self.MULTI_VALUED_FIELDS:
+                cursor = connection.execute(
+                    f"SELECT position, {columns} FROM {table} WHERE position IN "
+                    f"(SELECT position FROM {self._values_table(path)} WHERE value = ?) ORDER BY position",
+                    (self.normalize_value(value),),
+                )
+            else:
+                cursor = connection.execute(
+                    f"SELECT position, {columns} FROM {table} WHERE c{fieldnames.index(field)} = ?"
+                    f"{self._collation(field)} ORDER BY position",
+                    (value,),
+                )
+            return [(row[0], row[1:]) for row in cursor]
+
+    def update_row(self, path, field, value, changes, durable=True):
+        with self._connection(path, create=True) as connection, self._transaction(connection, durable):
+            info = self._table_info(connection, path)
+            if info is None or field not in info[0]:
+                return False
+            fieldnames, _, rows, size = info
+            table = self._quote(self.table_name(path))
+            columns = self._columns(fieldnames)
+            found = connection.execute(
+                f"SELECT position, {columns} FROM {table} WHERE c{fieldnames.index(field)} = ?"
+                f"{self._collation(field)} ORDER BY position LIMIT 1",
+                (value,),
+            ).fetchone()
+            if found is None:
+                return False
+            position, old_row = found[0], found[1:]
+            new_row = list(old_row)
+            for name, new_value in changes.items():
+                new_row[fieldnames.index(name)] = new_value
+            assignments = ", ".join(f"c{fieldnames.index(name)} = ?" for name in changes)
+            connection.execute(
+                f"UPDATE {table} SET {assignments} WHERE position = ?", (*changes.values(), position)
+            )
+            column = self._multi_valued_column(fieldnames)
+            if column is not None and fieldnames[column] in changes:
+                connection.execute(f"DELETE FROM {self._values_table(path)} WHERE position = ?", (position,))
+                connection.executemany(
+                    f"INSERT INTO {self._values_table(path)} (position, value) VALUES (?, ?)",
+                    ((position, part) for part in self.split_values(new_row[column])),
+                )
+            size += self._row_bytes([new_row]) - self._row_bytes([old_row])
+            self._record_write(connection, path, fieldnames, rows, size)
+        return True
+
+    def write_rows(self, path, fieldnames, rows, durable=True, snapshot=None):
+        fieldnames, rows = tuple(fieldnames), tuple(rows)
+        with self._connection(path, create=True) as connection:
+            with self._transaction(connection, durable):
+                self._create_table(connection, path, fieldnames)
+                self._insert(connection, path, fieldnames, rows, 0)
+                self._create_indexes(connection, path, fieldnames)
+                self._record_write(connection, path, fieldnames, len(rows), self._row_bytes(rows))
+            info = self._table_info(connection, path)
+        # We know exactly what the table now holds, so refresh the cache instead of dropping it
+        self.cache.put(path, (info[1], info[3]), fieldnames, rows)
+
+    def append_rows(self, path, fieldnames, rows):
+        rows = tuple(rows)
+        with self._connection(path, create=True) as connection, self._transaction(connection, True):
+            info = self._table_info(connection, path)
+            if info is None or not info[0]:
+                fieldnames = tuple(fieldnames)
+                self._create_table(connection, path, fieldnames)
+                self._create_indexes(connection, path, fieldnames)
+                count, size = 0, 0
+            else:
+                fieldnames, _, count, size = info
+            self._insert(connection, path, fieldnames, rows, count)
+            self._record_write(connection, path, fieldnames, count + len(rows), size + self._row_bytes(rows))
+
+    def paths(self, folder):
+        found = []
+        for directory, _, files in os.walk(folder):
+            if self.DATABASE_NAME not in files:
+                continue
+            with self._connection(os.path.join(directory, self.DATABASE_NAME)) as connection:
+                names = [row[0] for row in connection.execute("SELECT name FROM _tables")]
+            found.extend(os.path.join(directory, name + ".csv") for name in names)
+        return sorted(found)
@@ -0,0 +1,416 @@
+import csv
+import os
+import stat
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from utils.csv_offset_index import CsvOffsetIndex
+from utils.file_cache import ParsedFileCache
+from utils.ingredient_parser import normalize_ingredient, parse_ingredients
+
+
+class StorageBackend(ABC):
+    """
+    The interface every storage engine implements. FileManager talks to the data only
+    through it, so models and controllers work the same on any backend.
+
+    Data is organized as tables addressed by the path of their CSV file (e.g.
+    `data/recipes.csv`), each with a header of field names and rows of strings numbered
+    from 0 in insertion order. Backends don't lock across processes themselves;
+    FileManager holds the file's FileLock around every call.
+
+    Attributes:
+        name (str): The backend's name in the configuration ("csv" or "sqlite").
+        indexed (bool): Whether `find_rows` uses an index rather than a scan.
+
+    Emails are looked up without regard to case, so rows stored before emails were
+    normalized are still found by the normalized address.
+    """
+
+    name = None
+    indexed = False
+    CASE_INSENSITIVE_FIELDS = {"Email"}
+
+    @abstractmethod
+    def exists(self, path):
+        """
+        Returns whether the table exists.
+        """
+
+    @abstractmethod
+    def signature(self, path):
+        """
+        Returns a cheap fingerprint of the table that changes with every write.
+
+        Returns:
+            tuple | None: The fingerprint, or None if the table doesn't exist.
+        """
+
+    @abstractmethod
+    def checksum(self, path):
+        """
+        Returns a checksum of the table's contents, for when the signature alone can't tell
+        whether the contents changed (e.g. a CSV file that was copied or touched).
+
+        Returns:
+            int: The checksum (0 if the table doesn't exist).
+        """
+
+    def cached_rows(self, path):
+        """
+        Returns the table's header and rows if the backend has them in memory and they are
+        current, without touching the storage. Defaults to None (not cached).
+
+        Returns:
+            tuple | None: (header, rows), or None.
+        """
+        return None
+
+    @abstractmethod
+    def read_rows(self, path, snapshot=None):
+        """
+        Reads the whole table.
+
+        Args:
+            path (str): The table's CSV path.
+            snapshot (CsvSnapshot, optional): A snapshot the backend may use instead of
+                                              parsing text. Ignored by backends that don't parse.
+
+        Returns:
+            tuple[tuple, tuple[tuple]]: The header and the rows; both empty if there is no table.
+        """
+
+    @abstractmethod
+    def fieldnames(self, path):
+        """
+        Returns the table's header without reading its rows.
+
+        Returns:
+            tuple: The field names; empty if there is no table.
+        """
+
+    @abstractmethod
+    def iter_records(self, path):
+        """
+        Lazily yields the rows as dictionaries keyed by field name, without holding the
+        table in memory.
+        """
+
+    @abstractmethod
+    def count(self, path):
+        """
+        Returns the number of rows without reading them.
+        """
+
+    @abstractmethod
+    def read_range(self, path, start, stop):
+        """
+        Reads the rows numbered `start` to `stop - 1`.
+
+        Returns:
+            list[tuple]: The rows.
+        """
+
+    @abstractmethod
+    def find_rows(self, path, field, value):
+        """
+        Returns the rows whose `field` equals `value`. For a multi-valued field such as a
+        recipe's comma-separated Ingredients, a row matches if any of its values does
+        (compared normalized, see `normalize_ingredient`); a field in
+        `CASE_INSENSITIVE_FIELDS` such as Email matches regardless of case.
+
+        Returns:
+            list[tuple[int, tuple]]: (row number, row) pairs of the matching rows, in row order.
+        """
+
+    @abstractmethod
+    def update_row(self, path, field, value, changes, durable=True):
+        """
+        Changes some fields of the first row whose `field` equals `value`, regardless of
+        case for a field in `CASE_INSENSITIVE_FIELDS`.
+
+        Args:
+            path (str): The table's CSV path.
+            field (str): The field to look the row up by.
+            value (str): The value to look for.
+            changes (dict): New values by field name.
+            durable (bool): Whether the write must survive a power loss once it returns.
+
+        Returns:
+            bool: True if a row was updated, False if none matched.
+        """
+
+    @abstractmethod
+    def write_rows(self, path, fieldnames, rows, durable=True, snapshot=None):
+        """
+        Replaces the table's contents atomically: readers and crashes see either the old or
+        the new contents.
+
+        Args:
+            path (str): The table's CSV path.
+            fieldnames (Sequence[str]): The header.
+            rows (Sequence[tuple]): The rows, each a tuple of strings in header order.
+            durable (bool): Whether the write must survive a power loss once it returns.
+            snapshot (CsvSnapshot, optional): A snapshot to refresh, on backends that use them.
+        """
+
+    @abstractmethod
+    def append_rows(self, path, fieldnames, rows):
+        """
+        Appends rows, creating the table with `fieldnames` if it doesn't exist or is empty.
+        """
+
+    @abstractmethod
+    def paths(self, folder):
+        """
+        Lists the tables stored under a folder, recursively.
+
+        Returns:
+            list[str]: The tables' CSV paths.
+        """
+
+    @staticmethod
+    def split_values(value):
+        """
+        Splits a multi-valued field into its distinct normalized values.
+        """
+        return sorted(parse_ingredients(value))
+
+    @staticmethod
+    def normalize_value(value):
+        """
+        Normalizes a value looked up in a multi-valued field.
+        """
+        return normalize_ingredient(value)
+
+
+class CsvBackend(StorageBackend):
+    """
+    The CSV storage engine: every table is a CSV file.
+
+    Parsed files are kept in a process-wide cache validated against the file's
+    (mtime_ns, size) (see `ParsedFileCache`), can be loaded from a binary snapshot
+    instead of being parsed (see `CsvSnapshot`), and rows are read by position through a
+    row-offset index (see `CsvOffsetIndex`). Rewrites go through a temporary file and
+    `os.replace`, fsynced in durable mode.
+
+    Attributes:
+        cache (ParsedFileCache): The process-wide parsed-file cache.
+    """
+
+    name = "csv"
+    MULTI_VALUED_FIELDS = {"Ingredients"}
+    MAX_OFFSET_INDEXES = 64
+
+    cache = ParsedFileCache()
+
+    def __init__(self):
+        """
+        Initializes the CsvBackend.
+        """
+        self._offset_indexes = OrderedDict()  # abspath -> CsvOffsetIndex, least recently used first
+        self._lock = threading.Lock()
+
+    def _offset_index(self, path):
+        key = os.path.abspath(path)
+        with self._lock:
+            index = self._offset_indexes.pop(key, None) or CsvOffsetIndex(path)
+            self._offset_indexes[key] = index
+            while len(self._offset_indexes) > self.MAX_OFFSET_INDEXES:
+                self._offset_indexes.popitem(last=False)
+            return index
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def signature(self, path):
+        return self.cache.signature(path)
+
+    def checksum(self, path):
+        crc = 0
+        if os.path.exists(path):
+            with open(path, mode="rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    crc = zlib.crc32(chunk, crc)
+        return crc
+
+    def cached_rows(self, path):
+        return self.cache.get(path)
+
+    def read_rows(self, path, snapshot=None):
+        signature = self.cache.signature(path)
+        if signature is None or signature[1] == 0:
+            return (), ()
+        if snapshot is not None:
+            loaded = snapshot.load(signature)
+            if loaded is not None:
+                self.cache.put(path, signature, *loaded)
+                return loaded
+        with open(path, mode="r", newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = tuple(next(reader, ()))
+            rows = tuple(tuple(row) for row in reader if row)
+        self.cache.put(path, signature, header, rows)
+        if snapshot is not None:
+            snapshot.save(signature, header, rows)
+        return header, rows
+
+    def fieldnames(self, path):
+        cached = self.cached_rows(path)
+        if cached is not None:
+            return cached[0]
+        if not os.path.exists(path):
+            return ()
+        with open(path, mode="r", newline="", encoding="utf-8") as file:
+            return tuple(next(csv.reader(file), ()))
+
+    def iter_records(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, mode="r", newline="", encoding="utf-8") as file:
+            yield from csv.DictReader(file)
+
+    def count(self, path):
+        return len(self._offset_index(path))
+
+    def read_range(self, path, start, stop):
+        return self._offset_index(path).read(start, stop)
+
+    def find_rows(self, path, field, value):
+        header, rows = self.cached_rows(path) or self.read_rows(path)
+        if field not in header:
+            return []
+        column = header.index(field)
+        if field in self.MULTI_VALUED_FIELDS:
+            wanted = self.normalize_value(value)
+            matches = (len(row) > column and wanted in self.split_values(row[column]) for row in rows)
+        elif field in self.CASE_INSENSITIVE_FIELDS:
+            wanted = value.lower()
+            matches = (len(row) > column and row[column].lower() == wanted for row in rows)
+        else:
+            matches = (len(row) > column and row[column] == value for row in rows)
+        return [(number, row) for number, (row, match) in enumerate(zip(rows, matches)) if match]
+
+    def update_row(self, path, field, value, changes, durable=True):
+        header, rows = self.cached_rows(path) or self.read_rows(path)
+        if field not in header:
+            return False
+        column = header.index(field)
+        fold = str.lower if field in self.CASE_INSENSITIVE_FIELDS else str
+        for number, row in enumerate(rows):
+            if len(row) > column and fold(row[column]) == fold(value):
+                updated = list(row) + [""] * (len(header) - len(row))
+                for name, new_value in changes.items():
+                    updated[header.index(name)] = new_value
+                rows = rows[:number] + (tuple(updated),) + rows[number + 1:]
+                self.write_rows(path, header, rows, durable=durable)
+                return True
+        return False
+
+    def write_rows(self, path, fieldnames, rows, durable=True, snapshot=None):
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, mode="w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(fieldnames)
+                writer.writerows(rows)
+                if durable:
+                    file.flush()
+                    os.fsync(file.fileno())
+            if os.path.exists(path):
+                # mkstemp creates owner-only files; keep the original permissions
+                os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.cache.invalidate(path)
+            raise
+
+        # We know exactly what the file now holds, so refresh the cache instead of dropping it
+        header, rows = tuple(fieldnames), tuple(rows)
+        signature = self.cache.signature(path)
+        self.cache.put(path, signature, header, rows)
+        if durable:
+            self._fsync_directory(directory)
+        if snapshot is not None and signature is not None:
+            snapshot.save(signature, header, rows)
+
+    @staticmethod
+    def _fsync_directory(directory):
+        """
+        Flushes a directory entry to disk so a completed rename survives a crash.
+        Silently skipped on platforms that can't open directories (e.g. Windows).
+
+        Args:
+            directory (str): The directory containing the replaced file.
+        """
+        try:
+            descriptor = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+    def append_rows(self, path, fieldnames, rows):
+        file_exists = os.path.exists(path)
+        self.cache.invalidate(path)
+        with open(path, mode="a", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if not file_exists or os.path.getsize(path) == 0:
+                writer.writerow(fieldnames)  # Write headers if the file is new or empty
+            writer.writerows(rows)
+
+    def paths(self, folder):
+        found = []
+        for directory, _, files in os.walk(folder):
+            found.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(".csv"))
+        return sorted(found)
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def create_storage_backend(name):
+    """
+    Creates a storage backend by name.
+
+    Args:
+        name (str): "csv" or "sqlite".
+
+    Returns:
+        StorageBackend: A new backend.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "csv":
+        return CsvBackend()
+    if name == "sqlite":
+        from utils.sqlite_backend import SqliteBackend
+        return SqliteBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+def get_storage_backend():
+    """
+    Returns the process-wide storage backend, chosen by the "storage_backend" setting
+    ("csv" by default, "sqlite" after `python -m utils.storage_migration sqlite`).
+
+    Returns:
+        StorageBackend: The shared backend.
+    """
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            from utils.config_manager import ConfigManager
+            _default_backend = create_storage_backend(ConfigManager().get("storage_backend", "csv"))
+        return _default_backend
@@ -0,0 +1,108 @@
+"""
+Moves the application's data from the configured storage backend to another one.
+
+Every table under the data folder (users, recipes, and the meal plans and grocery lists
+of every user partition) is bulk-loaded into the target backend under its file lock,
+read back and compared, and only then is the "storage_backend" setting switched. The
+source data is left in place as a backup. Stop the application before migrating.
+
+Usage (from the repository root):
+    python -m utils.storage_migration sqlite
+    python -m utils.storage_migration csv
+"""
+import argparse
+import glob
+import os
+import sys
+from utils.config_manager import ConfigManager
+from utils.file_lock import FileLock
+from utils.folder_manager import ensure_data_folder_exists
+from utils.logger import Logger
+from utils.recipe_store import RecipeStore
+from utils.storage_backend import create_storage_backend, get_storage_backend
+
+
+def migrate(folder, target_name):
+    """
+    Copies every table under a folder from the configured backend to another one and
+    switches the configuration to it.
+
+    The recipe journal is compacted first, since journals record the signature of the
+    table they apply to and would be discarded as stale on the new backend. Meal plan
+    write-behind journals are left for the application to recover; the migration
+    refuses to run while one exists.
+
+    Args:
+        folder (str): The data folder.
+        target_name (str): The backend to move to ("csv" or "sqlite").
+
+    Returns:
+        tuple[int, int]: The number of tables and rows copied.
+
+    Raises:
+        ValueError: If the target backend is unknown.
+        RuntimeError: If a journal is pending or a table doesn't read back identically.
+    """
+    source = get_storage_backend()
+    target = create_storage_backend(target_name)
+    if source.name == target.name:
+        return 0, 0
+
+    pending = [
+        path for path in glob.glob(os.path.join(folder, "**", "*.journal"), recursive=True)
+        if os.path.basename(path) != "recipes.journal"
+    ]
+    if pending:
+        raise RuntimeError(f"Unsaved meal plan journal(s) found ({', '.join(pending)}); run the application once first.")
+
+    recipes_path = os.path.join(folder, "recipes.csv")
+    if source.exists(recipes_path):
+        store = RecipeStore(recipes_path, background=False)
+        store.compact()
+        with store.file_lock.exclusive():
+            if os.path.exists(store.journal_path):
+                os.remove(store.journal_path)  # Compacted, so it holds nothing but its header
+
+    tables = rows_copied = 0
+    for path in source.paths(folder):
+        lock = FileLock.for_path(path)
+        with lock.exclusive():
+            header, rows = source.read_rows(path)
+            if not header:
+                continue
+            # Pad or truncate ragged CSV rows to the header, as a CSV reader sees them
+            width = len(header)
+            rows = tuple(tuple(row[:width]) + ("",) * (width - len(row)) for row in rows)
+            target.write_rows(path, header, rows)
+            if target.read_rows(path) != (tuple(header), rows):
+                raise RuntimeError(f"{path} did not read back identically from the {target.name} backend.")
+            lock.bump_version()
+        tables += 1
+        rows_copied += len(rows)
+
+    ConfigManager().set("storage_backend", target.name)
+    Logger.log_info(f"Migrated {tables} tables ({rows_copied} rows) from the {source.name} to the {target.name} backend.")
+    return tables, rows_copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backend", choices=["csv", "sqlite"], help="the backend to move the data to")
+    args = parser.parse_args()
+
+    source_name = get_storage_backend().name
+    try:
+        tables, rows = migrate(ensure_data_folder_exists(), args.backend)
+    except Exception as e:
+        Logger.log_error(f"Storage migration failed: {e}")
+        print(f"Migration failed: {e}")
+        return 1
+    if source_name == args.backend:
+        print(f"The data is already stored in the {args.backend} backend.")
+    else:
+        print(f"Migrated {tables} tables ({rows} rows) from {source_name} to {args.backend}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
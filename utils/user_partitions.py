@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+from utils.file_manager import FileManager
+from utils.logger import Logger
+from utils.user_repository import normalize_email
+
+
+class UserPartitions:
+    """
+    Maps each user to a private data folder, so per-user files (meal plan, grocery list)
+    are never shared between users.
+
+    A user's folder is found by hashing the email address, normalized the same way as
+    accounts are (see `normalize_email`):
+    `<root>/<first two hex digits>/<first 32 hex digits>/`. Finding it is a hash and a
+    path join, so it costs the same whether there are 10 users or 1M, and no directory
+    ever holds more than about 1/256 of the users. Each bucket also keeps a small
+    `index.csv` (Email, Folder) recording whose folders it holds; it is only appended to
+    when a user's folder is created, and is only read to list users.
+
+    Attributes:
+        root (str): The folder holding all partitions.
+    """
+
+    BUCKET_DIGITS = 2
+    KEY_DIGITS = 32
+    INDEX_FIELDNAMES = ["Email", "Folder"]
+
+    def __init__(self, root):
+        """
+        Initializes the UserPartitions.
+
+        Args:
+            root (str): The folder holding all partitions. Created on first use.
+        """
+        self.root = root
+        self._lock = threading.Lock()
+
+    def key(self, email):
+        """
+        Returns the partition key of a user.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            str: A hex digest of the normalized email address.
+        """
+        digest = hashlib.sha256(normalize_email(email).encode("utf-8")).hexdigest()
+        return digest[:self.KEY_DIGITS]
+
+    def path(self, email):
+        """
+        Returns the path of a user's folder, whether or not it exists.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            str: The folder path.
+        """
+        key = self.key(email)
+        return os.path.join(self.root, key[:self.BUCKET_DIGITS], key)
+
+    def folder(self, email):
+        """
+        Returns a user's folder, creating it and recording it in its bucket's index if needed.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            str: The folder path.
+
+        Raises:
+            OSError: If the folder cannot be created.
+        """
+        path = self.path(email)
+        if os.path.isdir(path):
+            return path
+        with self._lock:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+                FileManager(os.path.join(os.path.dirname(path), "index.csv")).append_csv(
+                    [{"Email": normalize_email(email), "Folder": os.path.basename(path)}],
+                    self.INDEX_FIELDNAMES,
+                )
+                Logger.log_info(f"Created data partition for {normalize_email(email)}.")
+        return path
+
+    def users(self):
+        """
+        Lists every user that has a folder, by reading the bucket indexes.
+
+        Yields:
+            tuple[str, str]: (email, folder path) pairs.
+        """
+        if not os.path.isdir(self.root):
+            return
+        for bucket in sorted(os.listdir(self.root)):
+            index = FileManager(os.path.join(self.root, bucket, "index.csv"))
+            if not index.exists():
+                continue
+            for row in index.read_csv():
+                yield row["Email"], os.path.join(self.root, bucket, row["Folder"])
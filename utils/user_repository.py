@@ -0,0 +1,164 @@
+from utils.file_manager import FileManager
+
+
+def normalize_email(email):
+    """
+    Returns the form of an email address that accounts are registered, looked up and
+    partitioned under, so that "Bob@x.com" and "bob@x.com" are the same user.
+
+    Args:
+        email (str): The email address.
+
+    Returns:
+        str: The stripped, lower-cased address.
+    """
+    return email.strip().lower()
+
+
+class UserRepository:
+    """
+    An indexed view over the users CSV file.
+
+    On a backend with indexes (SQLite), lookups go straight to the email index. On the
+    CSV backend the repository keeps an in-memory dictionary from email to user record so
+    that duplicate-email checks and credential lookups are O(1) instead of a full scan
+    of the file. The index is loaded lazily, reloaded whenever the file's signature
+    changes (e.g. another process registered a user), and updated in place when users
+    are registered through the repository. Writes hold the file's cross-process lock
+    exclusively (see `FileLock`), so two processes registering users or changing
+    passwords at once don't lose each other's rows.
+
+    Emails are compared in their normalized form (see `normalize_email`), and new users
+    are stored under it. Rows stored with another case before normalization are still
+    found: the index is keyed on the normalized email, and the backends match the Email
+    field regardless of case.
+
+    Attributes:
+        file_path (str): Path to the CSV file storing user credentials.
+    """
+
+    EMAIL_FIELD = "Email"
+    PASSWORD_FIELD = "Password"
+
+    def __init__(self, file_path):
+        """
+        Initializes the UserRepository for the given users CSV file.
+
+        Args:
+            file_path (str): Path to the CSV file storing user credentials.
+        """
+        self.file_path = file_path
+        self.file_manager = FileManager(file_path)
+        self.lock = self.file_manager.lock
+        self._users = {}
+        self._signature = None
+
+    def _refresh(self):
+        """
+        Reloads the email index if the users file changed since it was last loaded.
+        """
+        signature = self.file_manager.signature()
+        if signature == self._signature:
+            return
+
+        users = {}
+        header, rows = self.file_manager.read_rows()
+        for row in rows:
+            user = dict(zip(header, row))
+            # Keep the first record for an email, matching the original scan order
+            users.setdefault(normalize_email(user[self.EMAIL_FIELD]), user)
+        self._users = users
+        self._signature = signature
+
+    def get_user(self, email):
+        """
+        Looks up a user record by email.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            dict | None: The user's row from the CSV file, or None if no such user exists.
+        """
+        if self.file_manager.backend.indexed:
+            matches = self.file_manager.find_rows(self.EMAIL_FIELD, normalize_email(email))
+            return dict(zip(self.file_manager.fieldnames(), matches[0][1])) if matches else None
+        self._refresh()
+        return self._users.get(normalize_email(email))
+
+    def exists(self, email):
+        """
+        Checks whether a user with the given email is registered.
+
+        Args:
+            email (str): The email address to check.
+
+        Returns:
+            bool: True if the email is already registered, False otherwise.
+        """
+        return self.get_user(email) is not None
+
+    def add_user(self, email, hashed_password):
+        """
+        Appends a new user, under the normalized email, to the CSV file and adds it to the
+        index, unless the email is already registered. The check and the append happen under one exclusive lock, so
+        two threads or processes registering the same email can't both succeed.
+
+        Args:
+            email (str): The user's email address.
+            hashed_password (str): The user's bcrypt password hash.
+
+        Returns:
+            bool: True if the user was added, False if the email is already registered.
+
+        Raises:
+            OSError: If the user could not be written. Nothing is added to the index.
+        """
+        email = normalize_email(email)
+        fieldnames = [self.EMAIL_FIELD, self.PASSWORD_FIELD]
+        with self.lock.exclusive():
+            if self.exists(email):
+                return False
+            self.file_manager.append_rows([dict(zip(fieldnames, (email, hashed_password)))], fieldnames)
+            if not self.file_manager.backend.indexed:
+                # Nobody else can write while we hold the lock, so our own append doesn't
+                # need a full reload on the next lookup
+                self._signature = self.file_manager.signature()
+                self._users.setdefault(email, {self.EMAIL_FIELD: email, self.PASSWORD_FIELD: hashed_password})
+            return True
+
+    def update_password(self, email, hashed_password):
+        """
+        Replaces a user's password hash: updated in place on the SQLite backend, by
+        rewriting the CSV file atomically on the CSV backend.
+
+        Args:
+            email (str): The user's email address.
+            hashed_password (str): The new bcrypt password hash.
+
+        Returns:
+            bool: True if the user was found and updated, False otherwise.
+        """
+        indexed = self.file_manager.backend.indexed
+        with self.lock.exclusive():
+            user = self.get_user(email)
+            if user is None:
+                return False
+            # Match the row by the email as stored, which predates normalization for old users
+            stored_email = user[self.EMAIL_FIELD]
+            if not self.file_manager.update_row(self.EMAIL_FIELD, stored_email, {self.PASSWORD_FIELD: hashed_password}):
+                return False
+            if not indexed:
+                user[self.PASSWORD_FIELD] = hashed_password
+                self._signature = self.file_manager.signature()
+        return True
+
+    def __len__(self):
+        """
+        Returns the number of distinct registered users.
+
+        Returns:
+            int: The number of users in the index.
+        """
+        self._refresh()
+        return len(self._users)
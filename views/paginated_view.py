@@ -0,0 +1,123 @@
+import sys
+
+
+class PaginatedView:
+    """
+    A class responsible for showing long listings one page at a time.
+
+    Rows are fetched lazily through two callables, one returning the total number of
+    rows and one returning a single page, so only the rows of the current page are ever
+    read. Each page is rendered into one string and written with a single buffered write
+    instead of one `print` per row. When everything fits on one page the listing is
+    shown without any navigation prompt.
+
+    Methods:
+        page_count(): Returns the number of pages.
+        render_page(page): Returns the text of one page.
+        show(select_prompt=None): Shows the listing and lets the user move between pages.
+    """
+
+    def __init__(self, count_rows, fetch_rows, format_row, page_size=20, output=None):
+        """
+        Initializes the PaginatedView.
+
+        Args:
+            count_rows (callable): Returns the total number of rows.
+            fetch_rows (callable): Takes (start, count) and returns that slice of the rows.
+            format_row (callable): Takes (number, row), with 1-based numbering over the whole
+                                   listing, and returns the line to show.
+            page_size (int): The number of rows per page. Defaults to 20.
+            output (file, optional): Where pages are written. Defaults to sys.stdout.
+        """
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.format_row = format_row
+        self.page_size = page_size
+        self.output = output
+
+    def page_count(self, total=None):
+        """
+        Returns the number of pages.
+
+        Args:
+            total (int, optional): The total number of rows, if already known.
+
+        Returns:
+            int: The number of pages (0 if there are no rows).
+        """
+        total = self.count_rows() if total is None else total
+        return -(-total // self.page_size)
+
+    def render_page(self, page, total=None):
+        """
+        Returns the text of one page.
+
+        Args:
+            page (int): The 0-based page number.
+            total (int, optional): The total number of rows, if already known.
+
+        Returns:
+            str: The formatted rows, followed by a "Page x of y" footer if there is more than one page.
+        """
+        total = self.count_rows() if total is None else total
+        start = page * self.page_size
+        lines = [
+            self.format_row(number, row)
+            for number, row in enumerate(self.fetch_rows(start, self.page_size), start=start + 1)
+        ]
+        pages = self.page_count(total)
+        if pages > 1:
+            lines.append(f"-- Page {page + 1} of {pages} ({total} items) --")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _write(self, text):
+        output = self.output or sys.stdout
+        output.write(text)
+        output.flush()
+
+    def show(self, select_prompt=None):
+        """
+        Shows the listing. With more than one page, the user moves between pages with
+        n or Enter (next), p (previous), j (jump to a page) and q (quit).
+
+        Args:
+            select_prompt (str, optional): If given, the user is also asked to choose a row by
+                                           its number with this prompt.
+
+        Returns:
+            int | None: The chosen row number if `select_prompt` is given and a number was
+                        entered, otherwise None.
+
+        Raises:
+            ValueError: If `select_prompt` is given and the answer is neither a number nor
+                        a navigation command.
+        """
+        total = self.count_rows()
+        pages = self.page_count(total)
+        page = 0
+        while True:
+            self._write(self.render_page(page, total))
+            if pages <= 1:
+                return int(input(f"{select_prompt}: ")) if select_prompt else None
+
+            if select_prompt:
+                answer = input(f"{select_prompt} or [n]ext, [p]revious, [j]ump, [q]uit: ").strip().lower()
+            else:
+                answer = input("[n]ext, [p]revious, [j]ump, [q]uit: ").strip().lower()
+            if answer == "" and page == pages - 1 and not select_prompt:
+                return None  # Enter on the last page ends the listing
+            if answer in ("n", ""):
+                page = min(page + 1, pages - 1)
+            elif answer == "p":
+                page = max(page - 1, 0)
+            elif answer == "j":
+                try:
+                    page = min(max(int(input(f"Page number (1-{pages}): ")) - 1, 0), pages - 1)
+                except ValueError:
+                    print("Invalid page number.")
+            elif answer == "q":
+                return None
+            elif select_prompt:
+                return int(answer)
+            else:
+                print("Invalid option, please try again.")